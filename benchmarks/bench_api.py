@@ -0,0 +1,193 @@
+"""End-to-end load test for the API routes.
+
+Boots main.app in-process on the local SQLite backend (no network) and
+drives each route through httpx's ASGI transport at a fixed concurrency.
+Reports throughput and p50/p95/p99 latency per route and writes the results
+to JSON, named after the current commit, for comparison between commits.
+
+    python benchmarks/bench_api.py --requests 500 --concurrency 16
+    python benchmarks/bench_api.py --routes list,get --compare benchmarks/results/<commit>-api.json
+
+Latencies include the whole ASGI stack (auth middleware, token cache,
+routing, serialization, app cache, executor hop, SQLite), but no sockets.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import compare, use_local_backend, write_results
+
+use_local_backend()
+
+import httpx
+import jwt
+
+ROUTES = ["list", "get", "create", "update", "delete", "preview", "upload"]
+SCREENS = [f"Screen {i}" for i in range(5)]
+
+
+def token(user_id: str) -> str:
+    claims = {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + 3600}
+    return jwt.encode(claims, os.environ["SUPABASE_JWT_SECRET"], algorithm="HS256")
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+class Bench:
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.users = [f"bench-user-{i}" for i in range(args.users)]
+        self.headers = {user: {"Authorization": f"Bearer {token(user)}"} for user in self.users}
+        self.apps = {user: [] for user in self.users}
+
+    async def create_app(self, user: str, name: str) -> str:
+        response = await self.client.post("/api/v1/apps/create", headers=self.headers[user],
+                                          json={"name": name, "color": "#4f46e5", "type": "generic", "screens": SCREENS})
+        response.raise_for_status()
+        return response.json()["data"]["id"]
+
+    async def seed(self):
+        for user in self.users:
+            for i in range(self.args.apps_per_user):
+                self.apps[user].append(await self.create_app(user, f"Seed {i}"))
+
+    def user(self, i: int) -> str:
+        return self.users[i % len(self.users)]
+
+    def app_id(self, i: int) -> tuple:
+        user = self.user(i)
+        apps = self.apps[user]
+        return user, apps[(i // len(self.users)) % len(apps)]
+
+    async def prepare(self, route: str) -> list:
+        """Untimed setup; returns one request argument per request"""
+        n = self.args.requests
+        if route == "delete":
+            # Each delete needs its own app
+            return [(self.user(i), await self.create_app(self.user(i), f"Doomed {i}")) for i in range(n)]
+        return list(range(n))
+
+    def request(self, route: str, arg):
+        """The (method, url, kwargs) of one request"""
+        if route == "list":
+            user = self.user(arg)
+            return "GET", "/api/v1/apps", {"headers": self.headers[user]}
+        if route == "get":
+            user, app_id = self.app_id(arg)
+            return "GET", f"/api/v1/apps/{app_id}", {"headers": self.headers[user]}
+        if route == "create":
+            user = self.user(arg)
+            return "POST", "/api/v1/apps/create", {
+                "headers": self.headers[user], "json": {"name": f"Bench {arg}", "screens": SCREENS}}
+        if route == "update":
+            user, app_id = self.app_id(arg)
+            return "PUT", f"/api/v1/apps/{app_id}", {"headers": self.headers[user], "json": {"name": f"Renamed {arg}"}}
+        if route == "delete":
+            user, app_id = arg
+            return "DELETE", f"/api/v1/apps/{app_id}", {"headers": self.headers[user]}
+        if route == "preview":
+            user, app_id = self.app_id(arg)
+            return "GET", f"/api/v1/apps/{app_id}/preview", {"headers": self.headers[user]}
+        if route == "upload":
+            user, app_id = self.app_id(arg)
+            # Unique content per request, so deduplication doesn't skip the store
+            body = arg.to_bytes(8, "big") + bytes(self.args.apk_kb * 1024 - 8)
+            return "POST", f"/api/v1/apps/{app_id}/upload-apk", {
+                "headers": self.headers[user], "files": {"file": ("app.apk", body)}}
+        raise ValueError(route)
+
+    async def run(self, route: str) -> dict:
+        args_list = await self.prepare(route)
+        latencies = []
+        errors = 0
+        pending = iter(args_list)
+
+        async def worker():
+            nonlocal errors
+            for arg in pending:
+                method, url, kwargs = self.request(route, arg)
+                started = time.perf_counter()
+                response = await self.client.request(method, url, **kwargs)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        ms = [value * 1000 for value in latencies]
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "concurrency": self.args.concurrency,
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "mean_ms": round(sum(ms) / len(ms), 3),
+            "p50_ms": round(percentile(ms, 0.50), 3),
+            "p95_ms": round(percentile(ms, 0.95), 3),
+            "p99_ms": round(percentile(ms, 0.99), 3),
+            "max_ms": round(ms[-1], 3),
+        }
+
+
+async def main_async(args) -> dict:
+    import main
+    from services.async_supabase_service import close_client
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        bench = Bench(client, args)
+        await bench.seed()
+        # Warm-up: token cache, app cache and first-call imports
+        for route in ("list", "get", "preview"):
+            method, url, kwargs = bench.request(route, 0)
+            await client.request(method, url, **kwargs)
+        results = {}
+        for route in args.routes:
+            results[route] = await bench.run(route)
+    await close_client()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--apps-per-user", type=int, default=10)
+    parser.add_argument("--apk-kb", type=int, default=256, help="upload size")
+    parser.add_argument("--routes", type=lambda value: value.split(","), default=ROUTES,
+                        help=f"comma-separated subset of {','.join(ROUTES)}")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>-api.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+    unknown = set(args.routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+
+    # The app logs every request; keep the report readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = asyncio.run(main_async(args))
+    print(f"{args.requests} requests per route, concurrency {args.concurrency}")
+    for route, result in results.items():
+        print(f"{route:<8} {result['throughput_rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.3f} ms  "
+              f"p95 {result['p95_ms']:>8.3f} ms  p99 {result['p99_ms']:>8.3f} ms  errors {result['errors']}")
+
+    output = write_results("api", args, results, args.output)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, args.compare, ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"))
+
+if __name__ == "__main__":
+    main()
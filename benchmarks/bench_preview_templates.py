@@ -0,0 +1,104 @@
+"""Microbenchmark for preview template rendering.
+
+Renders every app type across screen counts and name/color variants, calling
+the same code path as GET /apps/{app_id}/preview, and reports per case:
+
+- ns_per_render: median over --repeat rounds of --iterations renders
+- alloc_peak_bytes: peak memory allocated while rendering once (tracemalloc)
+- output_bytes: size of the UTF-8 HTML
+
+    python benchmarks/bench_preview_templates.py
+    python benchmarks/bench_preview_templates.py --screens 1,200 --compare benchmarks/results/<commit>-preview.json
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import compare, use_local_backend, write_results
+
+use_local_backend()
+
+TYPES = ["app", "game", "shopping", "chat"]
+SCREEN_COUNTS = [1, 5, 20, 50, 100, 200]
+# Short, long and non-ASCII names (escaping and encoding cost), plus colors
+VARIANTS = [
+    ("Meu App", "#4E9FFF"),
+    ("Aplicativo de Gestão Financeira Pessoal Completo", "#22c55e"),
+    ("Café & Ação <Beta>", "#ef4444"),
+]
+
+
+def make_app(app_type: str, screen_count: int, name: str, color: str) -> dict:
+    return {
+        "name": name,
+        "color": color,
+        "type": app_type,
+        "screens": [f"Tela {i}" for i in range(screen_count)],
+    }
+
+
+def render_preview(app: dict) -> str:
+    from routes.preview import _get_app_template
+    return _get_app_template(app)
+
+
+def measure(app: dict, iterations: int, repeat: int) -> dict:
+    html = render_preview(app)  # warm-up
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for _ in range(iterations):
+            render_preview(app)
+        rounds.append((time.perf_counter_ns() - started) / iterations)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    render_preview(app)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ns_per_render": round(statistics.median(rounds)),
+        "alloc_peak_bytes": peak - before,
+        "output_bytes": len(html.encode()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--types", type=lambda value: value.split(","), default=TYPES)
+    parser.add_argument("--screens", type=lambda value: [int(n) for n in value.split(",")], default=SCREEN_COUNTS)
+    parser.add_argument("--iterations", type=int, default=200, help="renders per round")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per case (median reported)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>-preview.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<16} {'ns/render':>12} {'alloc peak':>12} {'output':>10}")
+    for app_type in args.types:
+        for screen_count in args.screens:
+            cases = [measure(make_app(app_type, screen_count, name, color), args.iterations, args.repeat)
+                     for name, color in VARIANTS]
+            key = f"{app_type}/{screen_count}"
+            results[key] = {
+                "ns_per_render": round(statistics.mean(case["ns_per_render"] for case in cases)),
+                "alloc_peak_bytes": max(case["alloc_peak_bytes"] for case in cases),
+                "output_bytes": round(statistics.mean(case["output_bytes"] for case in cases)),
+            }
+            result = results[key]
+            print(f"{key:<16} {result['ns_per_render']:>12,} {result['alloc_peak_bytes']:>12,} {result['output_bytes']:>10,}")
+
+    output = write_results("preview", args, results, args.output)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, args.compare, ("ns_per_render", "alloc_peak_bytes", "output_bytes"))
+
+
+if __name__ == "__main__":
+    main()
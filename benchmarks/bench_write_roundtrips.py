@@ -0,0 +1,129 @@
+"""Round-trip benchmark for SupabaseService.update_app / delete_app.
+
+Runs the service against an in-process PostgREST stand-in that adds a fixed
+latency to every request, and compares the current single-request write
+paths with the previous "get_app, then mutate" flow.
+
+    python benchmarks/bench_write_roundtrips.py --latency-ms 20 --iterations 50
+    python benchmarks/bench_write_roundtrips.py --compare benchmarks/results/<commit>-write-roundtrips.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import compare, write_results
+
+# Every request is answered by FakePostgrest below; the values only need to
+# look like a configured project
+os.environ.update({
+    "DATA_BACKEND": "supabase",
+    "SUPABASE_URL": "http://postgrest.bench",
+    "SUPABASE_ANON_KEY": "bench-anon-key",
+    "SUPABASE_SERVICE_ROLE_KEY": "bench-service-key",
+})
+
+
+class FakePostgrest:
+    """Just enough of PostgREST's /rest/v1/apps for eq-filtered CRUD."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.rows = {}
+        self.requests = 0
+
+    def _matches(self, row, params):
+        for column, condition in params.items():
+            if column in ("select", "order", "limit"):
+                continue
+            if condition.startswith("eq.") and str(row.get(column)) != condition[3:]:
+                return False
+        return True
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        time.sleep(self.latency)
+        params = dict(request.url.params)
+        matched = [row for row in self.rows.values() if self._matches(row, params)]
+        if request.method == "GET":
+            return httpx.Response(200, json=matched)
+        if request.method == "POST":
+            # Inserts send one object or, for batches, a list of them
+            payload = json.loads(request.content)
+            rows = [dict(item, id=str(uuid.uuid4())) for item in (payload if isinstance(payload, list) else [payload])]
+            self.rows.update((row["id"], row) for row in rows)
+            return httpx.Response(201, json=rows)
+        if request.method == "PATCH":
+            for row in matched:
+                row.update(json.loads(request.content))
+            return httpx.Response(200, json=matched)
+        if request.method == "DELETE":
+            for row in matched:
+                del self.rows[row["id"]]
+            return httpx.Response(200, json=matched)
+        return httpx.Response(405)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>-write-roundtrips.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    backend = FakePostgrest(args.latency_ms / 1000)
+    import services.http_pool as http_pool
+    http_pool.create_sync_http_client = lambda: httpx.Client(transport=httpx.MockTransport(backend))
+
+    from models.app import AppCreateRequest, AppUpdateRequest
+    from services import supabase_service
+    from services.supabase_service import SupabaseService
+
+    def legacy_update(app_id, user_id, app_data):
+        if not SupabaseService.get_app(app_id, user_id):
+            return None
+        return SupabaseService.update_app(app_id, user_id, app_data)
+
+    def legacy_delete(app_id, user_id):
+        if not SupabaseService.get_app(app_id, user_id):
+            return False
+        return SupabaseService.delete_app(app_id, user_id)
+
+    def measure(label, func):
+        ids = [SupabaseService.create_app("bench-user", AppCreateRequest(name=f"App {i}")).id
+               for i in range(args.iterations)]
+        backend.requests = 0
+        started = time.perf_counter()
+        for app_id in ids:
+            func(app_id)
+        elapsed = time.perf_counter() - started
+        results[label] = {
+            "requests_per_call": backend.requests / args.iterations,
+            "ms_per_call": round(elapsed / args.iterations * 1000, 3),
+        }
+        supabase_service.supabase.table("apps").delete().eq("user_id", "bench-user").execute()
+        result = results[label]
+        print(f"{label:<16} {result['requests_per_call']:>4.1f} requests  {result['ms_per_call']:>8.3f} ms/call")
+
+    update = AppUpdateRequest(name="Renamed")
+    results = {}
+    print(f"Simulated PostgREST latency: {args.latency_ms} ms, {args.iterations} calls per path")
+    measure("update/legacy", lambda app_id: legacy_update(app_id, "bench-user", update))
+    measure("update/single", lambda app_id: SupabaseService.update_app(app_id, "bench-user", update))
+    measure("delete/legacy", lambda app_id: legacy_delete(app_id, "bench-user"))
+    measure("delete/single", lambda app_id: SupabaseService.delete_app(app_id, "bench-user"))
+
+    output = write_results("write-roundtrips", args, results, args.output)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(results, args.compare, ("requests_per_call", "ms_per_call"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Shared helpers for the benchmark scripts: local-only environment and JSON results."""
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def use_local_backend():
+    """Run against the SQLite backend; never talk to a real Supabase project from a benchmark.
+
+    Must be called before anything imports services.supabase_service.
+    """
+    for name in ("SUPABASE_URL", "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_JWKS_URL"):
+        os.environ.pop(name, None)
+    os.environ["DATA_BACKEND"] = "sqlite"
+    # Tokens are signed and verified for real; the SQLite backend refuses to
+    # start without a way to verify them
+    os.environ.setdefault("SUPABASE_JWT_SECRET", "bench-jwt-secret-bench-jwt-secret-0123")
+    scratch = tempfile.mkdtemp(prefix="appquanta-bench-")
+    os.environ.setdefault("LOCAL_STORAGE_DIR", os.path.join(scratch, "storage"))
+    os.environ.setdefault("APK_UPLOAD_STAGING_DIR", os.path.join(scratch, "uploads"))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(name: str, args, results: dict, output: str = None) -> str:
+    """Store results as benchmarks/results/<commit>-<name>.json (or `output`); returns the path"""
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    output = output or os.path.join(RESULTS_DIR, f"{commit}-{name}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    return output
+
+
+def compare(results: dict, baseline_path: str, keys):
+    """Print the relative change of `keys` for every result also present in the baseline"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nChange vs {baseline['meta']['commit']} ({baseline_path}):")
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        deltas = []
+        for key in keys:
+            change = (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            deltas.append(f"{key} {change:+.1f}%")
+        print(f"  {name:<16} " + "  ".join(deltas))
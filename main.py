@@ -4,7 +4,11 @@ from fastapi.responses import JSONResponse
 from routes.auth import router as auth_router
 from routes.apps import router as apps_router
 from routes.preview import router as preview_router
+from routes.metrics import router as metrics_router
+from routes.storage import router as storage_router
 from middleware.auth_middleware import AuthMiddleware
+from services.async_supabase_service import close_client
+from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 
@@ -15,10 +19,17 @@ try:
 except Exception as e:
     print(f"Warning: Could not load .env file: {e}")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled Supabase connections on shutdown
+    await close_client()
+
 app = FastAPI(
     title="AppQuanta API",
     description="Backend API for AppQuanta application management with Supabase",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add authentication middleware
@@ -37,6 +48,8 @@ app.add_middleware(
 app.include_router(auth_router, prefix="/api/v1", tags=["Authentication"])
 app.include_router(apps_router, prefix="/api/v1", tags=["Apps"])
 app.include_router(preview_router, prefix="/api/v1", tags=["Preview"])
+app.include_router(metrics_router, prefix="/api/v1", tags=["Metrics"])
+app.include_router(storage_router, prefix="/api/v1", tags=["Storage"])
 
 # Global error handler
 @app.exception_handler(Exception)
@@ -1,50 +1,67 @@
-from fastapi import Request, HTTPException
+import re
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from services.supabase_service import SupabaseService
-from typing import Optional
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from services.token_cache import token_cache
+from typing import Iterable, Optional
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        token = self._extract_token(request)
+# Define protected routes
+PROTECTED_PREFIXES = ("/api/v1/apps",)
+
+class AuthMiddleware:
+    """Pure ASGI auth middleware.
+
+    Runs inline in the request task (no extra task or memory stream per
+    request like BaseHTTPMiddleware), so streaming request and response
+    bodies pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, protected_prefixes: Iterable[str] = PROTECTED_PREFIXES):
+        self.app = app
+        self._protected_route = re.compile(
+            "|".join(re.escape(prefix) for prefix in protected_prefixes)
+        ) if protected_prefixes else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = self._extract_token(scope)
 
         if token:
-            user_id = SupabaseService.verify_token(token)
+            user_id = await token_cache.verify(token)
             if user_id:
-                request.state.user = user_id
+                # Backs request.state.user
+                scope.setdefault("state", {})["user"] = user_id
             else:
                 print(f"Invalid token: {token[:50]}...")
-                return JSONResponse(
-                    status_code=401,
-                    content={
-                        "success": False,
-                        "message": "Invalid authentication token.",
-                        "data": None
-                    }
-                )
+                await self._unauthorized("Invalid authentication token.")(scope, receive, send)
+                return
         else:
             # For protected routes, require token
-            if self._is_protected_route(request.url.path):
-                print(f"No token provided for protected route: {request.url.path}")
-                return JSONResponse(
-                    status_code=401,
-                    content={
-                        "success": False,
-                        "message": "Authentication token required.",
-                        "data": None
-                    }
-                )
-
-        response = await call_next(request)
-        return response
-
-    def _extract_token(self, request: Request) -> Optional[str]:
-        authorization = request.headers.get("Authorization")
+            if self._is_protected_route(scope["path"]):
+                print(f"No token provided for protected route: {scope['path']}")
+                await self._unauthorized("Authentication token required.")(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+    def _unauthorized(self, message: str) -> JSONResponse:
+        return JSONResponse(
+            status_code=401,
+            content={
+                "success": False,
+                "message": message,
+                "data": None
+            }
+        )
+
+    def _extract_token(self, scope: Scope) -> Optional[str]:
+        authorization = Headers(scope=scope).get("Authorization")
         if authorization and authorization.startswith("Bearer "):
             return authorization.split(" ")[1]
         return None
 
     def _is_protected_route(self, path: str) -> bool:
-        # Define protected routes
-        protected_prefixes = ["/api/v1/apps"]
-        return any(path.startswith(prefix) for prefix in protected_prefixes)
+        return bool(self._protected_route and self._protected_route.match(path))
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 class AppCreateRequest(BaseModel):
@@ -16,6 +16,28 @@ class AppUpdateRequest(BaseModel):
     description: Optional[str] = None
     status: Optional[str] = None
 
+# Upper bound on items per batch request
+MAX_BATCH_SIZE = 100
+
+class AppBatchCreateRequest(BaseModel):
+    apps: List[AppCreateRequest] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class AppBatchUpdateItem(AppUpdateRequest):
+    id: str
+
+class AppBatchUpdateRequest(BaseModel):
+    apps: List[AppBatchUpdateItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class AppBatchDeleteRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class ApkUploadSessionRequest(BaseModel):
+    # Optional; when given, finalize only succeeds once exactly this many bytes arrived
+    total_size: Optional[int] = Field(None, ge=1)
+
+class ApkDigestRequest(BaseModel):
+    sha256: str = Field(..., pattern=r"^[0-9a-f]{64}$")
+
 class AppResponse(BaseModel):
     id: str
     name: str
@@ -29,3 +51,49 @@ class AppResponse(BaseModel):
     updated_at: datetime
     user_id: str
     apk_url: Optional[str] = None
+    # SHA-256 of the current APK; clients compare it with their local build to skip re-uploads
+    apk_sha256: Optional[str] = None
+
+class ApkUploadResult(BaseModel):
+    apk_url: str
+    # None when the APK was uploaded directly to Storage and never hashed by us
+    apk_sha256: Optional[str] = None
+    apk_size: Optional[int] = None
+    # True when an identical APK was already stored and no bytes were transferred
+    deduplicated: bool = False
+
+class AppTombstone(BaseModel):
+    id: str
+    deleted_at: datetime
+
+class AppSummary(BaseModel):
+    """Projection of AppResponse holding only the columns asked for via `fields`"""
+    id: str
+    name: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+    icon: Optional[str] = None
+    color: Optional[str] = None
+    screens: Optional[list] = None
+    type: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    user_id: Optional[str] = None
+    apk_url: Optional[str] = None
+    apk_sha256: Optional[str] = None
+
+def parse_app_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated `fields` parameter against AppResponse.
+
+    Returns None when no projection was requested. `id` is always included.
+    """
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in AppResponse.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [field for field in dict.fromkeys(requested) if field != "id"]
+
+def project_app(app: AppResponse, fields: List[str]) -> AppSummary:
+    return AppSummary(**app.model_dump(include=set(fields)))
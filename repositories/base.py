@@ -0,0 +1,231 @@
+import json
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from models.app import AppBatchUpdateItem, AppCreateRequest, AppResponse, AppSummary, AppTombstone, AppUpdateRequest
+
+AppResult = Union[AppResponse, AppSummary]
+
+
+def new_app_row(user_id: str, app_data: AppCreateRequest, now: str) -> dict:
+    return {
+        'name': app_data.name,
+        'description': app_data.description,
+        'status': app_data.status,
+        'icon': app_data.icon,
+        'color': app_data.color,
+        'screens': app_data.screens,
+        'type': app_data.type,
+        'created_at': now,
+        'updated_at': now,
+        'user_id': user_id,
+        'apk_url': None
+    }
+
+
+def group_updates(items: List[AppBatchUpdateItem]) -> List[Tuple[dict, List[str]]]:
+    """Group batch updates by identical payload so each group is one `in_` update"""
+    groups: Dict[str, Tuple[dict, List[str]]] = {}
+    for item in items:
+        payload = {k: v for k, v in item.dict(exclude={'id'}).items() if v is not None}
+        key = json.dumps(payload, sort_keys=True, default=str)
+        groups.setdefault(key, (payload, []))[1].append(item.id)
+    return list(groups.values())
+
+
+class AppRepository(ABC):
+    """Persistence for apps, their tombstones and the APK digest index.
+
+    Every query is scoped to the owning user: an app that exists but belongs
+    to someone else behaves exactly like a missing one. `fields` is an
+    already-validated projection (see models.app.parse_app_fields); when given,
+    AppSummary objects are returned instead of AppResponse. Implementations
+    raise on backend errors and leave logging to SupabaseService.
+    """
+
+    @abstractmethod
+    def get_user_apps(self, user_id: str, fields: Optional[List[str]] = None) -> List[AppResult]:
+        ...
+
+    @abstractmethod
+    def get_user_apps_page(self, user_id: str, limit: int, cursor: Optional[str] = None,
+                           fields: Optional[List[str]] = None) -> Tuple[List[AppResult], Optional[str]]:
+        """One page newest first on (updated_at, id), plus the cursor for the next page"""
+
+    @abstractmethod
+    def get_apps_by_ids(self, user_id: str, app_ids: List[str],
+                        fields: Optional[List[str]] = None) -> Dict[str, AppResult]:
+        """Missing ids are absent from the result"""
+
+    @abstractmethod
+    def get_app(self, app_id: str, user_id: str, fields: Optional[List[str]] = None) -> Optional[AppResult]:
+        ...
+
+    @abstractmethod
+    def create_app(self, user_id: str, app_data: AppCreateRequest) -> AppResponse:
+        ...
+
+    @abstractmethod
+    def create_apps(self, user_id: str, apps_data: List[AppCreateRequest]) -> List[AppResponse]:
+        """All or nothing"""
+
+    @abstractmethod
+    def update_app(self, app_id: str, user_id: str, app_data: AppUpdateRequest) -> Optional[AppResponse]:
+        ...
+
+    @abstractmethod
+    def update_apps(self, user_id: str, items: List[AppBatchUpdateItem]) -> Dict[str, AppResponse]:
+        """Returns the apps that were actually updated, by id"""
+
+    @abstractmethod
+    def delete_app(self, app_id: str, user_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete_apps(self, user_id: str, app_ids: List[str]) -> List[str]:
+        """Returns the ids that were actually deleted"""
+
+    @abstractmethod
+    def get_app_changes(self, user_id: str, since: str) -> Tuple[List[AppResponse], List[AppTombstone]]:
+        """Apps created or updated after `since`, and tombstones of apps deleted after it"""
+
+    @abstractmethod
+    def apk_object_exists(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    def record_apk_object(self, digest: str, size: int):
+        ...
+
+    @abstractmethod
+    def set_app_apk(self, app_id: str, user_id: str, apk_url: str, digest: Optional[str]) -> bool:
+        """Point the app at a stored APK; False if the app doesn't exist or isn't the user's"""
+
+
+class AuthRepository(ABC):
+    """Token verification done by the backend itself (after local JWT checks)"""
+
+    @abstractmethod
+    def verify_token(self, token: str) -> Optional[str]:
+        """Return the user id for a valid token, else None"""
+
+
+class StorageRepository(ABC):
+    """Object storage for APKs"""
+
+    @abstractmethod
+    def upload(self, bucket: str, path: str, fileobj: BinaryIO):
+        """Store a local file object (upsert), streaming it in bounded chunks"""
+
+    @abstractmethod
+    def public_url(self, bucket: str, path: str) -> str:
+        ...
+
+    @abstractmethod
+    def create_signed_upload_url(self, bucket: str, path: str, expires_in: int) -> dict:
+        """Returns {"signed_url", "token", "path"} for a direct client upload"""
+
+    @abstractmethod
+    def size(self, bucket: str, path: str) -> Optional[int]:
+        """Size of a stored object, or None if it doesn't exist"""
+
+    @abstractmethod
+    def delete(self, bucket: str, path: str):
+        """Remove an object; a missing object is not an error"""
+
+    @abstractmethod
+    def move(self, bucket: str, from_path: str, to_path: str):
+        """Rename an object within the bucket"""
+
+
+class AsyncAppRepository(ABC):
+    """Async counterpart of AppRepository, used by AsyncSupabaseService.
+
+    Same methods, scoping and error contract as AppRepository.
+    """
+
+    @abstractmethod
+    async def get_user_apps(self, user_id: str, fields: Optional[List[str]] = None) -> List[AppResult]:
+        ...
+
+    @abstractmethod
+    async def get_user_apps_page(self, user_id: str, limit: int, cursor: Optional[str] = None,
+                                 fields: Optional[List[str]] = None) -> Tuple[List[AppResult], Optional[str]]:
+        ...
+
+    @abstractmethod
+    async def get_apps_by_ids(self, user_id: str, app_ids: List[str],
+                              fields: Optional[List[str]] = None) -> Dict[str, AppResult]:
+        ...
+
+    @abstractmethod
+    async def get_app(self, app_id: str, user_id: str, fields: Optional[List[str]] = None) -> Optional[AppResult]:
+        ...
+
+    @abstractmethod
+    async def create_app(self, user_id: str, app_data: AppCreateRequest) -> AppResponse:
+        ...
+
+    @abstractmethod
+    async def create_apps(self, user_id: str, apps_data: List[AppCreateRequest]) -> List[AppResponse]:
+        ...
+
+    @abstractmethod
+    async def update_app(self, app_id: str, user_id: str, app_data: AppUpdateRequest) -> Optional[AppResponse]:
+        ...
+
+    @abstractmethod
+    async def update_apps(self, user_id: str, items: List[AppBatchUpdateItem]) -> Dict[str, AppResponse]:
+        ...
+
+    @abstractmethod
+    async def delete_app(self, app_id: str, user_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete_apps(self, user_id: str, app_ids: List[str]) -> List[str]:
+        ...
+
+    @abstractmethod
+    async def get_app_changes(self, user_id: str, since: str) -> Tuple[List[AppResponse], List[AppTombstone]]:
+        ...
+
+    @abstractmethod
+    async def apk_object_exists(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def record_apk_object(self, digest: str, size: int):
+        ...
+
+    @abstractmethod
+    async def set_app_apk(self, app_id: str, user_id: str, apk_url: str, digest: Optional[str]) -> bool:
+        ...
+
+
+class AsyncStorageRepository(ABC):
+    """Async counterpart of StorageRepository"""
+
+    @abstractmethod
+    async def upload(self, bucket: str, path: str, fileobj: BinaryIO):
+        """Store a local file object (upsert); reads must not block the event loop"""
+
+    @abstractmethod
+    async def public_url(self, bucket: str, path: str) -> str:
+        ...
+
+    @abstractmethod
+    async def create_signed_upload_url(self, bucket: str, path: str, expires_in: int) -> dict:
+        ...
+
+    @abstractmethod
+    async def size(self, bucket: str, path: str) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    async def delete(self, bucket: str, path: str):
+        ...
+
+    @abstractmethod
+    async def move(self, bucket: str, from_path: str, to_path: str):
+        ...
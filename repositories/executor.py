@@ -0,0 +1,96 @@
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from models.app import AppBatchUpdateItem, AppCreateRequest, AppResponse, AppTombstone, AppUpdateRequest
+from repositories.base import (
+    AppRepository, AppResult, AsyncAppRepository, AsyncStorageRepository, StorageRepository
+)
+from services.executor_service import BoundedExecutor
+
+
+class ExecutorAppRepository(AsyncAppRepository):
+    """Async AppRepository running a sync one on a bounded thread pool.
+
+    This is the async form of the SQLite backend, and of the Supabase backend
+    in "executor" mode (SUPABASE_DATA_MODE). Executor stats are kept per
+    repository method.
+    """
+
+    def __init__(self, repository: AppRepository, executor: BoundedExecutor):
+        self.repository = repository
+        self.executor = executor
+
+    async def _run(self, method: str, *args):
+        return await self.executor.run(method, getattr(self.repository, method), *args)
+
+    async def get_user_apps(self, user_id: str, fields: Optional[List[str]] = None) -> List[AppResult]:
+        return await self._run('get_user_apps', user_id, fields)
+
+    async def get_user_apps_page(self, user_id: str, limit: int, cursor: Optional[str] = None,
+                                 fields: Optional[List[str]] = None) -> Tuple[List[AppResult], Optional[str]]:
+        return await self._run('get_user_apps_page', user_id, limit, cursor, fields)
+
+    async def get_apps_by_ids(self, user_id: str, app_ids: List[str],
+                              fields: Optional[List[str]] = None) -> Dict[str, AppResult]:
+        return await self._run('get_apps_by_ids', user_id, app_ids, fields)
+
+    async def get_app(self, app_id: str, user_id: str, fields: Optional[List[str]] = None) -> Optional[AppResult]:
+        return await self._run('get_app', app_id, user_id, fields)
+
+    async def create_app(self, user_id: str, app_data: AppCreateRequest) -> AppResponse:
+        return await self._run('create_app', user_id, app_data)
+
+    async def create_apps(self, user_id: str, apps_data: List[AppCreateRequest]) -> List[AppResponse]:
+        return await self._run('create_apps', user_id, apps_data)
+
+    async def update_app(self, app_id: str, user_id: str, app_data: AppUpdateRequest) -> Optional[AppResponse]:
+        return await self._run('update_app', app_id, user_id, app_data)
+
+    async def update_apps(self, user_id: str, items: List[AppBatchUpdateItem]) -> Dict[str, AppResponse]:
+        return await self._run('update_apps', user_id, items)
+
+    async def delete_app(self, app_id: str, user_id: str) -> bool:
+        return await self._run('delete_app', app_id, user_id)
+
+    async def delete_apps(self, user_id: str, app_ids: List[str]) -> List[str]:
+        return await self._run('delete_apps', user_id, app_ids)
+
+    async def get_app_changes(self, user_id: str, since: str) -> Tuple[List[AppResponse], List[AppTombstone]]:
+        return await self._run('get_app_changes', user_id, since)
+
+    async def apk_object_exists(self, digest: str) -> bool:
+        return await self._run('apk_object_exists', digest)
+
+    async def record_apk_object(self, digest: str, size: int):
+        await self._run('record_apk_object', digest, size)
+
+    async def set_app_apk(self, app_id: str, user_id: str, apk_url: str, digest: Optional[str]) -> bool:
+        return await self._run('set_app_apk', app_id, user_id, apk_url, digest)
+
+
+class ExecutorStorageRepository(AsyncStorageRepository):
+    """Async StorageRepository running a sync one on a bounded thread pool"""
+
+    def __init__(self, storage: StorageRepository, executor: BoundedExecutor):
+        self.storage = storage
+        self.executor = executor
+
+    async def _run(self, method: str, *args):
+        return await self.executor.run(f"storage.{method}", getattr(self.storage, method), *args)
+
+    async def upload(self, bucket: str, path: str, fileobj: BinaryIO):
+        await self._run('upload', bucket, path, fileobj)
+
+    async def public_url(self, bucket: str, path: str) -> str:
+        return await self._run('public_url', bucket, path)
+
+    async def create_signed_upload_url(self, bucket: str, path: str, expires_in: int) -> dict:
+        return await self._run('create_signed_upload_url', bucket, path, expires_in)
+
+    async def size(self, bucket: str, path: str) -> Optional[int]:
+        return await self._run('size', bucket, path)
+
+    async def delete(self, bucket: str, path: str):
+        await self._run('delete', bucket, path)
+
+    async def move(self, bucket: str, from_path: str, to_path: str):
+        await self._run('move', bucket, from_path, to_path)
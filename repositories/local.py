@@ -0,0 +1,137 @@
+import hashlib
+import hmac
+import os
+import secrets
+import tempfile
+import time
+from typing import AsyncIterator, BinaryIO, Optional
+
+import jwt
+from starlette.concurrency import run_in_threadpool
+
+from repositories.base import AuthRepository, StorageRepository
+from services.apk_upload import MAX_APK_BYTES, ApkTooLarge, iter_chunks
+
+# User for requests whose token carries no subject
+DEV_USER_ID = "test_user_id"
+
+
+class LocalAuthRepository(AuthRepository):
+    """Development auth: tokens are NOT verified.
+
+    The user id is the token's `sub` claim when it is a JWT (so local load
+    tests can act as many users), else DEV_USER_ID. Only used when
+    ALLOW_INSECURE_LOCAL_AUTH is set; otherwise the SQLite backend requires
+    SUPABASE_JWT_SECRET (or a JWKS) and verifies every token locally.
+    """
+
+    def verify_token(self, token: str) -> Optional[str]:
+        try:
+            claims = jwt.decode(token, options={"verify_signature": False})
+        except jwt.PyJWTError:
+            return DEV_USER_ID
+        return str(claims.get("sub") or DEV_USER_ID)
+
+
+class LocalStorage(StorageRepository):
+    """Filesystem stand-in for Supabase Storage, used when Supabase isn't configured.
+
+    Mirrors Storage's signed upload URLs: the token is an HMAC over the object
+    path and an expiry, so routes/storage.py can accept the upload without a
+    user session. The signing secret must be shared by all workers (set
+    LOCAL_STORAGE_SIGNING_SECRET); otherwise a per-process one is generated.
+    """
+
+    def __init__(self, root: str, public_base_url: str, secret: bytes):
+        self.root = root
+        self.public_base_url = public_base_url.rstrip("/")
+        self._secret = secret
+
+    def file_path(self, bucket: str, path: str) -> str:
+        full = os.path.realpath(os.path.join(self.root, bucket, path))
+        if not full.startswith(os.path.realpath(self.root) + os.sep):
+            raise ValueError("Invalid object path")
+        return full
+
+    def _signature(self, bucket: str, path: str, expires_at: int) -> str:
+        message = f"{bucket}/{path}:{expires_at}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def create_signed_upload_url(self, bucket: str, path: str, expires_in: int) -> dict:
+        expires_at = int(time.time()) + expires_in
+        token = f"{expires_at}.{self._signature(bucket, path, expires_at)}"
+        return {
+            "signed_url": f"{self.public_base_url}/api/v1/storage/upload/{bucket}/{path}?token={token}",
+            "token": token,
+            "path": path,
+        }
+
+    def verify_upload_token(self, bucket: str, path: str, token: str) -> bool:
+        try:
+            expires_at, signature = token.split(".", 1)
+            expires_at = int(expires_at)
+        except ValueError:
+            return False
+        if expires_at < time.time():
+            return False
+        return hmac.compare_digest(signature, self._signature(bucket, path, expires_at))
+
+    def public_url(self, bucket: str, path: str) -> str:
+        return f"{self.public_base_url}/api/v1/storage/public/{bucket}/{path}"
+
+    async def write(self, bucket: str, path: str, chunks: AsyncIterator[bytes],
+                    max_bytes: int = MAX_APK_BYTES) -> int:
+        """Store a streamed object atomically (upsert); returns its size"""
+        target = self.file_path(bucket, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ApkTooLarge(max_bytes)
+                    await run_in_threadpool(f.write, chunk)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return size
+
+    def upload(self, bucket: str, path: str, fileobj: BinaryIO):
+        target = self.file_path(bucket, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter_chunks(fileobj):
+                    f.write(chunk)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def size(self, bucket: str, path: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self.file_path(bucket, path))
+        except (OSError, ValueError):
+            return None
+
+    def delete(self, bucket: str, path: str):
+        try:
+            os.remove(self.file_path(bucket, path))
+        except FileNotFoundError:
+            pass
+
+    def move(self, bucket: str, from_path: str, to_path: str):
+        target = self.file_path(bucket, to_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(self.file_path(bucket, from_path), target)
+
+
+local_storage = LocalStorage(
+    root=os.getenv("LOCAL_STORAGE_DIR", os.path.join(tempfile.gettempdir(), "appquanta-storage")),
+    public_base_url=os.getenv("LOCAL_STORAGE_PUBLIC_URL", f"http://localhost:{os.getenv('PORT', '8000')}"),
+    secret=os.getenv("LOCAL_STORAGE_SIGNING_SECRET", "").encode() or secrets.token_bytes(32),
+)
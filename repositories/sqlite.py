@@ -0,0 +1,228 @@
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.app import AppBatchUpdateItem, AppCreateRequest, AppResponse, AppSummary, AppTombstone, AppUpdateRequest
+from repositories.base import AppRepository, AppResult, group_updates, new_app_row
+from services.pagination import decode_cursor, next_cursor
+
+# Mirrors the Supabase schema, including the tombstone trigger from
+# supabase/migrations, so the local backend has the same semantics. The
+# updated_at trigger isn't needed: rows and tombstones are both stamped by
+# utc_timestamp, in this process, so they already share one clock.
+SCHEMA = """
+create table if not exists apps (
+    id          text primary key,
+    user_id     text not null,
+    name        text not null,
+    description text,
+    status      text not null default 'active',
+    icon        text,
+    color       text,
+    screens     text,
+    type        text,
+    created_at  text not null,
+    updated_at  text not null,
+    apk_url     text,
+    apk_sha256  text
+);
+
+create index if not exists apps_user_updated_at_idx on apps (user_id, updated_at, id);
+
+create table if not exists app_tombstones (
+    app_id     text primary key,
+    user_id    text not null,
+    deleted_at text not null
+);
+
+create index if not exists app_tombstones_user_deleted_at_idx on app_tombstones (user_id, deleted_at);
+
+create trigger if not exists record_app_tombstone after delete on apps
+begin
+    insert into app_tombstones (app_id, user_id, deleted_at)
+    values (old.id, old.user_id, utc_now())
+    on conflict (app_id) do update set deleted_at = excluded.deleted_at;
+end;
+
+create table if not exists apk_objects (
+    sha256     text primary key,
+    size       integer not null,
+    created_at text not null
+);
+"""
+
+APP_COLUMNS = list(AppResponse.model_fields)
+
+
+def utc_timestamp(value=None) -> str:
+    """Naive-UTC ISO timestamp with fixed precision, so text order is time order"""
+    if value is None:
+        value = datetime.utcnow()
+    elif not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="microseconds")
+
+
+class SQLiteAppRepository(AppRepository):
+    """AppRepository on SQLite, for local development, tests and benchmarks.
+
+    One connection is shared by all threads and serialized with a lock; the
+    default ":memory:" database lives as long as the process, while a file
+    path persists across restarts (and can be shared by several workers).
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.create_function("utc_now", 0, utc_timestamp)
+        if path != ":memory:":
+            self._conn.execute("pragma journal_mode=wal")
+        self._conn.executescript(SCHEMA)
+
+    def _execute(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _transaction(self, statements: List[Tuple[str, Tuple]]) -> List[sqlite3.Row]:
+        """Run several statements atomically; returns the rows of all of them"""
+        rows = []
+        with self._lock:
+            self._conn.execute("begin")
+            try:
+                for sql, params in statements:
+                    rows.extend(self._conn.execute(sql, params).fetchall())
+                self._conn.execute("commit")
+            except BaseException:
+                self._conn.execute("rollback")
+                raise
+        return rows
+
+    @staticmethod
+    def _columns(fields: Optional[List[str]]) -> str:
+        # fields are validated against AppResponse by parse_app_fields
+        return ", ".join(f'"{field}"' for field in (fields or APP_COLUMNS))
+
+    @staticmethod
+    def _to_app(row: sqlite3.Row, fields: Optional[List[str]] = None) -> AppResult:
+        data: Dict[str, Any] = dict(row)
+        if data.get("screens") is not None:
+            data["screens"] = json.loads(data["screens"])
+        return AppSummary(**data) if fields else AppResponse(**data)
+
+    @staticmethod
+    def _row_values(data: dict) -> dict:
+        if data.get("screens") is not None:
+            data = dict(data, screens=json.dumps(data["screens"]))
+        return data
+
+    def get_user_apps(self, user_id: str, fields: Optional[List[str]] = None) -> List[AppResult]:
+        rows = self._execute(f"select {self._columns(fields)} from apps where user_id = ?", (user_id,))
+        return [self._to_app(row, fields) for row in rows]
+
+    def get_user_apps_page(self, user_id: str, limit: int, cursor: Optional[str] = None,
+                           fields: Optional[List[str]] = None) -> Tuple[List[AppResult], Optional[str]]:
+        sql = f"select {self._columns(fields)} from apps where user_id = ?"
+        params: Tuple = (user_id,)
+        if cursor:
+            updated_at, app_id = decode_cursor(cursor)
+            updated_at = utc_timestamp(updated_at)
+            sql += " and (updated_at < ? or (updated_at = ? and id < ?))"
+            params += (updated_at, updated_at, app_id)
+        # Fetch one extra row to know whether another page exists
+        sql += " order by updated_at desc, id desc limit ?"
+        rows = self._execute(sql, params + (limit + 1,))
+        return next_cursor([self._to_app(row, fields) for row in rows], limit)
+
+    def get_apps_by_ids(self, user_id: str, app_ids: List[str],
+                        fields: Optional[List[str]] = None) -> Dict[str, AppResult]:
+        placeholders = ", ".join("?" * len(app_ids))
+        rows = self._execute(
+            f"select {self._columns(fields)} from apps where user_id = ? and id in ({placeholders})",
+            (user_id, *app_ids),
+        )
+        return {row["id"]: self._to_app(row, fields) for row in rows}
+
+    def get_app(self, app_id: str, user_id: str, fields: Optional[List[str]] = None) -> Optional[AppResult]:
+        rows = self._execute(f"select {self._columns(fields)} from apps where id = ? and user_id = ?", (app_id, user_id))
+        return self._to_app(rows[0], fields) if rows else None
+
+    def create_app(self, user_id: str, app_data: AppCreateRequest) -> AppResponse:
+        return self.create_apps(user_id, [app_data])[0]
+
+    def create_apps(self, user_id: str, apps_data: List[AppCreateRequest]) -> List[AppResponse]:
+        now = utc_timestamp()
+        statements = []
+        for app_data in apps_data:
+            row = self._row_values(dict(new_app_row(user_id, app_data, now), id=str(uuid.uuid4())))
+            columns = ", ".join(row)
+            placeholders = ", ".join("?" * len(row))
+            statements.append((f"insert into apps ({columns}) values ({placeholders}) returning *", tuple(row.values())))
+        return [self._to_app(row) for row in self._transaction(statements)]
+
+    def _update(self, user_id: str, app_ids: List[str], update_data: dict) -> Tuple[str, Tuple]:
+        update_data = self._row_values(update_data)
+        assignments = ", ".join(f'"{column}" = ?' for column in update_data)
+        placeholders = ", ".join("?" * len(app_ids))
+        return (
+            f"update apps set {assignments} where user_id = ? and id in ({placeholders}) returning *",
+            (*update_data.values(), user_id, *app_ids),
+        )
+
+    def update_app(self, app_id: str, user_id: str, app_data: AppUpdateRequest) -> Optional[AppResponse]:
+        update_data = {k: v for k, v in app_data.dict().items() if v is not None}
+        update_data['updated_at'] = utc_timestamp()
+        rows = self._transaction([self._update(user_id, [app_id], update_data)])
+        return self._to_app(rows[0]) if rows else None
+
+    def update_apps(self, user_id: str, items: List[AppBatchUpdateItem]) -> Dict[str, AppResponse]:
+        now = utc_timestamp()
+        statements = []
+        for update_data, app_ids in group_updates(items):
+            update_data['updated_at'] = now
+            statements.append(self._update(user_id, app_ids, update_data))
+        return {row["id"]: self._to_app(row) for row in self._transaction(statements)}
+
+    def delete_app(self, app_id: str, user_id: str) -> bool:
+        return bool(self.delete_apps(user_id, [app_id]))
+
+    def delete_apps(self, user_id: str, app_ids: List[str]) -> List[str]:
+        placeholders = ", ".join("?" * len(app_ids))
+        rows = self._transaction([
+            (f"delete from apps where user_id = ? and id in ({placeholders}) returning id", (user_id, *app_ids)),
+        ])
+        return [row["id"] for row in rows]
+
+    def get_app_changes(self, user_id: str, since: str) -> Tuple[List[AppResponse], List[AppTombstone]]:
+        since = utc_timestamp(since)
+        with self._lock:
+            changed = self._conn.execute(
+                "select * from apps where user_id = ? and updated_at >= ? order by updated_at", (user_id, since)
+            ).fetchall()
+            deleted = self._conn.execute(
+                "select app_id, deleted_at from app_tombstones where user_id = ? and deleted_at >= ? order by deleted_at",
+                (user_id, since),
+            ).fetchall()
+        return (
+            [self._to_app(row) for row in changed],
+            [AppTombstone(id=row["app_id"], deleted_at=row["deleted_at"]) for row in deleted],
+        )
+
+    def apk_object_exists(self, digest: str) -> bool:
+        return bool(self._execute("select 1 from apk_objects where sha256 = ?", (digest,)))
+
+    def record_apk_object(self, digest: str, size: int):
+        self._execute(
+            "insert into apk_objects (sha256, size, created_at) values (?, ?, ?) on conflict (sha256) do nothing",
+            (digest, size, utc_timestamp()),
+        )
+
+    def set_app_apk(self, app_id: str, user_id: str, apk_url: str, digest: Optional[str]) -> bool:
+        update_data = {'apk_url': apk_url, 'apk_sha256': digest, 'updated_at': utc_timestamp()}
+        return bool(self._transaction([self._update(user_id, [app_id], update_data)]))
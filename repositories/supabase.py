@@ -0,0 +1,405 @@
+import asyncio
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Generator, List, Optional, Tuple, TypeVar
+
+import httpx
+from storage3.types import CreateSignedUploadUrlOptions
+from storage3.utils import StorageException
+from supabase import AsyncClient, AsyncClientOptions, Client, acreate_client
+
+from models.app import AppBatchUpdateItem, AppCreateRequest, AppResponse, AppSummary, AppTombstone, AppUpdateRequest
+from repositories.base import (
+    AppRepository, AppResult, AsyncAppRepository, AsyncStorageRepository, AuthRepository, StorageRepository,
+    group_updates, new_app_row
+)
+from services.apk_upload import aiter_chunks, iter_chunks, storage_object_url, storage_upload_headers
+from services.http_pool import create_async_http_client
+from services.pagination import keyset_filter, next_cursor
+
+T = TypeVar("T")
+# A query generator: yields request builders (a tuple of builders runs them
+# together), receives their responses and returns the result
+Query = Generator[Any, Any, T]
+
+
+def _select(fields: Optional[List[str]]):
+    # Push the projection down so unused columns (e.g. screens) aren't transferred
+    return (','.join(fields), AppSummary) if fields else ('*', AppResponse)
+
+
+class AppQueries:
+    """PostgREST queries for apps, written once for the sync and async clients.
+
+    Both clients build requests with the same API and only differ in
+    whether execute() is awaited, so each query is a generator driven by
+    SupabaseAppRepository (sync) or AsyncSupabaseAppRepository (async).
+    """
+
+    @staticmethod
+    def get_user_apps(client, user_id: str, fields: Optional[List[str]]) -> Query[List[AppResult]]:
+        select, model = _select(fields)
+        response = yield client.table('apps').select(select).eq('user_id', user_id)
+        return [model(**item) for item in response.data]
+
+    @staticmethod
+    def get_user_apps_page(client, user_id: str, limit: int, cursor: Optional[str],
+                           fields: Optional[List[str]]) -> Query[Tuple[List[AppResult], Optional[str]]]:
+        select, model = _select(fields)
+        query = client.table('apps').select(select).eq('user_id', user_id)
+        if cursor:
+            query = query.or_(keyset_filter(cursor))
+        # Fetch one extra row to know whether another page exists
+        response = yield query.order('updated_at', desc=True).order('id', desc=True).limit(limit + 1)
+        return next_cursor([model(**item) for item in response.data], limit)
+
+    @staticmethod
+    def get_apps_by_ids(client, user_id: str, app_ids: List[str],
+                        fields: Optional[List[str]]) -> Query[Dict[str, AppResult]]:
+        select, model = _select(fields)
+        response = yield client.table('apps').select(select).in_('id', app_ids).eq('user_id', user_id)
+        return {item['id']: model(**item) for item in response.data}
+
+    @staticmethod
+    def get_app(client, app_id: str, user_id: str, fields: Optional[List[str]]) -> Query[Optional[AppResult]]:
+        select, model = _select(fields)
+        response = yield client.table('apps').select(select).eq('id', app_id).eq('user_id', user_id)
+        if response.data:
+            return model(**response.data[0])
+        return None
+
+    @staticmethod
+    def create_apps(client, user_id: str, apps_data: List[AppCreateRequest]) -> Query[List[AppResponse]]:
+        now = datetime.utcnow().isoformat()
+        rows = [new_app_row(user_id, app_data, now) for app_data in apps_data]
+        response = yield client.table('apps').insert(rows)
+        if len(response.data) != len(rows):
+            raise Exception("Failed to create apps")
+        return [AppResponse(**item) for item in response.data]
+
+    @staticmethod
+    def update_app(client, app_id: str, user_id: str, app_data: AppUpdateRequest) -> Query[Optional[AppResponse]]:
+        # Filtered on id and user_id: no returned row means the app doesn't
+        # exist or isn't ours, so no separate ownership lookup is needed.
+        update_data = {k: v for k, v in app_data.dict().items() if v is not None}
+        # Keeps the payload non-empty; the apps_set_updated_at trigger stamps the real value
+        update_data['updated_at'] = datetime.utcnow().isoformat()
+        response = yield client.table('apps').update(update_data).eq('id', app_id).eq('user_id', user_id)
+        if response.data:
+            return AppResponse(**response.data[0])
+        return None
+
+    @staticmethod
+    def update_apps(client, user_id: str, items: List[AppBatchUpdateItem]) -> Query[Dict[str, AppResponse]]:
+        updated = {}
+        now = datetime.utcnow().isoformat()
+        for update_data, app_ids in group_updates(items):
+            update_data['updated_at'] = now
+            response = yield client.table('apps').update(update_data).in_('id', app_ids).eq('user_id', user_id)
+            for item in response.data:
+                updated[item['id']] = AppResponse(**item)
+        return updated
+
+    @staticmethod
+    def delete_apps(client, user_id: str, app_ids: List[str]) -> Query[List[str]]:
+        # Filtered on id and user_id: only the user's apps are deleted
+        response = yield client.table('apps').delete().in_('id', app_ids).eq('user_id', user_id)
+        return [item['id'] for item in response.data]
+
+    @staticmethod
+    def get_app_changes(client, user_id: str, since: str) -> Query[Tuple[List[AppResponse], List[AppTombstone]]]:
+        # updated_at and the tombstones are both written by triggers on apps
+        # (supabase/migrations), so they share the database clock
+        changed, deleted = yield (
+            client.table('apps').select('*').eq('user_id', user_id).gte('updated_at', since).order('updated_at'),
+            client.table('app_tombstones').select('app_id,deleted_at').eq('user_id', user_id).gte('deleted_at', since).order('deleted_at'),
+        )
+        return (
+            [AppResponse(**item) for item in changed.data],
+            [AppTombstone(id=item['app_id'], deleted_at=item['deleted_at']) for item in deleted.data],
+        )
+
+    @staticmethod
+    def apk_object_exists(client, digest: str) -> Query[bool]:
+        response = yield client.table('apk_objects').select('sha256').eq('sha256', digest).limit(1)
+        return bool(response.data)
+
+    @staticmethod
+    def record_apk_object(client, digest: str, size: int) -> Query[None]:
+        yield client.table('apk_objects').upsert({'sha256': digest, 'size': size})
+
+    @staticmethod
+    def set_app_apk(client, app_id: str, user_id: str, apk_url: str, digest: Optional[str]) -> Query[bool]:
+        response = yield client.table('apps').update({
+            'apk_url': apk_url,
+            'apk_sha256': digest,
+            'updated_at': datetime.utcnow().isoformat(),
+        }).eq('id', app_id).eq('user_id', user_id)
+        return bool(response.data)
+
+
+def _run(query: Query[T]) -> T:
+    try:
+        request = next(query)
+        while True:
+            if isinstance(request, tuple):
+                response = tuple(item.execute() for item in request)
+            else:
+                response = request.execute()
+            request = query.send(response)
+    except StopIteration as done:
+        return done.value
+
+
+async def _arun(query: Query[T]) -> T:
+    try:
+        request = next(query)
+        while True:
+            if isinstance(request, tuple):
+                response = tuple(await asyncio.gather(*(item.execute() for item in request)))
+            else:
+                response = await request.execute()
+            request = query.send(response)
+    except StopIteration as done:
+        return done.value
+
+
+class SupabaseAppRepository(AppRepository):
+    def __init__(self, client: Client):
+        self.client = client
+
+    def get_user_apps(self, user_id: str, fields: Optional[List[str]] = None) -> List[AppResult]:
+        return _run(AppQueries.get_user_apps(self.client, user_id, fields))
+
+    def get_user_apps_page(self, user_id: str, limit: int, cursor: Optional[str] = None,
+                           fields: Optional[List[str]] = None) -> Tuple[List[AppResult], Optional[str]]:
+        return _run(AppQueries.get_user_apps_page(self.client, user_id, limit, cursor, fields))
+
+    def get_apps_by_ids(self, user_id: str, app_ids: List[str],
+                        fields: Optional[List[str]] = None) -> Dict[str, AppResult]:
+        return _run(AppQueries.get_apps_by_ids(self.client, user_id, app_ids, fields))
+
+    def get_app(self, app_id: str, user_id: str, fields: Optional[List[str]] = None) -> Optional[AppResult]:
+        return _run(AppQueries.get_app(self.client, app_id, user_id, fields))
+
+    def create_app(self, user_id: str, app_data: AppCreateRequest) -> AppResponse:
+        return self.create_apps(user_id, [app_data])[0]
+
+    def create_apps(self, user_id: str, apps_data: List[AppCreateRequest]) -> List[AppResponse]:
+        return _run(AppQueries.create_apps(self.client, user_id, apps_data))
+
+    def update_app(self, app_id: str, user_id: str, app_data: AppUpdateRequest) -> Optional[AppResponse]:
+        return _run(AppQueries.update_app(self.client, app_id, user_id, app_data))
+
+    def update_apps(self, user_id: str, items: List[AppBatchUpdateItem]) -> Dict[str, AppResponse]:
+        return _run(AppQueries.update_apps(self.client, user_id, items))
+
+    def delete_app(self, app_id: str, user_id: str) -> bool:
+        # Nothing deleted means 404
+        return bool(self.delete_apps(user_id, [app_id]))
+
+    def delete_apps(self, user_id: str, app_ids: List[str]) -> List[str]:
+        return _run(AppQueries.delete_apps(self.client, user_id, app_ids))
+
+    def get_app_changes(self, user_id: str, since: str) -> Tuple[List[AppResponse], List[AppTombstone]]:
+        return _run(AppQueries.get_app_changes(self.client, user_id, since))
+
+    def apk_object_exists(self, digest: str) -> bool:
+        return _run(AppQueries.apk_object_exists(self.client, digest))
+
+    def record_apk_object(self, digest: str, size: int):
+        _run(AppQueries.record_apk_object(self.client, digest, size))
+
+    def set_app_apk(self, app_id: str, user_id: str, apk_url: str, digest: Optional[str]) -> bool:
+        return _run(AppQueries.set_app_apk(self.client, app_id, user_id, apk_url, digest))
+
+
+class SupabaseAuthRepository(AuthRepository):
+    def __init__(self, client: Client):
+        self.client = client
+
+    def verify_token(self, token: str) -> Optional[str]:
+        response = self.client.auth.get_user(jwt=token)
+        return response.user.id if response.user else None
+
+
+def _signed_upload(signed: dict, path: str) -> dict:
+    # Storage fixes the lifetime of signed upload URLs (two hours); expires_in is informational
+    return {"signed_url": signed["signed_url"], "token": signed["token"], "path": path}
+
+
+def _object_size(info: dict) -> Optional[int]:
+    return info.get("size") or (info.get("metadata") or {}).get("size")
+
+
+class SupabaseStorageRepository(StorageRepository):
+    def __init__(self, client: Client, http_client: httpx.Client, url: str, service_role_key: str):
+        self.client = client
+        self.http_client = http_client
+        self.url = url
+        self.service_role_key = service_role_key
+
+    def upload(self, bucket: str, path: str, fileobj: BinaryIO):
+        # Raw-body upload through the shared pool; only one chunk is in memory at a time
+        response = self.http_client.post(
+            storage_object_url(self.url, bucket, path),
+            content=iter_chunks(fileobj),
+            headers=storage_upload_headers(self.service_role_key),
+        )
+        response.raise_for_status()
+
+    def public_url(self, bucket: str, path: str) -> str:
+        return self.client.storage.from_(bucket).get_public_url(path)
+
+    def create_signed_upload_url(self, bucket: str, path: str, expires_in: int) -> dict:
+        signed = self.client.storage.from_(bucket).create_signed_upload_url(
+            path, CreateSignedUploadUrlOptions(upsert="true")
+        )
+        return _signed_upload(signed, path)
+
+    def size(self, bucket: str, path: str) -> Optional[int]:
+        try:
+            info = self.client.storage.from_(bucket).info(path)
+        except StorageException:
+            return None
+        return _object_size(info)
+
+    def delete(self, bucket: str, path: str):
+        self.client.storage.from_(bucket).remove([path])
+
+    def move(self, bucket: str, from_path: str, to_path: str):
+        self.client.storage.from_(bucket).move(from_path, to_path)
+
+
+class AsyncSupabaseConnection:
+    """The async Supabase client of this worker, created on first use.
+
+    PostgREST and Storage share a single pooled httpx client (see
+    services/http_pool.py), so connections are reused across requests.
+    """
+
+    def __init__(self, url: str, service_role_key: str):
+        self.url = url
+        self.service_role_key = service_role_key
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[AsyncClient] = None
+        self._lock = asyncio.Lock()
+
+    async def client(self) -> AsyncClient:
+        if self._client is not None:
+            return self._client
+        async with self._lock:
+            if self._client is None:
+                http_client = create_async_http_client()
+                try:
+                    self._client = await acreate_client(
+                        self.url,
+                        self.service_role_key,
+                        options=AsyncClientOptions(httpx_client=http_client),
+                    )
+                except Exception as e:
+                    await http_client.aclose()
+                    print(f"Failed to initialize async Supabase client: {e}")
+                    raise
+                self.http_client = http_client
+                print("Async Supabase client initialized successfully")
+        return self._client
+
+    async def close(self):
+        if self.http_client is not None:
+            await self.http_client.aclose()
+        self._client = None
+        self.http_client = None
+
+
+class AsyncSupabaseAppRepository(AsyncAppRepository):
+    def __init__(self, connection: AsyncSupabaseConnection):
+        self.connection = connection
+
+    async def _run(self, query_method, *args):
+        return await _arun(query_method(await self.connection.client(), *args))
+
+    async def get_user_apps(self, user_id: str, fields: Optional[List[str]] = None) -> List[AppResult]:
+        return await self._run(AppQueries.get_user_apps, user_id, fields)
+
+    async def get_user_apps_page(self, user_id: str, limit: int, cursor: Optional[str] = None,
+                                 fields: Optional[List[str]] = None) -> Tuple[List[AppResult], Optional[str]]:
+        return await self._run(AppQueries.get_user_apps_page, user_id, limit, cursor, fields)
+
+    async def get_apps_by_ids(self, user_id: str, app_ids: List[str],
+                              fields: Optional[List[str]] = None) -> Dict[str, AppResult]:
+        return await self._run(AppQueries.get_apps_by_ids, user_id, app_ids, fields)
+
+    async def get_app(self, app_id: str, user_id: str, fields: Optional[List[str]] = None) -> Optional[AppResult]:
+        return await self._run(AppQueries.get_app, app_id, user_id, fields)
+
+    async def create_app(self, user_id: str, app_data: AppCreateRequest) -> AppResponse:
+        return (await self.create_apps(user_id, [app_data]))[0]
+
+    async def create_apps(self, user_id: str, apps_data: List[AppCreateRequest]) -> List[AppResponse]:
+        return await self._run(AppQueries.create_apps, user_id, apps_data)
+
+    async def update_app(self, app_id: str, user_id: str, app_data: AppUpdateRequest) -> Optional[AppResponse]:
+        return await self._run(AppQueries.update_app, app_id, user_id, app_data)
+
+    async def update_apps(self, user_id: str, items: List[AppBatchUpdateItem]) -> Dict[str, AppResponse]:
+        return await self._run(AppQueries.update_apps, user_id, items)
+
+    async def delete_app(self, app_id: str, user_id: str) -> bool:
+        return bool(await self.delete_apps(user_id, [app_id]))
+
+    async def delete_apps(self, user_id: str, app_ids: List[str]) -> List[str]:
+        return await self._run(AppQueries.delete_apps, user_id, app_ids)
+
+    async def get_app_changes(self, user_id: str, since: str) -> Tuple[List[AppResponse], List[AppTombstone]]:
+        return await self._run(AppQueries.get_app_changes, user_id, since)
+
+    async def apk_object_exists(self, digest: str) -> bool:
+        return await self._run(AppQueries.apk_object_exists, digest)
+
+    async def record_apk_object(self, digest: str, size: int):
+        await self._run(AppQueries.record_apk_object, digest, size)
+
+    async def set_app_apk(self, app_id: str, user_id: str, apk_url: str, digest: Optional[str]) -> bool:
+        return await self._run(AppQueries.set_app_apk, app_id, user_id, apk_url, digest)
+
+
+class AsyncSupabaseStorageRepository(AsyncStorageRepository):
+    def __init__(self, connection: AsyncSupabaseConnection):
+        self.connection = connection
+
+    async def upload(self, bucket: str, path: str, fileobj: BinaryIO):
+        await self.connection.client()
+        # Stream the file as the raw request body; each read runs in a thread
+        response = await self.connection.http_client.post(
+            storage_object_url(self.connection.url, bucket, path),
+            content=aiter_chunks(fileobj),
+            headers=storage_upload_headers(self.connection.service_role_key),
+        )
+        response.raise_for_status()
+
+    async def public_url(self, bucket: str, path: str) -> str:
+        client = await self.connection.client()
+        return await client.storage.from_(bucket).get_public_url(path)
+
+    async def create_signed_upload_url(self, bucket: str, path: str, expires_in: int) -> dict:
+        client = await self.connection.client()
+        signed = await client.storage.from_(bucket).create_signed_upload_url(
+            path, CreateSignedUploadUrlOptions(upsert="true")
+        )
+        return _signed_upload(signed, path)
+
+    async def size(self, bucket: str, path: str) -> Optional[int]:
+        client = await self.connection.client()
+        try:
+            info = await client.storage.from_(bucket).info(path)
+        except StorageException:
+            return None
+        return _object_size(info)
+
+    async def delete(self, bucket: str, path: str):
+        client = await self.connection.client()
+        await client.storage.from_(bucket).remove([path])
+
+    async def move(self, bucket: str, from_path: str, to_path: str):
+        client = await self.connection.client()
+        await client.storage.from_(bucket).move(from_path, to_path)
@@ -1,43 +1,166 @@
-from fastapi import APIRouter, HTTPException, Request, UploadFile, File
-from models.app import AppCreateRequest, AppUpdateRequest, AppResponse
-from services.supabase_service import SupabaseService
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, Response, UploadFile, File
+from models.app import (
+    AppCreateRequest, AppUpdateRequest, AppResponse, AppBatchCreateRequest,
+    AppBatchUpdateRequest, AppBatchDeleteRequest, ApkDigestRequest, ApkUploadSessionRequest, MAX_BATCH_SIZE,
+    parse_app_fields
+)
+from services.apk_upload import APK_CONTENT_TYPE, MAX_APK_BYTES, SIGNED_UPLOAD_TTL_SECONDS
+from services.async_supabase_service import AsyncSupabaseService
+from services.upload_sessions import OffsetMismatch, UploadSession, upload_sessions
+from services.etag import app_etag, apps_etag, conditional_response
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, parse_timestamp, timestamp_key
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import os
 
 router = APIRouter()
 
+# Rows are stamped with the database's transaction time, so a write that
+# commits late can carry a timestamp older than changes already returned.
+# Every delta call re-reads this window before `since`; clients apply changes
+# by id, so the repeated rows are harmless.
+CHANGES_OVERLAP_SECONDS = int(os.getenv("APP_CHANGES_OVERLAP_SECONDS", "5"))
+
 def get_current_user(request: Request) -> str:
     user_id = getattr(request.state, 'user', None)
     if not user_id:
         raise HTTPException(status_code=401, detail="Authentication required")
     return user_id
 
+def get_app_fields(fields: Optional[str]) -> Optional[List[str]]:
+    try:
+        return parse_app_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/apps", response_model=dict)
-async def get_user_apps(request: Request):
+async def get_user_apps(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    ids: Optional[str] = None,
+):
+    """List the user's apps.
+
+    `fields=name,icon,color,status` returns only those columns (plus id).
+    Passing `limit` and/or `cursor` returns one page, newest first, with the
+    cursor for the next page in `next_cursor` (null on the last page).
+    `ids=a,b,c` returns just those apps in the requested order, with ids that
+    don't exist (or aren't the user's) listed in `missing`.
+
+    Responses carry a strong ETag; a matching If-None-Match gets a 304.
+    """
     user_id = get_current_user(request)
+    app_fields = get_app_fields(fields)
+    if ids is not None:
+        if limit is not None or cursor is not None:
+            raise HTTPException(status_code=400, detail="ids cannot be combined with limit or cursor")
+        return await get_apps_by_ids(request, response, user_id, ids, app_fields)
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     try:
         print(f"Getting apps for user {user_id}")
-        apps = SupabaseService.get_user_apps(user_id)
+        if limit is None and cursor is None:
+            apps = await AsyncSupabaseService.get_user_apps(user_id, app_fields)
+            page = None
+        else:
+            apps, next_cursor = await AsyncSupabaseService.get_user_apps_page(
+                user_id, limit or DEFAULT_PAGE_SIZE, cursor, app_fields
+            )
+            page = {"next_cursor": next_cursor}
         print(f"Retrieved {len(apps)} apps")
+        not_modified = conditional_response(request, response, apps_etag(apps, fields, limit, cursor, page))
+        if not_modified:
+            return not_modified
         return {
             "success": True,
             "message": "Apps retrieved successfully.",
-            "data": [app.dict() for app in apps]
+            "data": [app.dict(exclude_unset=bool(app_fields)) for app in apps],
+            **(page or {})
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting apps: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve apps: {str(e)}")
 
+async def get_apps_by_ids(request: Request, response: Response, user_id: str, ids: str,
+                          app_fields: Optional[List[str]]):
+    app_ids = list(dict.fromkeys(app_id.strip() for app_id in ids.split(",") if app_id.strip()))
+    if not app_ids:
+        raise HTTPException(status_code=400, detail="ids must list at least one app id")
+    if len(app_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} ids per request")
+    try:
+        found = await AsyncSupabaseService.get_apps_by_ids(user_id, app_ids, app_fields)
+        apps = [found[app_id] for app_id in app_ids if app_id in found]
+        missing = [app_id for app_id in app_ids if app_id not in found]
+        not_modified = conditional_response(request, response, apps_etag(apps, app_fields, missing))
+        if not_modified:
+            return not_modified
+        return {
+            "success": True,
+            "message": "Apps retrieved successfully.",
+            "data": [app.dict(exclude_unset=bool(app_fields)) for app in apps],
+            "missing": missing
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve apps: {str(e)}")
+
+# Registered before /apps/{app_id} so "changes" isn't taken as an id
+@router.get("/apps/changes", response_model=dict)
+async def get_app_changes(request: Request, since: str):
+    """Delta sync: apps created or updated since `since`, plus ids deleted since then.
+
+    Pass the returned `next_since` as `since` on the next call. Changes from
+    the last CHANGES_OVERLAP_SECONDS before `since` are returned again.
+    """
+    user_id = get_current_user(request)
+    try:
+        since_at = parse_timestamp(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since must be an ISO 8601 timestamp")
+    try:
+        window_start = since_at - timedelta(seconds=CHANGES_OVERLAP_SECONDS)
+        changed, deleted = await AsyncSupabaseService.get_app_changes(user_id, window_start.isoformat())
+        timestamps = [since_at] + [app.updated_at for app in changed] + [tombstone.deleted_at for tombstone in deleted]
+        next_since = max(timestamp_key(timestamp) for timestamp in timestamps).isoformat()
+        return {
+            "success": True,
+            "message": "App changes retrieved successfully.",
+            "data": {
+                "changed": [app.dict() for app in changed],
+                "deleted": [tombstone.dict() for tombstone in deleted],
+                "next_since": next_since
+            }
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve app changes: {str(e)}")
+
 @router.get("/apps/{app_id}", response_model=dict)
-async def get_app(app_id: str, request: Request):
+async def get_app(app_id: str, request: Request, response: Response, fields: Optional[str] = None):
     user_id = get_current_user(request)
+    app_fields = get_app_fields(fields)
     try:
-        app = SupabaseService.get_app(app_id, user_id)
+        app = await AsyncSupabaseService.get_app(app_id, user_id, app_fields)
         if not app:
             raise HTTPException(status_code=404, detail="App not found or access denied")
+        not_modified = conditional_response(request, response, app_etag(app, app_fields))
+        if not_modified:
+            return not_modified
         return {
             "success": True,
             "message": "App retrieved successfully.",
-            "data": app.dict()
+            "data": app.dict(exclude_unset=bool(app_fields))
         }
     except HTTPException:
         raise
@@ -49,22 +172,94 @@ async def create_app(app_data: AppCreateRequest, request: Request):
     user_id = get_current_user(request)
     try:
         print(f"Creating app for user {user_id}: {app_data.dict()}")
-        new_app = SupabaseService.create_app(user_id, app_data)
+        new_app = await AsyncSupabaseService.create_app(user_id, app_data)
         print(f"App created successfully: {new_app.dict()}")
         return {
             "success": True,
             "message": "App created successfully.",
             "data": new_app.dict()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error creating app: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create app: {str(e)}")
 
+def reject_duplicate_ids(app_ids: List[str]):
+    if len(set(app_ids)) != len(app_ids):
+        raise HTTPException(status_code=400, detail="Duplicate app ids in batch")
+
+# Batch routes are registered before /apps/{app_id} so "batch" isn't taken as an id
+@router.post("/apps/batch", response_model=dict)
+async def create_apps(batch: AppBatchCreateRequest, request: Request):
+    """Create several apps with one bulk insert"""
+    user_id = get_current_user(request)
+    try:
+        new_apps = await AsyncSupabaseService.create_apps(user_id, batch.apps)
+        return {
+            "success": True,
+            "message": f"{len(new_apps)} apps created successfully.",
+            "data": [
+                {"index": index, "success": True, "data": app.dict(), "error": None}
+                for index, app in enumerate(new_apps)
+            ]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error creating apps: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to create apps: {str(e)}")
+
+@router.put("/apps/batch", response_model=dict)
+async def update_apps(batch: AppBatchUpdateRequest, request: Request):
+    """Update several apps; items with the same changes share one request"""
+    user_id = get_current_user(request)
+    reject_duplicate_ids([item.id for item in batch.apps])
+    try:
+        updated = await AsyncSupabaseService.update_apps(user_id, batch.apps)
+        results = [
+            {"id": item.id, "success": True, "data": updated[item.id].dict(), "error": None}
+            if item.id in updated else
+            {"id": item.id, "success": False, "data": None, "error": "App not found or access denied"}
+            for item in batch.apps
+        ]
+        return {
+            "success": True,
+            "message": f"{len(updated)} of {len(batch.apps)} apps updated.",
+            "data": results
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update apps: {str(e)}")
+
+@router.post("/apps/batch/delete", response_model=dict)
+async def delete_apps(batch: AppBatchDeleteRequest, request: Request):
+    """Delete several apps with one `in` filtered delete"""
+    user_id = get_current_user(request)
+    reject_duplicate_ids(batch.ids)
+    try:
+        deleted = set(await AsyncSupabaseService.delete_apps(user_id, batch.ids))
+        results = [
+            {"id": app_id, "success": app_id in deleted, "data": None,
+             "error": None if app_id in deleted else "App not found or access denied"}
+            for app_id in batch.ids
+        ]
+        return {
+            "success": True,
+            "message": f"{len(deleted)} of {len(batch.ids)} apps deleted.",
+            "data": results
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to delete apps: {str(e)}")
+
 @router.put("/apps/{app_id}", response_model=dict)
 async def update_app(app_id: str, app_data: AppUpdateRequest, request: Request):
     user_id = get_current_user(request)
     try:
-        updated_app = SupabaseService.update_app(app_id, user_id, app_data)
+        updated_app = await AsyncSupabaseService.update_app(app_id, user_id, app_data)
         if not updated_app:
             raise HTTPException(status_code=404, detail="App not found or access denied")
         return {
@@ -79,22 +274,234 @@ async def update_app(app_id: str, app_data: AppUpdateRequest, request: Request):
 
 @router.post("/apps/{app_id}/upload-apk", response_model=dict)
 async def upload_apk(app_id: str, file: UploadFile = File(...), request: Request = None):
+    """Upload the app's APK.
+
+    APKs are stored by SHA-256: if an identical build was uploaded before,
+    the app is pointed at the existing object and nothing is transferred
+    (`deduplicated` is true). Clients can skip the upload altogether by
+    comparing their build's digest with the app's `apk_sha256`, or by
+    calling PUT /apps/{app_id}/apk with the digest.
+    """
     user_id = get_current_user(request)
     try:
-        apk_url = SupabaseService.upload_apk(app_id, file)
+        if not await AsyncSupabaseService.get_app(app_id, user_id, ["id"]):
+            raise HTTPException(status_code=404, detail="App not found")
+        result = await AsyncSupabaseService.upload_apk(app_id, user_id, file)
+        if not result:
+            raise HTTPException(status_code=404, detail="App not found")
         return {
             "success": True,
             "message": "APK uploaded successfully.",
-            "data": {"apk_url": apk_url}
+            "data": result.dict()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload APK: {str(e)}")
 
+@router.put("/apps/{app_id}/apk", response_model=dict)
+async def set_app_apk(app_id: str, apk_data: ApkDigestRequest, request: Request):
+    """Point the app at an APK that is already stored, by its SHA-256.
+
+    Returns 404 if no APK with that digest exists yet; upload it instead.
+    """
+    user_id = get_current_user(request)
+    try:
+        if not await AsyncSupabaseService.apk_object_exists(apk_data.sha256):
+            raise HTTPException(status_code=404, detail="No stored APK with this digest")
+        result = await AsyncSupabaseService.set_app_apk(app_id, user_id, apk_data.sha256)
+        if not result:
+            raise HTTPException(status_code=404, detail="App not found")
+        result.deduplicated = True
+        return {
+            "success": True,
+            "message": "APK linked successfully.",
+            "data": result.dict()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to link APK: {str(e)}")
+
+# Direct uploads: the client PUTs the APK straight to Storage with a
+# short-lived signed URL, then calls /complete so we verify the object and
+# point the app at it. The bytes never pass through this process.
+
+@router.post("/apps/{app_id}/upload-apk/direct", response_model=dict)
+async def create_direct_upload(app_id: str, request: Request):
+    user_id = get_current_user(request)
+    try:
+        if not await AsyncSupabaseService.get_app(app_id, user_id, ["id"]):
+            raise HTTPException(status_code=404, detail="App not found")
+        signed = await AsyncSupabaseService.create_apk_upload_url(app_id)
+        return {
+            "success": True,
+            "message": "Upload URL created.",
+            "data": {
+                "upload_url": signed["signed_url"],
+                "method": "PUT",
+                "headers": {"Content-Type": APK_CONTENT_TYPE, "x-upsert": "true"},
+                "expires_in": SIGNED_UPLOAD_TTL_SECONDS,
+                "max_bytes": MAX_APK_BYTES,
+            }
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create upload URL: {str(e)}")
+
+@router.post("/apps/{app_id}/upload-apk/direct/complete", response_model=dict)
+async def complete_direct_upload(app_id: str, request: Request):
+    user_id = get_current_user(request)
+    try:
+        if not await AsyncSupabaseService.get_app(app_id, user_id, ["id"]):
+            raise HTTPException(status_code=404, detail="App not found")
+        result = await AsyncSupabaseService.complete_direct_upload(app_id, user_id)
+        if not result:
+            raise HTTPException(status_code=404, detail="App not found")
+        return {
+            "success": True,
+            "message": "APK uploaded successfully.",
+            "data": result.dict()
+        }
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to complete upload: {str(e)}")
+
+# Resumable uploads: create a session, PUT the APK in chunks with an
+# Upload-Offset header, check the committed offset after a dropped connection,
+# then finalize to stream the staged file to Storage.
+
+def upload_session_data(session: UploadSession) -> dict:
+    return {
+        "session_id": session.id,
+        "offset": upload_sessions.offset(session.id),
+        "total_size": session.total_size,
+        "expires_at": datetime.fromtimestamp(session.updated_at + upload_sessions.ttl, timezone.utc).isoformat(),
+    }
+
+def get_upload_session(session_id: str, app_id: str, user_id: str) -> UploadSession:
+    session = upload_sessions.get(session_id, app_id, user_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found or expired")
+    return session
+
+@router.post("/apps/{app_id}/upload-apk/sessions", response_model=dict, status_code=201)
+async def create_upload_session(app_id: str, session_data: ApkUploadSessionRequest, request: Request):
+    user_id = get_current_user(request)
+    try:
+        if not await AsyncSupabaseService.get_app(app_id, user_id, ["id"]):
+            raise HTTPException(status_code=404, detail="App not found")
+        session = upload_sessions.create(app_id, user_id, session_data.total_size)
+        return {
+            "success": True,
+            "message": "Upload session created.",
+            "data": upload_session_data(session)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create upload session: {str(e)}")
+
+@router.get("/apps/{app_id}/upload-apk/sessions/{session_id}", response_model=dict)
+async def get_upload_session_status(app_id: str, session_id: str, request: Request, response: Response):
+    user_id = get_current_user(request)
+    session = get_upload_session(session_id, app_id, user_id)
+    data = upload_session_data(session)
+    response.headers["Upload-Offset"] = str(data["offset"])
+    return {
+        "success": True,
+        "message": "Upload session retrieved.",
+        "data": data
+    }
+
+@router.put("/apps/{app_id}/upload-apk/sessions/{session_id}", response_model=dict)
+async def upload_chunk(app_id: str, session_id: str, request: Request, response: Response):
+    """Append the raw request body at the Upload-Offset header's position.
+
+    A mismatched offset gets a 409 carrying the committed offset in its own
+    Upload-Offset header, so the client can resume from there.
+    """
+    user_id = get_current_user(request)
+    session = get_upload_session(session_id, app_id, user_id)
+    try:
+        offset = int(request.headers["Upload-Offset"])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Upload-Offset header must be an integer")
+    try:
+        new_offset = await upload_sessions.append(session, offset, request.stream())
+    except OffsetMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Upload-Offset": str(e.offset)})
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to store upload chunk: {str(e)}")
+    response.headers["Upload-Offset"] = str(new_offset)
+    return {
+        "success": True,
+        "message": "Chunk stored.",
+        "data": upload_session_data(session)
+    }
+
+@router.post("/apps/{app_id}/upload-apk/sessions/{session_id}/finalize", response_model=dict)
+async def finalize_upload_session(app_id: str, session_id: str, request: Request):
+    """Stream the staged file to Storage and point the app at it.
+
+    Holds the session lock, so a chunk still being appended finishes first
+    and later appends find the session gone (see UploadSessionStore).
+    """
+    user_id = get_current_user(request)
+    session = get_upload_session(session_id, app_id, user_id)
+    async with upload_sessions.lock(session.id):
+        # Another finalize or a cancel may have won the lock
+        session = get_upload_session(session_id, app_id, user_id)
+        offset = upload_sessions.offset(session.id)
+        if not upload_sessions.is_complete(session):
+            raise HTTPException(
+                status_code=409,
+                detail=f"Upload incomplete: {offset} of {session.total_size} bytes received",
+                headers={"Upload-Offset": str(offset)},
+            )
+        if offset == 0:
+            raise HTTPException(status_code=400, detail="Upload session is empty")
+        try:
+            with open(upload_sessions.data_path(session.id), "rb") as staged:
+                result = await AsyncSupabaseService.store_apk(app_id, user_id, staged)
+            upload_sessions.delete(session.id)
+            if not result:
+                raise HTTPException(status_code=404, detail="App not found")
+            return {
+                "success": True,
+                "message": "APK uploaded successfully.",
+                "data": result.dict()
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to upload APK: {str(e)}")
+
+@router.delete("/apps/{app_id}/upload-apk/sessions/{session_id}", response_model=dict)
+async def cancel_upload_session(app_id: str, session_id: str, request: Request):
+    user_id = get_current_user(request)
+    session = get_upload_session(session_id, app_id, user_id)
+    async with upload_sessions.lock(session.id):
+        upload_sessions.delete(session.id)
+    return {
+        "success": True,
+        "message": "Upload session cancelled.",
+        "data": None
+    }
+
 @router.delete("/apps/{app_id}", response_model=dict)
 async def delete_app(app_id: str, request: Request):
     user_id = get_current_user(request)
     try:
-        success = SupabaseService.delete_app(app_id, user_id)
+        success = await AsyncSupabaseService.delete_app(app_id, user_id)
         if not success:
             raise HTTPException(status_code=404, detail="App not found or access denied")
         return {
@@ -0,0 +1,37 @@
+import hmac
+import os
+from fastapi import APIRouter, HTTPException, Request
+from services.token_cache import token_cache
+from services.app_cache import app_cache
+from services.preview_cache import preview_cache
+from services.executor_service import supabase_executor
+from services.http_pool import pool_settings
+
+router = APIRouter()
+
+# Admin token for the metrics endpoint, sent as X-Metrics-Token. Unset means
+# the endpoint is disabled.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+def require_metrics_token(request: Request):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    token = request.headers.get("X-Metrics-Token", "")
+    if not hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid metrics token")
+
+@router.get("/metrics", response_model=dict)
+async def get_metrics(request: Request):
+    """In-process counters for sizing caches and pools"""
+    require_metrics_token(request)
+    return {
+        "success": True,
+        "message": "Metrics retrieved successfully.",
+        "data": {
+            "token_cache": token_cache.stats(),
+            "app_cache": app_cache.stats(),
+            "preview_cache": preview_cache.stats(),
+            "supabase_executor": supabase_executor.stats(),
+            "http_pool": pool_settings(),
+        }
+    }
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+from services.apk_upload import APK_CONTENT_TYPE
+from repositories.local import local_storage
+from services.supabase_service import storage_repository
+
+# Local stand-in for the Supabase Storage endpoints that signed upload URLs
+# and public APK URLs point at. Only active with the local (SQLite) backend.
+router = APIRouter()
+
+def require_local_storage():
+    if storage_repository is not local_storage:
+        raise HTTPException(status_code=404, detail="Not found")
+
+@router.put("/storage/upload/{bucket}/{path:path}", response_model=dict)
+async def upload_object(bucket: str, path: str, token: str, request: Request):
+    require_local_storage()
+    if not local_storage.verify_upload_token(bucket, path, token):
+        raise HTTPException(status_code=403, detail="Invalid or expired upload token")
+    try:
+        size = await local_storage.write(bucket, path, request.stream())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"Key": f"{bucket}/{path}", "size": size}
+
+@router.get("/storage/public/{bucket}/{path:path}")
+async def get_object(bucket: str, path: str):
+    require_local_storage()
+    try:
+        file_path = local_storage.file_path(bucket, path)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Object not found")
+    if local_storage.size(bucket, path) is None:
+        raise HTTPException(status_code=404, detail="Object not found")
+    return FileResponse(file_path, media_type=APK_CONTENT_TYPE)
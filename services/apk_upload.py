@@ -0,0 +1,100 @@
+import hashlib
+import os
+import uuid
+from typing import AsyncIterator, BinaryIO, Iterator, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+APK_BUCKET = 'apks'
+APK_CONTENT_TYPE = "application/vnd.android.package-archive"
+# Largest APK accepted, enforced while streaming (the client's size is not trusted)
+MAX_APK_BYTES = int(os.getenv("APK_MAX_BYTES", str(200 * 1024 * 1024)))
+# Bytes held in memory per upload at any time
+APK_CHUNK_BYTES = int(os.getenv("APK_UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+# Storage's signed upload URLs are valid for two hours
+SIGNED_UPLOAD_TTL_SECONDS = 2 * 3600
+
+
+class ApkTooLarge(HTTPException):
+    def __init__(self, max_bytes: int = MAX_APK_BYTES):
+        super().__init__(status_code=413, detail=f"APK exceeds the maximum size of {max_bytes} bytes")
+
+
+def check_declared_size(file, max_bytes: int = MAX_APK_BYTES):
+    """Reject early when the multipart part already tells us it's too big"""
+    size = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise ApkTooLarge(max_bytes)
+
+
+def iter_chunks(fileobj: BinaryIO, max_bytes: int = MAX_APK_BYTES,
+                chunk_size: int = APK_CHUNK_BYTES) -> Iterator[bytes]:
+    total = 0
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        total += len(chunk)
+        if total > max_bytes:
+            raise ApkTooLarge(max_bytes)
+        yield chunk
+
+
+async def aiter_chunks(fileobj: BinaryIO, max_bytes: int = MAX_APK_BYTES,
+                       chunk_size: int = APK_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Same as iter_chunks, with each read of the local file run in a thread"""
+    total = 0
+    while True:
+        chunk = await run_in_threadpool(fileobj.read, chunk_size)
+        if not chunk:
+            return
+        total += len(chunk)
+        if total > max_bytes:
+            raise ApkTooLarge(max_bytes)
+        yield chunk
+
+
+def apk_object_path(digest: str) -> str:
+    """APKs are stored content-addressed, so identical builds share one object"""
+    return f"sha256/{digest}.apk"
+
+
+def direct_apk_path(app_id: str) -> str:
+    """Object written by clients through a signed upload URL (not hashed by us)"""
+    return f"{app_id}.apk"
+
+
+def verified_apk_path(app_id: str) -> str:
+    """Where a direct upload is moved once verified.
+
+    No signed URL is ever issued for it, so a client still holding one for
+    direct_apk_path can't overwrite the APK the app points at.
+    """
+    return f"verified/{app_id}/{uuid.uuid4().hex}.apk"
+
+
+def hash_file(fileobj: BinaryIO, max_bytes: int = MAX_APK_BYTES) -> Tuple[str, int]:
+    """SHA-256 and size of a local (spooled or staged) file; rewinds it for the upload"""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter_chunks(fileobj, max_bytes):
+        digest.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+def storage_object_url(supabase_url: str, bucket: str, path: str) -> str:
+    return f"{supabase_url.rstrip('/')}/storage/v1/object/{bucket}/{path}"
+
+
+def storage_upload_headers(service_role_key: str) -> dict:
+    # Raw-body upload: Storage reads the request body as the object, so it can
+    # be sent with chunked transfer encoding instead of a buffered multipart form
+    return {
+        "Authorization": f"Bearer {service_role_key}",
+        "apikey": service_role_key,
+        "Content-Type": APK_CONTENT_TYPE,
+        "x-upsert": "true",
+    }
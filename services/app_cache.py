@@ -0,0 +1,100 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+
+class AppCache:
+    """In-process LRU for app reads with a TTL and a byte budget.
+
+    Keys are tuples whose second element is the owning user id: single apps
+    are ("app", user_id, app_id), anything else is treated as a list of the
+    user's apps and dropped on every write by that user. Each user also has a
+    generation counter: a read that started before an invalidation won't
+    store its (stale) result.
+
+    The cache is per worker process; other workers converge within the TTL.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 60):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int, float]]" = OrderedDict()
+        self._user_keys: Dict[str, Set[Tuple]] = {}
+        self._generations: Dict[str, int] = {}
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self, user_id: str) -> int:
+        return self._generations.get(user_id, 0)
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, _, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Tuple[Hashable, ...], value: Any, size: int, generation: int):
+        user_id = key[1]
+        if generation != self.generation(user_id) or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl)
+        self._user_keys.setdefault(user_id, set()).add(key)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, user_id: str, *app_ids: str):
+        """Drop a user's cached lists, plus the single-app entries for app_ids."""
+        self._generations[user_id] = self.generation(user_id) + 1
+        for key in list(self._user_keys.get(user_id, ())):
+            if key[0] != "app" or key[2] in app_ids:
+                self._remove(key)
+        self.invalidations += 1
+
+    def _remove(self, key: Tuple):
+        value, size, _ = self._entries.pop(key)
+        self.size_bytes -= size
+        keys = self._user_keys.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[key[1]]
+
+    def clear(self):
+        self._entries.clear()
+        self._user_keys.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+app_cache = AppCache(
+    max_bytes=int(os.getenv("APP_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl=float(os.getenv("APP_CACHE_TTL_SECONDS", "60")),
+)
@@ -0,0 +1,329 @@
+import os
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from models.app import ApkUploadResult, AppResponse, AppCreateRequest, AppUpdateRequest, AppBatchUpdateItem, AppSummary, AppTombstone, project_app
+from services.apk_upload import (
+    APK_BUCKET, MAX_APK_BYTES, SIGNED_UPLOAD_TTL_SECONDS, ApkTooLarge, apk_object_path, check_declared_size,
+    direct_apk_path, hash_file, verified_apk_path
+)
+from services.app_cache import app_cache
+from services.executor_service import supabase_executor
+from services.pagination import KEYSET_FIELDS, paginate
+from repositories.base import AsyncAppRepository, AsyncStorageRepository
+from repositories.executor import ExecutorAppRepository, ExecutorStorageRepository
+from repositories.supabase import AsyncSupabaseAppRepository, AsyncSupabaseConnection, AsyncSupabaseStorageRepository
+from services.supabase_service import (
+    DATA_BACKEND, app_repository, storage_repository, supabase_url, supabase_service_role_key
+)
+
+# "async" uses the async Supabase repositories; "executor" runs the sync
+# repositories on a bounded thread pool instead.
+DATA_MODE = os.getenv("SUPABASE_DATA_MODE", "async").lower()
+
+async_app_repository: AsyncAppRepository
+async_storage_repository: AsyncStorageRepository
+supabase_connection: Optional[AsyncSupabaseConnection] = None
+if DATA_BACKEND == "supabase" and DATA_MODE != "executor":
+    # One async Supabase client per worker process, created on first use.
+    # PostgREST and Storage share a single pooled httpx client (see
+    # services/http_pool.py), so connections are reused across requests.
+    supabase_connection = AsyncSupabaseConnection(supabase_url, supabase_service_role_key)
+    async_app_repository = AsyncSupabaseAppRepository(supabase_connection)
+    async_storage_repository = AsyncSupabaseStorageRepository(supabase_connection)
+else:
+    # SQLite has no async driver, so it always runs on the executor
+    async_app_repository = ExecutorAppRepository(app_repository, supabase_executor)
+    async_storage_repository = ExecutorStorageRepository(storage_repository, supabase_executor)
+
+
+async def close_client():
+    if supabase_connection is not None:
+        await supabase_connection.close()
+
+
+def _cache_size(apps: List[Union[AppResponse, AppSummary]]) -> int:
+    # Serialized size plus a flat per-entry overhead, so empty lists count too
+    return 64 + sum(len(app.model_dump_json()) for app in apps)
+
+
+class AsyncSupabaseService:
+    """Async counterpart of SupabaseService used by the API routes.
+
+    SupabaseService stays the sync API for scripts. Both go through the
+    repositories of the configured backend (DATA_BACKEND), so every query is
+    written once, in repositories/. Reads go through app_cache; every write
+    invalidates the affected user's entries.
+    """
+    @staticmethod
+    async def get_user_apps(user_id: str, fields: Optional[List[str]] = None) -> List[Union[AppResponse, AppSummary]]:
+        if fields:
+            # A cached full list already has every column; project it locally
+            full = app_cache.get(("apps", user_id))
+            if full is not None:
+                return [project_app(app, fields) for app in full]
+        key = ("apps", user_id, tuple(fields)) if fields else ("apps", user_id)
+        cached = app_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = app_cache.generation(user_id)
+        apps = await AsyncSupabaseService._fetch_user_apps(user_id, fields)
+        if apps is None:
+            return []
+        app_cache.set(key, apps, _cache_size(apps), generation)
+        return apps
+
+    @staticmethod
+    async def get_user_apps_page(user_id: str, limit: int, cursor: Optional[str] = None,
+                                 fields: Optional[List[str]] = None) -> Tuple[List[Union[AppResponse, AppSummary]], Optional[str]]:
+        if fields:
+            fields = fields + [field for field in KEYSET_FIELDS if field not in fields]
+        full = app_cache.get(("apps", user_id))
+        if full is not None:
+            page, cursor_out = paginate(full, limit, cursor)
+            return ([project_app(app, fields) for app in page] if fields else page), cursor_out
+        key = ("apps", user_id, tuple(fields or ()), limit, cursor)
+        cached = app_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = app_cache.generation(user_id)
+        result = await AsyncSupabaseService._fetch_user_apps_page(user_id, limit, cursor, fields)
+        if result is None:
+            return [], None
+        app_cache.set(key, result, _cache_size(result[0]), generation)
+        return result
+
+    @staticmethod
+    async def get_app(app_id: str, user_id: str, fields: Optional[List[str]] = None) -> Optional[Union[AppResponse, AppSummary]]:
+        if fields:
+            full = app_cache.get(("app", user_id, app_id))
+            if full is not None:
+                return project_app(full, fields)
+        key = ("app", user_id, app_id, tuple(fields)) if fields else ("app", user_id, app_id)
+        cached = app_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = app_cache.generation(user_id)
+        app = await AsyncSupabaseService._fetch_app(app_id, user_id, fields)
+        if app:
+            app_cache.set(key, app, _cache_size([app]), generation)
+        return app
+
+    @staticmethod
+    async def get_apps_by_ids(user_id: str, app_ids: List[str],
+                              fields: Optional[List[str]] = None) -> Dict[str, Union[AppResponse, AppSummary]]:
+        """Serve cached apps directly and fetch the rest with a single `in_` query"""
+        found = {}
+        for app_id in app_ids:
+            cached = app_cache.get(("app", user_id, app_id))
+            if cached is not None:
+                found[app_id] = project_app(cached, fields) if fields else cached
+        missing = [app_id for app_id in app_ids if app_id not in found]
+        if not missing:
+            return found
+
+        generation = app_cache.generation(user_id)
+        # Fetched with every column so the rows can populate the per-app cache
+        fetched = await AsyncSupabaseService._fetch_apps_by_ids(user_id, missing)
+        for app_id, app in fetched.items():
+            app_cache.set(("app", user_id, app_id), app, _cache_size([app]), generation)
+            found[app_id] = project_app(app, fields) if fields else app
+        return found
+
+    @staticmethod
+    async def _fetch_user_apps(user_id: str, fields: Optional[List[str]] = None) -> Optional[List[Union[AppResponse, AppSummary]]]:
+        try:
+            return await async_app_repository.get_user_apps(user_id, fields)
+        except HTTPException:
+            # Such as ExecutorSaturated (503): answering with an empty list or a
+            # 404 instead would tell a syncing client its apps are gone
+            raise
+        except Exception as e:
+            print(f"Failed to get user apps: {e}")
+            return None
+
+    @staticmethod
+    async def _fetch_user_apps_page(user_id: str, limit: int, cursor: Optional[str],
+                                    fields: Optional[List[str]]) -> Optional[Tuple[List[Union[AppResponse, AppSummary]], Optional[str]]]:
+        try:
+            return await async_app_repository.get_user_apps_page(user_id, limit, cursor, fields)
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Failed to get user apps page: {e}")
+            return None
+
+    @staticmethod
+    async def _fetch_apps_by_ids(user_id: str, app_ids: List[str]) -> Dict[str, AppResponse]:
+        try:
+            return await async_app_repository.get_apps_by_ids(user_id, app_ids)
+        except Exception as e:
+            print(f"Failed to get apps by ids: {e}")
+            raise
+
+    @staticmethod
+    async def _fetch_app(app_id: str, user_id: str, fields: Optional[List[str]] = None) -> Optional[Union[AppResponse, AppSummary]]:
+        try:
+            return await async_app_repository.get_app(app_id, user_id, fields)
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Failed to get app: {e}")
+            return None
+
+    @staticmethod
+    async def create_app(user_id: str, app_data: AppCreateRequest) -> AppResponse:
+        try:
+            return await async_app_repository.create_app(user_id, app_data)
+        except Exception as e:
+            print(f"Failed to create app: {e}")
+            raise
+        finally:
+            app_cache.invalidate(user_id)
+
+    @staticmethod
+    async def update_app(app_id: str, user_id: str, app_data: AppUpdateRequest) -> Optional[AppResponse]:
+        try:
+            return await async_app_repository.update_app(app_id, user_id, app_data)
+        except Exception as e:
+            print(f"Failed to update app: {e}")
+            raise
+        finally:
+            app_cache.invalidate(user_id, app_id)
+
+    @staticmethod
+    async def upload_apk(app_id: str, user_id: str, file) -> Optional[ApkUploadResult]:
+        check_declared_size(file)
+        return await AsyncSupabaseService.store_apk(app_id, user_id, file.file)
+
+    @staticmethod
+    async def store_apk(app_id: str, user_id: str, fileobj: BinaryIO) -> Optional[ApkUploadResult]:
+        """Hash a local file, upload it unless an identical APK is already stored, and point the app at it.
+
+        Returns None if the app doesn't exist or isn't the user's.
+        """
+        try:
+            # The file is already local, so hashing it first costs a disk read
+            # and lets an identical APK skip the transfer entirely
+            digest, size = await run_in_threadpool(hash_file, fileobj)
+            deduplicated = await async_app_repository.apk_object_exists(digest)
+            if not deduplicated:
+                await async_storage_repository.upload(APK_BUCKET, apk_object_path(digest), fileobj)
+                await async_app_repository.record_apk_object(digest, size)
+            result = await AsyncSupabaseService._point_app_apk(app_id, user_id, apk_object_path(digest), digest)
+            if result:
+                result.apk_size = size
+                result.deduplicated = deduplicated
+            return result
+        except Exception as e:
+            print(f"Failed to upload APK: {e}")
+            raise
+        finally:
+            app_cache.invalidate(user_id, app_id)
+
+    @staticmethod
+    async def apk_object_exists(digest: str) -> bool:
+        return await async_app_repository.apk_object_exists(digest)
+
+    @staticmethod
+    async def set_app_apk(app_id: str, user_id: str, digest: str) -> Optional[ApkUploadResult]:
+        """Point the app at an already-stored APK without transferring it"""
+        try:
+            return await AsyncSupabaseService._point_app_apk(app_id, user_id, apk_object_path(digest), digest)
+        finally:
+            app_cache.invalidate(user_id, app_id)
+
+    @staticmethod
+    async def _point_app_apk(app_id: str, user_id: str, path: str,
+                             digest: Optional[str] = None) -> Optional[ApkUploadResult]:
+        apk_url = await async_storage_repository.public_url(APK_BUCKET, path)
+        if not await async_app_repository.set_app_apk(app_id, user_id, apk_url, digest):
+            return None
+        return ApkUploadResult(apk_url=apk_url, apk_sha256=digest)
+
+    @staticmethod
+    async def create_apk_upload_url(app_id: str) -> dict:
+        return await async_storage_repository.create_signed_upload_url(
+            APK_BUCKET, direct_apk_path(app_id), SIGNED_UPLOAD_TTL_SECONDS
+        )
+
+    @staticmethod
+    async def complete_direct_upload(app_id: str, user_id: str) -> Optional[ApkUploadResult]:
+        """Verify the APK a client uploaded through a signed URL and point the app at it.
+
+        The object is first moved to a path no signed URL is issued for, so
+        the client's URL (valid for two hours) can't swap the bytes after the
+        size check or once the app points at them. The bytes never passed
+        through us, so there is no digest to record: apk_sha256 is cleared.
+        Raises ApkTooLarge for an oversized object, which is deleted first,
+        and LookupError if nothing was uploaded.
+        """
+        try:
+            if await async_storage_repository.size(APK_BUCKET, direct_apk_path(app_id)) is None:
+                raise LookupError("APK has not been uploaded")
+            path = verified_apk_path(app_id)
+            await async_storage_repository.move(APK_BUCKET, direct_apk_path(app_id), path)
+            size = await async_storage_repository.size(APK_BUCKET, path)
+            if size > MAX_APK_BYTES:
+                # Best effort: the client is told to retry smaller either way
+                try:
+                    await async_storage_repository.delete(APK_BUCKET, path)
+                except Exception as e:
+                    print(f"Failed to delete oversized APK: {e}")
+                raise ApkTooLarge()
+            result = await AsyncSupabaseService._point_app_apk(app_id, user_id, path)
+            if result:
+                result.apk_size = size
+            return result
+        finally:
+            app_cache.invalidate(user_id, app_id)
+
+    @staticmethod
+    async def delete_app(app_id: str, user_id: str) -> bool:
+        try:
+            return await async_app_repository.delete_app(app_id, user_id)
+        except Exception as e:
+            print(f"Failed to delete app: {e}")
+            raise
+        finally:
+            app_cache.invalidate(user_id, app_id)
+
+    @staticmethod
+    async def create_apps(user_id: str, apps_data: List[AppCreateRequest]) -> List[AppResponse]:
+        try:
+            return await async_app_repository.create_apps(user_id, apps_data)
+        except Exception as e:
+            print(f"Failed to create apps: {e}")
+            raise
+        finally:
+            app_cache.invalidate(user_id)
+
+    @staticmethod
+    async def update_apps(user_id: str, items: List[AppBatchUpdateItem]) -> Dict[str, AppResponse]:
+        try:
+            return await async_app_repository.update_apps(user_id, items)
+        except Exception as e:
+            print(f"Failed to update apps: {e}")
+            raise
+        finally:
+            app_cache.invalidate(user_id, *(item.id for item in items))
+
+    @staticmethod
+    async def delete_apps(user_id: str, app_ids: List[str]) -> List[str]:
+        try:
+            return await async_app_repository.delete_apps(user_id, app_ids)
+        except Exception as e:
+            print(f"Failed to delete apps: {e}")
+            raise
+        finally:
+            app_cache.invalidate(user_id, *app_ids)
+
+    @staticmethod
+    async def get_app_changes(user_id: str, since: str) -> Tuple[List[AppResponse], List[AppTombstone]]:
+        try:
+            return await async_app_repository.get_app_changes(user_id, since)
+        except Exception as e:
+            print(f"Failed to get app changes: {e}")
+            raise
@@ -0,0 +1,58 @@
+import gzip
+from typing import Dict, Iterable, Optional
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Variants are compressed once and then served many times, so favour ratio
+# over speed
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+# In order of preference when the client accepts several equally
+ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Compressed copies of body, keeping only those smaller than it"""
+    variants = {}
+    for encoding in ENCODINGS:
+        if encoding == "br":
+            data = brotli.compress(body, quality=BROTLI_QUALITY)
+        else:
+            data = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(data) < len(body):
+            variants[encoding] = data
+    return variants
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """Best of the available encodings per Accept-Encoding; None means identity"""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """Distinct strong ETag per content coding, as each is a different representation"""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
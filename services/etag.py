@@ -0,0 +1,61 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+# Responses may be stored by the client but must be revalidated each time
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given parts (order matters)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, datetime):
+            part = part.isoformat()
+        digest.update(str(part).encode())
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _version(app) -> str:
+    # updated_at changes on every write; projections without it fall back to
+    # hashing the projected content itself
+    updated_at = getattr(app, "updated_at", None)
+    return updated_at.isoformat() if updated_at else app.model_dump_json()
+
+
+def app_etag(app, *extra) -> str:
+    return make_etag(app.id, _version(app), *extra)
+
+
+def apps_etag(apps: Iterable, *extra) -> str:
+    return make_etag(*(f"{app.id}@{_version(app)}" for app in apps), "|", *extra)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header.split(",")]
+    return any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def validator_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag))
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set validators on `response`; return a 304 if the client's copy is current."""
+    response.headers.update(validator_headers(etag))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return None
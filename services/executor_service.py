@@ -0,0 +1,116 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from fastapi import HTTPException
+
+
+class ExecutorSaturated(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=503, detail="Server is busy, please retry shortly")
+
+
+class _MethodStats:
+    __slots__ = ("calls", "errors", "rejected", "wait_total", "wait_max", "exec_total", "exec_max")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.exec_total = 0.0
+        self.exec_max = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "queue_wait_avg_ms": round(self.wait_total / self.calls * 1000, 3) if self.calls else 0.0,
+            "queue_wait_max_ms": round(self.wait_max * 1000, 3),
+            "exec_avg_ms": round(self.exec_total / self.calls * 1000, 3) if self.calls else 0.0,
+            "exec_max_ms": round(self.exec_max * 1000, 3),
+        }
+
+    def record(self, wait: float, elapsed: float):
+        self.calls += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.exec_total += elapsed
+        self.exec_max = max(self.exec_max, elapsed)
+
+
+class BoundedExecutor:
+    """Thread pool for blocking calls with a hard cap on queued work.
+
+    At most `max_workers` calls run at once and `max_queue` more may wait;
+    anything beyond that is rejected with ExecutorSaturated (503) instead of
+    piling up behind a slow backend.
+    """
+
+    def __init__(self, max_workers: int = 16, max_queue: int = 64, name: str = "executor"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._stats: Dict[str, _MethodStats] = {}
+
+    async def run(self, name: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        stats = self._stats.setdefault(name, _MethodStats())
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                stats.rejected += 1
+                raise ExecutorSaturated()
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self._active += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._active -= 1
+                    stats.record(started - submitted, finished - started)
+
+        future = self._executor.submit(call)
+        # Released when the call really ends (or is cancelled before starting),
+        # not when the awaiting request gives up: the thread of a cancelled
+        # request keeps running and still counts against the bound.
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception:
+            stats.errors += 1
+            raise
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> dict:
+        active = self._active
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": active,
+            "queued": max(self._pending - active, 0),
+            "utilization": round(active / self.max_workers, 3),
+            "methods": {name: stats.as_dict() for name, stats in self._stats.items()},
+        }
+
+
+supabase_executor = BoundedExecutor(
+    max_workers=int(os.getenv("SUPABASE_EXECUTOR_WORKERS", "16")),
+    max_queue=int(os.getenv("SUPABASE_EXECUTOR_QUEUE_DEPTH", "64")),
+    name="supabase",
+)
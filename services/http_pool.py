@@ -0,0 +1,57 @@
+import os
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (httpx only negotiates HTTP/2 when h2 is installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Pool settings shared by every Supabase client in this worker. Bounding the
+# pool caps connections per worker; keep-alive amortizes TLS handshakes.
+MAX_CONNECTIONS = int(os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SUPABASE_HTTP_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+CONNECT_TIMEOUT = float(os.getenv("SUPABASE_HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+READ_TIMEOUT = float(os.getenv("SUPABASE_HTTP_READ_TIMEOUT_SECONDS", "30"))
+WRITE_TIMEOUT = float(os.getenv("SUPABASE_HTTP_WRITE_TIMEOUT_SECONDS", "60"))
+POOL_TIMEOUT = float(os.getenv("SUPABASE_HTTP_POOL_TIMEOUT_SECONDS", "5"))
+HTTP2_ENABLED = HTTP2_AVAILABLE and os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+
+
+def _client_kwargs() -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(
+            connect=CONNECT_TIMEOUT,
+            read=READ_TIMEOUT,
+            write=WRITE_TIMEOUT,
+            pool=POOL_TIMEOUT,
+        ),
+        "http2": HTTP2_ENABLED,
+        "follow_redirects": True,
+    }
+
+
+def create_sync_http_client() -> httpx.Client:
+    return httpx.Client(**_client_kwargs())
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(**_client_kwargs())
+
+
+def pool_settings() -> dict:
+    return {
+        "max_connections": MAX_CONNECTIONS,
+        "max_keepalive_connections": MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry_seconds": KEEPALIVE_EXPIRY,
+        "connect_timeout_seconds": CONNECT_TIMEOUT,
+        "read_timeout_seconds": READ_TIMEOUT,
+        "http2": HTTP2_ENABLED,
+    }
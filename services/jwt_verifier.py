@@ -0,0 +1,106 @@
+import os
+from typing import Optional
+
+import jwt
+from jwt import PyJWKClient
+
+# Supabase signs access tokens either with the project JWT secret (HS256) or,
+# for projects on asymmetric signing keys, with a key published in the JWKS.
+SYMMETRIC_ALGORITHMS = ["HS256"]
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256"]
+
+
+class TokenVerificationUnavailable(Exception):
+    """Local verification cannot decide on this token (no key material or JWKS unreachable)."""
+
+
+class LocalTokenVerifier:
+    def __init__(
+        self,
+        jwt_secret: Optional[str] = None,
+        jwks_url: Optional[str] = None,
+        audience: str = "authenticated",
+        leeway: int = 0,
+        jwks_cache_lifespan: int = 600,
+    ):
+        self.jwt_secret = jwt_secret
+        self.jwks_url = jwks_url
+        self.audience = audience
+        self.leeway = leeway
+        self._jwks_client = (
+            PyJWKClient(jwks_url, cache_keys=True, lifespan=jwks_cache_lifespan)
+            if jwks_url else None
+        )
+
+    @classmethod
+    def from_env(cls) -> "LocalTokenVerifier":
+        supabase_url = os.getenv("SUPABASE_URL")
+        default_jwks_url = f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json" if supabase_url else None
+        return cls(
+            jwt_secret=os.getenv("SUPABASE_JWT_SECRET") or None,
+            jwks_url=os.getenv("SUPABASE_JWKS_URL") or default_jwks_url,
+            audience=os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated"),
+            leeway=int(os.getenv("SUPABASE_JWT_LEEWAY_SECONDS", "0")),
+            jwks_cache_lifespan=int(os.getenv("SUPABASE_JWKS_CACHE_SECONDS", "600")),
+        )
+
+    def remote_fallback_from_env(self) -> bool:
+        """Whether to ask Supabase Auth when local verification cannot decide.
+
+        Defaults to on without a JWT secret: HS256 tokens can then only be
+        checked remotely, and the default JWKS URL (set as soon as SUPABASE_URL
+        is) would otherwise leave HS256 projects rejecting every token.
+        """
+        default = "false" if self.jwt_secret else "true"
+        return os.getenv("SUPABASE_AUTH_REMOTE_FALLBACK", default).lower() == "true"
+
+    def is_configured(self) -> bool:
+        return bool(self.jwt_secret or self._jwks_client)
+
+    def verify_claims(self, token: str) -> Optional[dict]:
+        """Return the verified claims, or None if the token is invalid.
+
+        Raises TokenVerificationUnavailable when no key is available for the
+        token's algorithm, so the caller can decide whether to ask Supabase Auth.
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError as e:
+            print(f"Malformed token: {e}")
+            return None
+
+        algorithm = header.get("alg")
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            if not self.jwt_secret:
+                raise TokenVerificationUnavailable("SUPABASE_JWT_SECRET is not set")
+            key = self.jwt_secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            if not self._jwks_client:
+                raise TokenVerificationUnavailable("No JWKS URL configured")
+            try:
+                key = self._jwks_client.get_signing_key_from_jwt(token).key
+            except jwt.PyJWKClientConnectionError as e:
+                raise TokenVerificationUnavailable(f"JWKS fetch failed: {e}")
+            except jwt.PyJWKClientError as e:
+                print(f"No signing key for token: {e}")
+                return None
+        else:
+            print(f"Unsupported token algorithm: {algorithm}")
+            return None
+
+        try:
+            return jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self.audience,
+                leeway=self.leeway,
+                options={"require": ["exp", "sub", "aud"]},
+            )
+        except jwt.InvalidTokenError as e:
+            print(f"Token verification failed: {e}")
+            return None
+
+    def verify(self, token: str) -> Optional[str]:
+        claims = self.verify_claims(token)
+        return claims["sub"] if claims else None
@@ -0,0 +1,90 @@
+import base64
+import json
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# App lists are ordered newest first on (updated_at, id); the cursor is the
+# position of the last item returned, so the next page is a range query
+# rather than an OFFSET scan.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+KEYSET_FIELDS = ["updated_at", "id"]
+
+# "+hh:mm" offset whose "+" arrived as a space (unencoded query string)
+_SPACED_OFFSET = re.compile(r" (\d{2}(?::?\d{2})?)$")
+
+
+def _isoformat(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def encode_cursor(updated_at, app_id: str) -> str:
+    raw = json.dumps([_isoformat(updated_at), app_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Return (updated_at, id) from an opaque cursor; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, app_id = json.loads(raw)
+        datetime.fromisoformat(updated_at)
+        return updated_at, str(app_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_filter(cursor: str) -> str:
+    """PostgREST `or` filter selecting rows after the cursor in (updated_at desc, id desc) order."""
+    updated_at, app_id = decode_cursor(cursor)
+    return f'updated_at.lt."{updated_at}",and(updated_at.eq."{updated_at}",id.lt."{app_id}")'
+
+
+def next_cursor(items: Sequence, limit: int) -> Tuple[List, Optional[str]]:
+    """Trim a `limit + 1` result to one page and build the cursor for the next one."""
+    if len(items) <= limit:
+        return list(items), None
+    page = list(items[:limit])
+    last = page[-1]
+    return page, encode_cursor(last.updated_at, last.id)
+
+
+def paginate(items: Sequence[T], limit: int, cursor: Optional[str] = None) -> Tuple[List[T], Optional[str]]:
+    """Apply the same keyset ordering to an in-memory list."""
+    ordered = sorted(items, key=lambda item: (timestamp_key(item.updated_at), item.id), reverse=True)
+    if cursor:
+        updated_at, app_id = decode_cursor(cursor)
+        position = (timestamp_key(updated_at), app_id)
+        ordered = [item for item in ordered if (timestamp_key(item.updated_at), item.id) < position]
+    return next_cursor(ordered, limit)
+
+
+def timestamp_key(value) -> datetime:
+    """Timezone-aware datetime for comparing timestamps exactly (no float rounding)"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is None:
+        # Rows are written with naive UTC timestamps
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Timezone-aware datetime from an ISO 8601 string given by a client.
+
+    Accepts a trailing "Z" and an offset whose "+" was decoded as a space;
+    naive values are UTC. Raises ValueError.
+    """
+    value = value.strip()
+    if value[-1:] in ("Z", "z"):
+        value = value[:-1] + "+00:00"
+    try:
+        return timestamp_key(datetime.fromisoformat(value))
+    except ValueError:
+        repaired = _SPACED_OFFSET.sub(r"+\1", value)
+        if repaired == value:
+            raise
+        return timestamp_key(datetime.fromisoformat(repaired))
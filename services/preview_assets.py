@@ -0,0 +1,58 @@
+import hashlib
+import os
+from typing import Dict, NamedTuple, Optional
+
+# Static CSS/JS shared by every preview of a template type. They are served
+# under content-hashed file names, so a URL never changes meaning and clients
+# can cache it forever; editing a file changes its URL.
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "preview")
+ASSET_ROUTE = "/api/v1/preview-assets"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_TYPES = {
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+}
+
+
+class PreviewAsset(NamedTuple):
+    name: str
+    filename: str
+    content: bytes
+    content_type: str
+    etag: str
+
+
+def _load_assets(directory: str) -> Dict[str, PreviewAsset]:
+    assets = {}
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext not in CONTENT_TYPES:
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        assets[name] = PreviewAsset(
+            name=name,
+            filename=f"{stem}.{digest[:12]}{ext}",
+            content=content,
+            content_type=CONTENT_TYPES[ext],
+            etag=f'"{digest[:32]}"',
+        )
+    return assets
+
+
+_assets = _load_assets(ASSET_DIR)
+_assets_by_filename = {asset.filename: asset for asset in _assets.values()}
+
+# Changes whenever any asset does; part of the preview ETag, since the HTML
+# embeds the fingerprinted URLs
+ASSETS_VERSION = hashlib.sha256("|".join(sorted(_assets_by_filename)).encode()).hexdigest()[:12]
+
+
+def asset_url(name: str) -> str:
+    """Fingerprinted URL of a preview asset, e.g. asset_url("generic.css")"""
+    return f"{ASSET_ROUTE}/{_assets[name].filename}"
+
+
+def get_asset(filename: str) -> Optional[PreviewAsset]:
+    return _assets_by_filename.get(filename)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+
+class RenderedPreview(NamedTuple):
+    body: bytes
+    etag: str
+    # Pre-compressed copies of body by content coding (see services.compression)
+    encoded: Dict[str, bytes]
+
+
+def preview_key(name: str, color: str, screens: List[str], app_type: str, *versions: str) -> str:
+    """Hash of everything a rendered preview depends on.
+
+    Apps with the same content share a key (and ETag), across users and
+    regardless of updated_at; versions are the template/asset versions.
+    """
+    payload = json.dumps([name, color, screens, app_type, *versions], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PreviewCache:
+    """In-process LRU of rendered previews, bounded by total bytes (all variants).
+
+    Entries are keyed by content hash, so they never go stale and need no
+    TTL or invalidation: an edited app simply hashes to a new key, and the
+    old entry ages out.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, RenderedPreview]" = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(preview: RenderedPreview) -> int:
+        return len(preview.body) + sum(len(data) for data in preview.encoded.values())
+
+    def get(self, key: str) -> Optional[RenderedPreview]:
+        preview = self._entries.get(key)
+        if preview is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return preview
+
+    def set(self, key: str, preview: RenderedPreview):
+        size = self._size(preview)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.size_bytes -= self._size(self._entries.pop(key))
+        self._entries[key] = preview
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            _, oldest = self._entries.popitem(last=False)
+            self.size_bytes -= self._size(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+preview_cache = PreviewCache(
+    max_bytes=int(os.getenv("PREVIEW_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+)
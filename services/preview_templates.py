@@ -0,0 +1,308 @@
+import hashlib
+import html
+import os
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, Union
+
+from services.preview_assets import asset_url
+
+# Preview templates are HTML files named after the app type they render
+# (templates/preview/<type>.html); dropping in a new file adds a type. The
+# syntax is deliberately tiny:
+#
+#   {{ name }} / {{ item.field }}       value from the context, HTML-escaped
+#   {{ name|lower }}                    ...after a filter (see FILTERS)
+#   {% for item in items %}...{% endfor %}
+#   {% asset generic.css %}             fingerprinted URL, resolved at compile time
+#
+# Each file is parsed once into static segments and dynamic nodes, which are
+# then compiled into Python functions (see _Codegen), so rendering does no
+# per-node dispatch or scope copying.
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "preview")
+DEFAULT_TYPE = "app"
+
+# Filter name -> function applied to the value (as a string) before escaping
+FILTERS: Dict[str, Callable[[str], str]] = {
+    "lower": str.lower,
+    "upper": str.upper,
+}
+
+_TOKEN = re.compile(r"\{\{\s*(.*?)\s*\}\}|\{%\s*(.*?)\s*%\}", re.S)
+_PATH = re.compile(r"^[A-Za-z_]\w*(\.[A-Za-z_]\w*)*$")
+_FOR = re.compile(r"^for\s+([A-Za-z_]\w*)\s+in\s+(\S+)$")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class _Var(NamedTuple):
+    path: Tuple[str, ...]
+    filters: Tuple[str, ...]
+
+
+class _Loop(NamedTuple):
+    name: str
+    path: Tuple[str, ...]
+    body: List["_Node"]
+
+
+_Node = Union[str, _Var, _Loop]
+
+
+def _parse_path(expression: str, template: str) -> Tuple[str, ...]:
+    if not _PATH.match(expression):
+        raise TemplateError(f"{template}: invalid expression {expression!r}")
+    return tuple(expression.split("."))
+
+
+def compile_template(source: str, name: str = "<template>") -> List[_Node]:
+    """Parse source into nodes; adjacent static text is merged into one segment"""
+    root: List[_Node] = []
+    stack: List[Tuple[List[_Node], str]] = []
+    nodes = root
+
+    def static(text: str):
+        if not text:
+            return
+        if nodes and isinstance(nodes[-1], str):
+            nodes[-1] += text
+        else:
+            nodes.append(text)
+
+    position = 0
+    for match in _TOKEN.finditer(source):
+        static(source[position:match.start()])
+        position = match.end()
+        expression, tag = match.groups()
+        if expression is not None:
+            path, *filters = [part.strip() for part in expression.split("|")]
+            for filter_name in filters:
+                if filter_name not in FILTERS:
+                    raise TemplateError(f"{name}: unknown filter {filter_name!r}")
+            nodes.append(_Var(_parse_path(path, name), tuple(filters)))
+        elif tag.startswith("asset "):
+            try:
+                static(asset_url(tag[len("asset "):].strip()))
+            except KeyError:
+                raise TemplateError(f"{name}: unknown asset in {{% {tag} %}}") from None
+        elif tag == "endfor":
+            if not stack:
+                raise TemplateError(f"{name}: endfor without for")
+            nodes, _ = stack.pop()
+        else:
+            loop = _FOR.match(tag)
+            if not loop:
+                raise TemplateError(f"{name}: unknown tag {{% {tag} %}}")
+            node = _Loop(loop.group(1), _parse_path(loop.group(2), name), [])
+            nodes.append(node)
+            stack.append((nodes, tag))
+            nodes = node.body
+    static(source[position:])
+    if stack:
+        raise TemplateError(f"{name}: unclosed {{% {stack[-1][1]} %}}")
+    return root
+
+
+# Rendering is compiled the way Jinja2 compiles templates: each template
+# becomes Python source with one function per block, whose static segments
+# and values are joined by a single f-string. Values are HTML-escaped only
+# when an inlined substring check finds something to escape, and a loop
+# builds each per-item value as a column over all items, escaped in one
+# pass, before one comprehension joins them.
+
+def _escape_all(strings: List[str]) -> List[str]:
+    """html.escape of each string, in one pass over their NUL-joined text"""
+    joined = "\0".join(strings)
+    if joined.count("\0") != len(strings) - 1:
+        # A string holds a NUL itself, so split would misalign
+        return [html.escape(string) for string in strings]
+    return html.escape(joined).split("\0")
+
+
+def _literal(text: str) -> str:
+    """text as f-string source, braces doubled so they stay literal"""
+    return "f" + repr(text).replace("{", "{{").replace("}", "}}")
+
+
+def _value(source: str) -> str:
+    """f-string source interpolating the expression source"""
+    return f"f'{{{source}}}'"
+
+
+class _Codegen:
+    """Python source for a template: `render(context)` plus a function per loop.
+
+    A loop's function takes the enclosing loops' variables as `v_<name>`
+    parameters, so shadowing follows Python scoping and no scope dict is
+    copied.
+    """
+
+    def __init__(self):
+        self.functions: Dict[str, str] = {}
+        self.namespace: Dict[str, Any] = {"_escape": html.escape, "_escape_all": _escape_all}
+
+    def lookup(self, path: Tuple[str, ...], bound: Tuple[str, ...]) -> str:
+        head, *keys = path
+        source = f"v_{head}" if head in bound else f"context[{head!r}]"
+        return source + "".join(f"[{key!r}]" for key in keys)
+
+    def filter(self, name: str) -> str:
+        function = f"_filter_{list(FILTERS).index(name)}"
+        self.namespace[function] = FILTERS[name]
+        return function
+
+    def convert(self, var: _Var, bound: Tuple[str, ...]) -> str:
+        """Expression for var's filtered string, before escaping"""
+        # An f-string formats like str() for context values, without the call
+        source = f'f"{{{self.lookup(var.path, bound)}}}"'
+        for name in var.filters:
+            source = f"{self.filter(name)}({source})"
+        return source
+
+    def column(self, var: _Var, loop: _Loop, bound: Tuple[str, ...]) -> str:
+        """Expression for var's filtered strings over all of loop's _items"""
+        if len(var.path) > 1:
+            return f"[{self.convert(var, bound)} for v_{loop.name} in _items]"
+        source = "_strings"
+        for name in var.filters:
+            source = f"map({self.filter(name)}, {source})"
+        return source
+
+    def join(self, nodes: List[_Node], slots: Dict[_Var, str], bound: Tuple[str, ...]) -> str:
+        """f-string source rendering nodes, reading variables from their slots"""
+        pieces = []
+        for node in nodes:
+            if isinstance(node, str):
+                pieces.append(_literal(node))
+            elif isinstance(node, _Var):
+                pieces.append(_value(slots[node]))
+            else:
+                pieces.append(_value(f"{self.loop(node, bound)}({self.parameters(bound)})"))
+        return " ".join(pieces) or "''"
+
+    @staticmethod
+    def parameters(bound: Tuple[str, ...]) -> str:
+        return ", ".join(["context", *(f"v_{name}" for name in bound)])
+
+    @staticmethod
+    def needs_escape(name: str) -> str:
+        """Condition source: does name hold a character html.escape rewrites?"""
+        return " or ".join(f"{char!r} in {name}" for char in "&<>\"'")
+
+    def escape(self, target: str, joined: str, strings: str) -> List[str]:
+        """Lines escaping strings into target when their joined text needs it"""
+        return [f"    _joined = {joined}",
+                f"    if {self.needs_escape('_joined')}:",
+                f"        {target} = _escape_all({strings})"]
+
+    def block(self, nodes: List[_Node]):
+        """Emit render(context) for the top-level nodes"""
+        distinct = list(dict.fromkeys(node for node in nodes if isinstance(node, _Var)))
+        slots = {var: f"_e{index}" for index, var in enumerate(distinct)}
+        lines = ["def render(context):"]
+        if distinct:
+            lines.append(f"    {', '.join(slots.values())} = {', '.join(self.convert(var, ()) for var in distinct)}")
+            # Only a few values, so when any needs escaping each is checked
+            # and escaped on its own
+            lines += [f"    _joined = {' + '.join(slots.values())}",
+                      f"    if {self.needs_escape('_joined')}:"]
+            lines += [f"        if {self.needs_escape(slot)}:\n            {slot} = _escape({slot})" for slot in slots.values()]
+        lines.append(f"    return {self.join(nodes, slots, ())}")
+        self.functions["render"] = "\n".join(lines)
+
+    def loop(self, node: _Loop, bound: Tuple[str, ...]) -> str:
+        """Emit the function rendering node and return its name"""
+        function = f"_loop_{len(self.functions)}"
+        self.functions[function] = ""  # Claims the name before nested loops pick theirs
+        inner = tuple(name for name in bound if name != node.name) + (node.name,)
+        distinct = list(dict.fromkeys(child for child in node.body if isinstance(child, _Var)))
+        columns = [var for var in distinct if var.path[0] == node.name]
+        constants = [var for var in distinct if var.path[0] != node.name]
+        nested = any(isinstance(child, _Loop) for child in node.body)
+        slots = {var: f"_c{index}" for index, var in enumerate(columns)}
+        slots.update((var, f"_k{index}") for index, var in enumerate(constants))
+
+        items = self.lookup(node.path, bound)
+        # The items are kept only where the strings of the item itself are not enough
+        keep_items = nested or not columns or any(len(var.path) > 1 for var in columns)
+        lines = [f"def {function}({self.parameters(bound)}):"]
+        if keep_items:
+            lines.append(f"    _items = list({items})")
+            items = "_items"
+        if any(len(var.path) == 1 for var in columns):
+            lines.append(f'    _strings = [f"{{_item}}" for _item in {items}]')
+        if columns == [_Var((node.name,), ())] and not constants:
+            # The only value is the item itself, already in _strings
+            lines += self.escape("_strings", "''.join(_strings)", "_strings")
+            sources = ["_strings"]
+        elif distinct:
+            # Columns, then constants (evaluated once), escaped in one pass
+            values = [f"*{self.column(var, node, inner)}" for var in columns]
+            values += [self.convert(var, bound) for var in constants]
+            lines.append(f"    _e = [{', '.join(values)}]")
+            lines += self.escape("_e", "''.join(_e)", "_e")
+            lines.append(f"    _n = len({'_items' if keep_items else '_strings'})")
+            lines += [f"    _k{index} = _e[_n * {len(columns)} + {index}]" for index in range(len(constants))]
+            sources = [f"_e[_n * {index}:_n * {index + 1}]" for index in range(len(columns))]
+        else:
+            sources = []
+        # The item itself is only needed to pass on to nested loops
+        targets = [f"v_{node.name}"] * (nested or not sources) + [f"_c{index}" for index in range(len(columns))]
+        sources = ["_items"] * (nested or not sources) + sources
+        iterate = sources[0] if len(sources) == 1 else f"zip({', '.join(sources)})"
+        lines.append(f"    return ''.join([{self.join(node.body, slots, inner)} for {', '.join(targets)} in {iterate}])")
+        self.functions[function] = "\n".join(lines)
+        return function
+
+
+def _compile(nodes: List[_Node]) -> Tuple[Callable[[Dict[str, Any]], str], str]:
+    """Compile nodes into a render(context) function; also returns its source"""
+    codegen = _Codegen()
+    codegen.block(nodes)
+    source = "\n\n".join(codegen.functions.values()) + "\n"
+    namespace = dict(codegen.namespace)
+    exec(compile(source, "<preview template>", "exec"), namespace)
+    return namespace["render"], source
+
+
+class Template:
+    """A parsed template; calling it with a context returns the rendered string"""
+
+    def __init__(self, nodes: List[_Node]):
+        self.nodes = nodes
+        self.render, self.source = _compile(nodes)
+
+    def __call__(self, context: Dict[str, Any]) -> str:
+        return self.render(context)
+
+
+class TemplateRegistry:
+    """Compiled preview templates by app type, loaded once per process"""
+
+    def __init__(self, directory: str = TEMPLATE_DIR, default: str = DEFAULT_TYPE):
+        self.default = default
+        self._templates: Dict[str, Template] = {}
+        self._digests: Dict[str, str] = {}
+        self.version = ""
+        for filename in sorted(os.listdir(directory)):
+            app_type, ext = os.path.splitext(filename)
+            if ext == ".html":
+                with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                    self.register(app_type, f.read())
+
+    def register(self, app_type: str, source: str):
+        """Compile and add (or replace) the template for app_type"""
+        self._templates[app_type] = Template(compile_template(source, app_type))
+        self._digests[app_type] = hashlib.sha256(source.encode()).hexdigest()
+        # Part of the preview cache key and ETag, so edits invalidate both
+        combined = "|".join(f"{name}:{digest}" for name, digest in sorted(self._digests.items()))
+        self.version = hashlib.sha256(combined.encode()).hexdigest()[:12]
+
+    def render(self, app_type: str, context: Dict[str, Any]) -> str:
+        """Render app_type's template; unknown types use the default template"""
+        template = self._templates.get(app_type) or self._templates[self.default]
+        return template.render(context)
+
+
+preview_templates = TemplateRegistry()
@@ -1,233 +1,252 @@
 import os
-from supabase import create_client, Client
-from datetime import datetime
-from typing import Optional, List
-from models.app import AppResponse, AppCreateRequest, AppUpdateRequest
+from supabase import create_client, Client, ClientOptions
+from typing import Dict, Optional, List, Tuple, Union
+from models.app import ApkUploadResult, AppResponse, AppCreateRequest, AppUpdateRequest, AppBatchUpdateItem, AppSummary, AppTombstone
+from repositories.base import AppRepository, AuthRepository, StorageRepository
+from repositories.local import LocalAuthRepository, local_storage
+from repositories.sqlite import SQLiteAppRepository
+from repositories.supabase import SupabaseAppRepository, SupabaseAuthRepository, SupabaseStorageRepository
+from services.jwt_verifier import LocalTokenVerifier, TokenVerificationUnavailable
+from services.http_pool import create_sync_http_client
+from services.apk_upload import (
+    APK_BUCKET, SIGNED_UPLOAD_TTL_SECONDS, apk_object_path, check_declared_size, direct_apk_path, hash_file
+)
+from services.pagination import KEYSET_FIELDS
 
 # Initialize Supabase client
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_anon_key = os.getenv("SUPABASE_ANON_KEY")
 supabase_service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
+http_client = None
+
 if not supabase_url or not supabase_anon_key or not supabase_service_role_key:
-    print("Warning: Supabase environment variables are not set. Skipping Supabase initialization for testing.")
     supabase: Optional[Client] = None
     supabase_auth: Optional[Client] = None
 else:
     try:
-        supabase = create_client(supabase_url, supabase_service_role_key)  # For DB operations
-        supabase_auth = create_client(supabase_url, supabase_anon_key)  # For auth verification
+        # Both clients share one pooled HTTP transport
+        http_client = create_sync_http_client()
+        supabase = create_client(supabase_url, supabase_service_role_key, options=ClientOptions(httpx_client=http_client))  # For DB operations
+        supabase_auth = create_client(supabase_url, supabase_anon_key, options=ClientOptions(httpx_client=http_client))  # For auth verification
         print("Supabase clients initialized successfully")
     except Exception as e:
         print(f"Failed to initialize Supabase client: {e}")
         supabase = None
         supabase_auth = None
 
+# Where apps, auth and APKs live: "supabase" or "sqlite", a local backend with
+# the same semantics for development, tests and benchmarks without network
+# access. Never chosen implicitly: a misconfigured Supabase deployment must
+# fail to start rather than serve from an empty local database.
+DATA_BACKEND = os.getenv("DATA_BACKEND", "supabase").lower()
+
+# Verify access tokens locally (JWT secret / JWKS) and only ask the auth
+# backend over the network when explicitly enabled.
+local_token_verifier = LocalTokenVerifier.from_env()
+remote_token_fallback = local_token_verifier.remote_fallback_from_env()
+
+# LocalAuthRepository trusts unsigned tokens; development only
+ALLOW_INSECURE_LOCAL_AUTH = os.getenv("ALLOW_INSECURE_LOCAL_AUTH", "false").lower() == "true"
+
+app_repository: AppRepository
+auth_repository: Optional[AuthRepository]
+storage_repository: StorageRepository
+if DATA_BACKEND == "supabase":
+    if not supabase:
+        raise RuntimeError("DATA_BACKEND is supabase but the Supabase client is unavailable: set SUPABASE_URL, "
+                           "SUPABASE_ANON_KEY and SUPABASE_SERVICE_ROLE_KEY (or DATA_BACKEND=sqlite for local development)")
+    app_repository = SupabaseAppRepository(supabase)
+    auth_repository = SupabaseAuthRepository(supabase_auth)
+    storage_repository = SupabaseStorageRepository(supabase, http_client, supabase_url, supabase_service_role_key)
+elif DATA_BACKEND == "sqlite":
+    app_repository = SQLiteAppRepository(os.getenv("SQLITE_PATH", ":memory:"))
+    storage_repository = local_storage
+    if ALLOW_INSECURE_LOCAL_AUTH:
+        print("Warning: ALLOW_INSECURE_LOCAL_AUTH is set: local auth accepts unsigned tokens")
+        auth_repository = LocalAuthRepository()
+    elif local_token_verifier.is_configured():
+        # No auth server to fall back to: tokens are verified locally or rejected
+        auth_repository = None
+        remote_token_fallback = False
+    else:
+        raise RuntimeError("DATA_BACKEND=sqlite cannot verify tokens: set SUPABASE_JWT_SECRET or SUPABASE_JWKS_URL, "
+                           "or ALLOW_INSECURE_LOCAL_AUTH=true to trust unsigned tokens in development")
+else:
+    raise RuntimeError(f"Unknown DATA_BACKEND {DATA_BACKEND!r}: use supabase or sqlite")
+
+if not local_token_verifier.jwt_secret and DATA_BACKEND == "supabase":
+    if remote_token_fallback:
+        print("SUPABASE_JWT_SECRET is not set: HS256 tokens are verified by Supabase Auth")
+    else:
+        print("Warning: SUPABASE_JWT_SECRET is not set and remote fallback is disabled: HS256 tokens will be rejected")
+
 class SupabaseService:
+    """Sync service API over the configured repositories (see DATA_BACKEND)"""
+
     @staticmethod
     def verify_token(token: str) -> Optional[str]:
-        if not supabase_auth:
-            print("Supabase auth not initialized - returning test user for development")
-            return "test_user_id"  # Return a test user ID for development
+        if local_token_verifier.is_configured():
+            try:
+                return local_token_verifier.verify(token)
+            except TokenVerificationUnavailable as e:
+                if not remote_token_fallback:
+                    print(f"Local token verification unavailable and remote fallback disabled: {e}")
+                    return None
+                print(f"Local token verification unavailable, falling back to {DATA_BACKEND} auth: {e}")
+
         try:
-            response = supabase_auth.auth.get_user(jwt=token)
-            return response.user.id if response.user else None
+            return auth_repository.verify_token(token)
         except Exception as e:
             print(f"Token verification failed: {e}")
             return None
 
     @staticmethod
-    def get_user_apps(user_id: str) -> List[AppResponse]:
-        if not supabase:
-            print("Supabase not initialized - returning mock apps for development")
-            # Return some mock apps for development
-            from models.app import AppResponse
-            import uuid
-            from datetime import datetime
-            mock_apps = [
-                AppResponse(
-                    id=str(uuid.uuid4()),
-                    name="Mock App 1",
-                    description="First mock app",
-                    status="active",
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow(),
-                    user_id=user_id,
-                    apk_url=None
-                ),
-                AppResponse(
-                    id=str(uuid.uuid4()),
-                    name="Mock App 2",
-                    description="Second mock app",
-                    status="active",
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow(),
-                    user_id=user_id,
-                    apk_url=None
-                )
-            ]
-            return mock_apps
-
+    def get_user_apps(user_id: str, fields: Optional[List[str]] = None) -> List[Union[AppResponse, AppSummary]]:
         try:
-            response = supabase.table('apps').select('*').eq('user_id', user_id).execute()
-            apps = []
-            for item in response.data:
-                app = AppResponse(**item)
-                apps.append(app)
-            return apps
+            return app_repository.get_user_apps(user_id, fields)
         except Exception as e:
             print(f"Failed to get user apps: {e}")
             return []
 
     @staticmethod
-    def get_app(app_id: str, user_id: str) -> Optional[AppResponse]:
-        if not supabase:
-            print("Supabase not initialized - returning mock app for development")
-            # Create a mock app with the requested ID for development
-            import uuid
-            now = datetime.utcnow().isoformat()
-            mock_app = {
-                'id': app_id,  # Use the requested app_id
-                'name': 'Mock App Preview',
-                'description': 'App criado para preview no modo desenvolvimento',
-                'status': 'active',
-                'created_at': now,
-                'updated_at': now,
-                'user_id': user_id,
-                'apk_url': None
-            }
-            return AppResponse(**mock_app)
+    def get_user_apps_page(user_id: str, limit: int, cursor: Optional[str] = None,
+                           fields: Optional[List[str]] = None) -> Tuple[List[Union[AppResponse, AppSummary]], Optional[str]]:
+        """One page of the user's apps, newest first, plus the cursor for the next page"""
+        if fields:
+            fields = fields + [field for field in KEYSET_FIELDS if field not in fields]
         try:
-            response = supabase.table('apps').select('*').eq('id', app_id).eq('user_id', user_id).execute()
-            if response.data:
-                return AppResponse(**response.data[0])
-            return None
+            return app_repository.get_user_apps_page(user_id, limit, cursor, fields)
+        except Exception as e:
+            print(f"Failed to get user apps page: {e}")
+            return [], None
+
+    @staticmethod
+    def get_apps_by_ids(user_id: str, app_ids: List[str],
+                        fields: Optional[List[str]] = None) -> Dict[str, Union[AppResponse, AppSummary]]:
+        """Fetch several of the user's apps with one query. Missing ids are absent from the result."""
+        try:
+            return app_repository.get_apps_by_ids(user_id, app_ids, fields)
+        except Exception as e:
+            print(f"Failed to get apps by ids: {e}")
+            raise
+
+    @staticmethod
+    def get_app(app_id: str, user_id: str, fields: Optional[List[str]] = None) -> Optional[Union[AppResponse, AppSummary]]:
+        try:
+            return app_repository.get_app(app_id, user_id, fields)
         except Exception as e:
             print(f"Failed to get app: {e}")
             return None
 
     @staticmethod
     def create_app(user_id: str, app_data: AppCreateRequest) -> AppResponse:
-        if not supabase:
-            print("Supabase not initialized - creating mock app for development")
-            # Create a mock response for development
-            import uuid
-            now = datetime.utcnow().isoformat()
-            mock_app = {
-                'id': str(uuid.uuid4()),
-                'name': app_data.name,
-                'description': app_data.description,
-                'status': app_data.status,
-                'icon': app_data.icon,
-                'color': app_data.color,
-                'screens': app_data.screens,
-                'type': app_data.type,
-                'created_at': now,
-                'updated_at': now,
-                'user_id': user_id,
-                'apk_url': None
-            }
-            return AppResponse(**mock_app)
-
-        now = datetime.utcnow().isoformat()
-        app_dict = {
-            'name': app_data.name,
-            'description': app_data.description,
-            'status': app_data.status,
-            'icon': app_data.icon,
-            'color': app_data.color,
-            'screens': app_data.screens,
-            'type': app_data.type,
-            'created_at': now,
-            'updated_at': now,
-            'user_id': user_id,
-            'apk_url': None
-        }
         try:
-            response = supabase.table('apps').insert(app_dict).execute()
-            if response.data:
-                return AppResponse(**response.data[0])
-            else:
-                raise Exception("Failed to create app")
+            return app_repository.create_app(user_id, app_data)
         except Exception as e:
             print(f"Failed to create app: {e}")
             raise
 
     @staticmethod
     def update_app(app_id: str, user_id: str, app_data: AppUpdateRequest) -> Optional[AppResponse]:
-        if not supabase:
-            print("Supabase not initialized - updating mock app for development")
-            # For development, just return a mock updated app
-            import uuid
-            now = datetime.utcnow().isoformat()
-            mock_app = {
-                'id': app_id,
-                'name': app_data.name or "Mock App",
-                'description': app_data.description or "Mock description",
-                'status': app_data.status or "active",
-                'created_at': now,
-                'updated_at': now,
-                'user_id': user_id,
-                'apk_url': None
-            }
-            return AppResponse(**mock_app)
+        try:
+            return app_repository.update_app(app_id, user_id, app_data)
+        except Exception as e:
+            print(f"Failed to update app: {e}")
+            raise
 
+    @staticmethod
+    def upload_apk(app_id: str, user_id: str, file) -> Optional[ApkUploadResult]:
+        check_declared_size(file)
+        return SupabaseService.store_apk(app_id, user_id, file.file)
+
+    @staticmethod
+    def store_apk(app_id: str, user_id: str, fileobj) -> Optional[ApkUploadResult]:
+        """Hash a local file, upload it unless an identical APK is already stored, and point the app at it.
+
+        Returns None if the app doesn't exist or isn't the user's.
+        """
         try:
-            # First check if app exists and belongs to user
-            existing = SupabaseService.get_app(app_id, user_id)
-            if not existing:
-                return None
+            digest, size = hash_file(fileobj)
+            deduplicated = app_repository.apk_object_exists(digest)
+            if not deduplicated:
+                storage_repository.upload(APK_BUCKET, apk_object_path(digest), fileobj)
+                app_repository.record_apk_object(digest, size)
+            result = SupabaseService.set_app_apk(app_id, user_id, digest)
+            if result:
+                result.apk_size = size
+                result.deduplicated = deduplicated
+            return result
+        except Exception as e:
+            print(f"Failed to upload APK: {e}")
+            raise
+
+    @staticmethod
+    def apk_object_exists(digest: str) -> bool:
+        return app_repository.apk_object_exists(digest)
 
-            update_data = {k: v for k, v in app_data.dict().items() if v is not None}
-            update_data['updated_at'] = datetime.utcnow().isoformat()
+    @staticmethod
+    def set_app_apk(app_id: str, user_id: str, digest: str) -> Optional[ApkUploadResult]:
+        return SupabaseService.point_app_apk(app_id, user_id, apk_object_path(digest), digest)
 
-            response = supabase.table('apps').update(update_data).eq('id', app_id).eq('user_id', user_id).execute()
-            if response.data:
-                return AppResponse(**response.data[0])
+    @staticmethod
+    def point_app_apk(app_id: str, user_id: str, path: str, digest: Optional[str] = None) -> Optional[ApkUploadResult]:
+        """Point the app at a stored APK; None if the app doesn't exist or isn't the user's"""
+        apk_url = storage_repository.public_url(APK_BUCKET, path)
+        if not app_repository.set_app_apk(app_id, user_id, apk_url, digest):
             return None
+        return ApkUploadResult(apk_url=apk_url, apk_sha256=digest)
+
+    @staticmethod
+    def create_apk_upload_url(app_id: str) -> dict:
+        """Signed URL the client uploads the APK to directly, bypassing the API"""
+        return storage_repository.create_signed_upload_url(APK_BUCKET, direct_apk_path(app_id), SIGNED_UPLOAD_TTL_SECONDS)
+
+    @staticmethod
+    def get_apk_size(path: str) -> Optional[int]:
+        """Size of a stored APK object, or None if it doesn't exist"""
+        return storage_repository.size(APK_BUCKET, path)
+
+    @staticmethod
+    def delete_app(app_id: str, user_id: str) -> bool:
+        try:
+            return app_repository.delete_app(app_id, user_id)
         except Exception as e:
-            print(f"Failed to update app: {e}")
+            print(f"Failed to delete app: {e}")
             raise
 
     @staticmethod
-    def upload_apk(app_id: str, file) -> str:
-        if not supabase:
-            raise Exception("Supabase not initialized")
+    def create_apps(user_id: str, apps_data: List[AppCreateRequest]) -> List[AppResponse]:
+        """Create several apps with a single bulk insert (all or nothing)"""
         try:
-            # Read file content
-            file_content = file.file.read()
-            file_name = f"{app_id}.apk"
-
-            # Upload to Supabase Storage
-            bucket_name = 'apks'  # Make sure this bucket exists in your Supabase project
-            response = supabase.storage.from_(bucket_name).upload(
-                path=file_name,
-                file=file_content,
-                file_options={"content-type": "application/vnd.android.package-archive"}
-            )
-
-            # Get public URL
-            public_url = supabase.storage.from_(bucket_name).get_public_url(file_name)
-            return public_url
+            return app_repository.create_apps(user_id, apps_data)
         except Exception as e:
-            print(f"Failed to upload APK: {e}")
+            print(f"Failed to create apps: {e}")
             raise
 
     @staticmethod
-    def delete_app(app_id: str, user_id: str) -> bool:
-        if not supabase:
-            print("Supabase not initialized - deleting mock app for development")
-            # For development, just return success
-            return True
+    def update_apps(user_id: str, items: List[AppBatchUpdateItem]) -> Dict[str, AppResponse]:
+        """Apply batch updates, one update per distinct payload. Returns updated apps by id."""
+        try:
+            return app_repository.update_apps(user_id, items)
+        except Exception as e:
+            print(f"Failed to update apps: {e}")
+            raise
 
+    @staticmethod
+    def delete_apps(user_id: str, app_ids: List[str]) -> List[str]:
+        """Delete several apps in one request. Returns the ids that were actually deleted."""
         try:
-            # First check if app exists and belongs to user
-            existing = SupabaseService.get_app(app_id, user_id)
-            if not existing:
-                return False
+            return app_repository.delete_apps(user_id, app_ids)
+        except Exception as e:
+            print(f"Failed to delete apps: {e}")
+            raise
 
-            response = supabase.table('apps').delete().eq('id', app_id).eq('user_id', user_id).execute()
-            return len(response.data) > 0
+    @staticmethod
+    def get_app_changes(user_id: str, since: str) -> Tuple[List[AppResponse], List[AppTombstone]]:
+        """Apps created or updated after `since`, and tombstones of apps deleted after it"""
+        try:
+            return app_repository.get_app_changes(user_id, since)
         except Exception as e:
-            print(f"Failed to delete app: {e}")
+            print(f"Failed to get app changes: {e}")
             raise
@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import jwt
+from starlette.concurrency import run_in_threadpool
+
+from services.supabase_service import SupabaseService
+
+
+class TokenCache:
+    """Bounded LRU of token verification results.
+
+    Entries are keyed by a SHA-256 of the bearer token, so raw tokens are never
+    kept in memory. Accepted tokens live until their own `exp` (capped by
+    `max_ttl`), rejected tokens for `negative_ttl`. Concurrent lookups of the
+    same uncached token share a single verification.
+    """
+
+    def __init__(
+        self,
+        verify: Callable[[str], Optional[str]],
+        max_entries: int = 10000,
+        max_ttl: float = 300,
+        negative_ttl: float = 30,
+    ):
+        self._verify = verify
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[bytes, Tuple[Optional[str], float]]" = OrderedDict()
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    async def verify(self, token: str) -> Optional[str]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            user_id, expires_at = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                if user_id:
+                    self.hits += 1
+                else:
+                    self.negative_hits += 1
+                return user_id
+            del self._entries[key]
+            self.expirations += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # Run as its own task so one cancelled request doesn't fail the
+            # others waiting on the same token.
+            task = asyncio.ensure_future(self._load(key, token))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: bytes, token: str) -> Optional[str]:
+        try:
+            user_id = await run_in_threadpool(self._verify, token)
+            self._store(key, user_id, self._expires_at(token, user_id))
+            return user_id
+        finally:
+            self._inflight.pop(key, None)
+
+    def _expires_at(self, token: str, user_id: Optional[str]) -> float:
+        now = time.time()
+        if not user_id:
+            return now + self.negative_ttl
+        try:
+            # Signature was already checked by the verifier; only read `exp` here.
+            exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+        except jwt.InvalidTokenError:
+            exp = None
+        if exp is None:
+            return now + self.max_ttl
+        return min(float(exp), now + self.max_ttl)
+
+    def _store(self, key: bytes, user_id: Optional[str], expires_at: float):
+        if expires_at <= time.time():
+            return
+        self._entries[key] = (user_id, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "inflight": len(self._inflight),
+        }
+
+
+token_cache = TokenCache(
+    SupabaseService.verify_token,
+    max_entries=int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000")),
+    max_ttl=float(os.getenv("TOKEN_CACHE_MAX_TTL_SECONDS", "300")),
+    negative_ttl=float(os.getenv("TOKEN_CACHE_NEGATIVE_TTL_SECONDS", "30")),
+)
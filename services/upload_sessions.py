@@ -0,0 +1,175 @@
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from typing import AsyncIterator, Dict, Optional
+
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from services.apk_upload import MAX_APK_BYTES, ApkTooLarge
+
+# Bytes buffered in memory before each disk write while receiving a chunk
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+
+class UploadSession(BaseModel):
+    id: str
+    app_id: str
+    user_id: str
+    total_size: Optional[int] = None
+    created_at: float
+    updated_at: float
+
+
+class OffsetMismatch(Exception):
+    def __init__(self, offset: int):
+        super().__init__(f"Upload offset mismatch, current offset is {offset}")
+        self.offset = offset
+
+
+class UploadSessionStore:
+    """Resumable APK uploads staged on local disk.
+
+    Each session is a `<id>.json` metadata file plus a `<id>.part` data file.
+    The committed offset is always the size of the .part file, so a chunk cut
+    off mid-transfer still counts up to the last byte written and the client
+    resumes from there. Sessions idle for longer than `ttl` are removed by
+    collect_garbage(), which also runs opportunistically on create.
+
+    Appends, finalize and cancel of a session are serialized by lock(), an
+    asyncio lock held in this process, and the staged files live on this
+    machine. Every request of a session must therefore reach the same worker:
+    run a single worker, or route on the session id (sticky routing).
+    """
+
+    def __init__(self, root: str, ttl: float = 24 * 3600, max_bytes: int = MAX_APK_BYTES,
+                 gc_interval: float = 600):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.gc_interval = gc_interval
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_gc = 0.0
+        os.makedirs(root, exist_ok=True)
+
+    def _meta_path(self, session_id: str) -> str:
+        return os.path.join(self.root, f"{session_id}.json")
+
+    def data_path(self, session_id: str) -> str:
+        return os.path.join(self.root, f"{session_id}.part")
+
+    def _save(self, session: UploadSession):
+        tmp_path = self._meta_path(session.id) + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(session.model_dump_json())
+        os.replace(tmp_path, self._meta_path(session.id))
+
+    def create(self, app_id: str, user_id: str, total_size: Optional[int] = None) -> UploadSession:
+        if total_size is not None and total_size > self.max_bytes:
+            raise ApkTooLarge(self.max_bytes)
+        if time.time() - self._last_gc > self.gc_interval:
+            self.collect_garbage()
+        now = time.time()
+        session = UploadSession(
+            id=uuid.uuid4().hex, app_id=app_id, user_id=user_id,
+            total_size=total_size, created_at=now, updated_at=now,
+        )
+        open(self.data_path(session.id), "wb").close()
+        self._save(session)
+        return session
+
+    def get(self, session_id: str, app_id: str, user_id: str) -> Optional[UploadSession]:
+        """Load a session, or None if it doesn't exist, expired, or isn't this user's upload for app_id"""
+        try:
+            uuid.UUID(hex=session_id)
+            with open(self._meta_path(session_id)) as f:
+                session = UploadSession.model_validate_json(f.read())
+        except (ValueError, OSError):
+            return None
+        if session.app_id != app_id or session.user_id != user_id:
+            return None
+        if time.time() - session.updated_at > self.ttl:
+            self.delete(session_id)
+            return None
+        return session
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        """Per-process lock guarding a session's data file"""
+        return self._locks.setdefault(session_id, asyncio.Lock())
+
+    def exists(self, session_id: str) -> bool:
+        return os.path.exists(self._meta_path(session_id))
+
+    def offset(self, session_id: str) -> int:
+        try:
+            return os.path.getsize(self.data_path(session_id))
+        except OSError:
+            return 0
+
+    async def append(self, session: UploadSession, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """Append a chunk that starts at `offset`; returns the new offset.
+
+        Raises LookupError if the session was finalized or cancelled meanwhile.
+        """
+        async with self.lock(session.id):
+            if not self.exists(session.id):
+                raise LookupError("Upload session not found or expired")
+            current = self.offset(session.id)
+            if offset != current:
+                raise OffsetMismatch(current)
+            limit = min(session.total_size or self.max_bytes, self.max_bytes)
+            with open(self.data_path(session.id), "ab") as f:
+                buffer = bytearray()
+                written = current
+                try:
+                    async for chunk in chunks:
+                        written += len(chunk)
+                        if written > limit:
+                            raise ApkTooLarge(limit)
+                        buffer += chunk
+                        if len(buffer) >= WRITE_BUFFER_BYTES:
+                            await run_in_threadpool(f.write, bytes(buffer))
+                            buffer.clear()
+                finally:
+                    # Keep whatever arrived before a disconnect so the client can resume
+                    if buffer and written <= limit:
+                        await run_in_threadpool(f.write, bytes(buffer))
+            session.updated_at = time.time()
+            self._save(session)
+            return self.offset(session.id)
+
+    def is_complete(self, session: UploadSession) -> bool:
+        return session.total_size is None or self.offset(session.id) == session.total_size
+
+    def delete(self, session_id: str):
+        for path in (self._meta_path(session_id), self.data_path(session_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._locks.pop(session_id, None)
+
+    def collect_garbage(self) -> int:
+        """Remove sessions (and orphaned data files) idle for longer than the TTL"""
+        self._last_gc = time.time()
+        cutoff = self._last_gc - self.ttl
+        removed = 0
+        for name in os.listdir(self.root):
+            session_id, ext = os.path.splitext(name)
+            if ext not in (".json", ".part"):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.root, name)) < cutoff:
+                    self.delete(session_id)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+upload_sessions = UploadSessionStore(
+    root=os.getenv("APK_UPLOAD_STAGING_DIR", os.path.join(tempfile.gettempdir(), "appquanta-uploads")),
+    ttl=float(os.getenv("APK_UPLOAD_SESSION_TTL_SECONDS", str(24 * 3600))),
+)
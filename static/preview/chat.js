@@ -0,0 +1,31 @@
+function sendMessage() {
+    const input = document.getElementById('messageInput');
+    const messages = document.getElementById('messages');
+
+    if (input.value.trim()) {
+        const messageDiv = document.createElement('div');
+        messageDiv.className = 'message sent';
+        messageDiv.textContent = input.value;
+        messages.appendChild(messageDiv);
+        input.value = '';
+
+        // Scroll to bottom
+        messages.scrollTop = messages.scrollHeight;
+
+        // Simulate response
+        setTimeout(() => {
+            const responseDiv = document.createElement('div');
+            responseDiv.className = 'message received';
+            responseDiv.textContent = 'Mensagem recebida! 👍';
+            messages.appendChild(responseDiv);
+            messages.scrollTop = messages.scrollHeight;
+        }, 1000);
+    }
+}
+
+// Enter key support
+document.getElementById('messageInput').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        sendMessage();
+    }
+});
@@ -0,0 +1,7 @@
+function playGame() {
+    const button = document.querySelector('.play-button');
+    button.textContent = '🎮 Jogando...';
+    setTimeout(() => {
+        button.textContent = 'JOGAR';
+    }, 2000);
+}
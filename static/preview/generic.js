@@ -0,0 +1,39 @@
+// Navigation functionality
+const navItems = document.querySelectorAll('.nav-item');
+const screens = document.querySelectorAll('.screen');
+
+function switchScreen(screenName) {
+    // Hide all screens
+    screens.forEach(screen => {
+        screen.classList.remove('active');
+        screen.style.display = 'none';
+    });
+
+    // Show selected screen
+    const targetScreen = document.getElementById(`screen-${screenName.toLowerCase()}`);
+    if (targetScreen) {
+        targetScreen.classList.add('active');
+        targetScreen.style.display = 'block';
+    }
+
+    // Update nav active state
+    navItems.forEach(item => {
+        item.classList.remove('active');
+        if (item.dataset.screen === screenName) {
+            item.classList.add('active');
+        }
+    });
+}
+
+// Add click handlers
+navItems.forEach(item => {
+    item.addEventListener('click', () => {
+        const screenName = item.dataset.screen;
+        switchScreen(screenName);
+    });
+});
+
+// Initialize first screen
+if (navItems.length > 0) {
+    switchScreen(navItems[0].dataset.screen);
+}
@@ -0,0 +1,7 @@
+function addToCart() {
+    const button = document.querySelector('.cart-button');
+    button.textContent = '🛒 Ver Carrinho (1 item)';
+    setTimeout(() => {
+        button.textContent = '🛒 Ver Carrinho (0 itens)';
+    }, 2000);
+}
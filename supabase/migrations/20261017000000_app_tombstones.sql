@@ -0,0 +1,34 @@
+-- Tombstones for deleted apps, read by GET /api/v1/apps/changes so clients
+-- keeping a local copy of their app list can drop deleted entries.
+-- Rows are written by a trigger, so deletes stay a single round-trip from the API.
+
+create table if not exists public.app_tombstones (
+    app_id     uuid        primary key,
+    user_id    text        not null,
+    deleted_at timestamptz not null default now()
+);
+
+create index if not exists app_tombstones_user_deleted_at_idx
+    on public.app_tombstones (user_id, deleted_at);
+
+-- Range scans on (updated_at, id): the changed-apps half of the delta and
+-- keyset pagination of GET /api/v1/apps
+create index if not exists apps_user_updated_at_idx
+    on public.apps (user_id, updated_at, id);
+
+create or replace function public.record_app_tombstone()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into public.app_tombstones (app_id, user_id, deleted_at)
+    values (old.id, old.user_id, now())
+    on conflict (app_id) do update set deleted_at = excluded.deleted_at;
+    return old;
+end;
+$$;
+
+drop trigger if exists apps_record_tombstone on public.apps;
+create trigger apps_record_tombstone
+    after delete on public.apps
+    for each row execute function public.record_app_tombstone();
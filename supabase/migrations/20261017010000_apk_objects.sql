@@ -0,0 +1,11 @@
+-- Content-addressed APK storage: objects live at apks/sha256/<digest>.apk and
+-- this table is the digest index, so re-uploading an identical build only
+-- repoints apps.apk_url instead of transferring the file again.
+
+create table if not exists public.apk_objects (
+    sha256     text        primary key,
+    size       bigint      not null,
+    created_at timestamptz not null default now()
+);
+
+alter table public.apps add column if not exists apk_sha256 text;
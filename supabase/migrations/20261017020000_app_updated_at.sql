@@ -0,0 +1,21 @@
+-- apps.updated_at is stamped by the database, like app_tombstones.deleted_at,
+-- so GET /api/v1/apps/changes compares timestamps from a single clock. Values
+-- sent by the API are overwritten.
+
+create or replace function public.set_app_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'INSERT' then
+        new.created_at = now();
+    end if;
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists apps_set_updated_at on public.apps;
+create trigger apps_set_updated_at
+    before insert or update on public.apps
+    for each row execute function public.set_app_updated_at();
@@ -0,0 +1,82 @@
+"""Shared fixtures: the API on the local SQLite backend with HS256 tokens.
+
+The environment is set before anything imports services.supabase_service,
+which reads it at import time, so tests never reach a real Supabase project.
+"""
+import os
+import tempfile
+import time
+import uuid
+
+import jwt
+import pytest
+
+JWT_SECRET = "test-jwt-secret-that-is-32-bytes-long"
+
+for _name in ("SUPABASE_URL", "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_JWKS_URL"):
+    os.environ.pop(_name, None)
+_scratch = tempfile.mkdtemp(prefix="appquanta-tests-")
+os.environ.update({
+    "DATA_BACKEND": "sqlite",
+    "SQLITE_PATH": ":memory:",
+    "SUPABASE_JWT_SECRET": JWT_SECRET,
+    "LOCAL_STORAGE_DIR": os.path.join(_scratch, "storage"),
+    "LOCAL_STORAGE_SIGNING_SECRET": "test-signing-secret",
+    "APK_UPLOAD_STAGING_DIR": os.path.join(_scratch, "uploads"),
+})
+
+
+def _make_token(user_id: str, secret: str = JWT_SECRET, expires_in: int = 3600, **claims) -> str:
+    payload = {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + expires_in, **claims}
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+@pytest.fixture
+def make_token():
+    """HS256 access token shaped like Supabase's: make_token(user_id, secret=..., expires_in=..., **claims)"""
+    return _make_token
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    from services.app_cache import app_cache
+    from services.preview_cache import preview_cache
+    from services.token_cache import token_cache
+    yield
+    app_cache.clear()
+    preview_cache.clear()
+    token_cache.clear()
+
+
+@pytest.fixture
+def user_id() -> str:
+    # Every test gets its own user, so rows in the shared database never collide
+    return f"user-{uuid.uuid4().hex}"
+
+
+@pytest.fixture
+def auth_headers(user_id):
+    return {"Authorization": f"Bearer {_make_token(user_id)}"}
+
+
+@pytest.fixture
+def other_auth_headers():
+    """A second, equally fresh user, for checks that one user can't see another's apps"""
+    return {"Authorization": f"Bearer {_make_token(f'user-{uuid.uuid4().hex}')}"}
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def create_app(client, auth_headers):
+    def create(**fields):
+        response = client.post("/api/v1/apps/create", json={"name": "App", **fields}, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return response.json()["data"]
+    return create
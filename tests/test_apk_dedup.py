@@ -0,0 +1,65 @@
+import hashlib
+
+from services.supabase_service import storage_repository
+
+APK = b"PK\x03\x04" + b"dedup" * 500
+DIGEST = hashlib.sha256(APK).hexdigest()
+
+
+def upload(client, auth_headers, app_id, data=APK):
+    response = client.post(f"/api/v1/apps/{app_id}/upload-apk", headers=auth_headers,
+                           files={"file": ("app.apk", data, "application/vnd.android.package-archive")})
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def test_identical_apk_is_stored_once(client, auth_headers, create_app, monkeypatch):
+    first, second = create_app(), create_app()
+    upload(client, auth_headers, first["id"])
+    uploads = []
+    monkeypatch.setattr(storage_repository, "upload", lambda *args: uploads.append(args))
+
+    data = upload(client, auth_headers, second["id"])
+
+    assert data["deduplicated"] is True and data["apk_sha256"] == DIGEST
+    assert uploads == []
+    apps = client.get(f"/api/v1/apps?ids={first['id']},{second['id']}", headers=auth_headers).json()["data"]
+    assert apps[0]["apk_url"] == apps[1]["apk_url"]
+
+
+def test_link_by_digest(client, auth_headers, create_app):
+    first, second = create_app(), create_app()
+    stored = upload(client, auth_headers, first["id"])
+
+    response = client.put(f"/api/v1/apps/{second['id']}/apk", json={"sha256": DIGEST}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["apk_url"] == stored["apk_url"]
+    assert client.get(f"/api/v1/apps/{second['id']}", headers=auth_headers).json()["data"]["apk_sha256"] == DIGEST
+
+
+def test_link_needs_a_stored_apk(client, auth_headers, create_app):
+    app = create_app()
+
+    unknown = client.put(f"/api/v1/apps/{app['id']}/apk", json={"sha256": "0" * 64}, headers=auth_headers)
+    malformed = client.put(f"/api/v1/apps/{app['id']}/apk", json={"sha256": "not-a-digest"}, headers=auth_headers)
+
+    assert unknown.status_code == 404 and malformed.status_code == 422
+
+
+def test_link_to_someone_elses_app_is_not_found(client, auth_headers, other_auth_headers, create_app):
+    app = create_app()
+    upload(client, auth_headers, app["id"])
+    other = client.post("/api/v1/apps/create", json={"name": "Theirs"}, headers=other_auth_headers).json()["data"]
+
+    response = client.put(f"/api/v1/apps/{other['id']}/apk", json={"sha256": DIGEST}, headers=auth_headers)
+
+    assert response.status_code == 404
+
+
+def test_different_apks_get_different_objects(client, auth_headers, create_app):
+    first = upload(client, auth_headers, create_app()["id"])
+    second = upload(client, auth_headers, create_app()["id"], APK + b"changed")
+
+    assert second["deduplicated"] is False
+    assert first["apk_url"] != second["apk_url"]
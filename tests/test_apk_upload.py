@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import io
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from repositories.local import local_storage
+from repositories.supabase import AsyncSupabaseStorageRepository, SupabaseStorageRepository
+from services.apk_upload import (
+    APK_BUCKET, ApkTooLarge, aiter_chunks, apk_object_path, check_declared_size, hash_file, iter_chunks
+)
+
+APK = b"PK\x03\x04" + bytes(range(256)) * 40
+
+
+def test_iter_chunks_is_bounded():
+    chunks = list(iter_chunks(io.BytesIO(APK), chunk_size=1000))
+
+    assert b"".join(chunks) == APK
+    assert max(len(chunk) for chunk in chunks) == 1000
+    with pytest.raises(ApkTooLarge):
+        list(iter_chunks(io.BytesIO(APK), max_bytes=len(APK) - 1))
+
+
+def test_aiter_chunks_matches_iter_chunks():
+    async def collect():
+        return [chunk async for chunk in aiter_chunks(io.BytesIO(APK), chunk_size=1000)]
+
+    assert asyncio.run(collect()) == list(iter_chunks(io.BytesIO(APK), chunk_size=1000))
+
+
+def test_hash_file_rewinds_for_the_upload():
+    fileobj = io.BytesIO(APK)
+
+    digest, size = hash_file(fileobj)
+
+    assert (digest, size) == (hashlib.sha256(APK).hexdigest(), len(APK))
+    assert fileobj.tell() == 0
+
+
+def test_declared_size_is_checked_before_reading():
+    check_declared_size(SimpleNamespace(size=None))
+    with pytest.raises(ApkTooLarge):
+        check_declared_size(SimpleNamespace(size=11), max_bytes=10)
+
+
+def recording_transport(requests):
+    def handler(request):
+        requests.append((request, request.read()))
+        return httpx.Response(200, json={"Key": "ok"})
+    return httpx.MockTransport(handler)
+
+
+def test_storage_upload_streams_the_raw_body():
+    requests = []
+    storage = SupabaseStorageRepository(None, httpx.Client(transport=recording_transport(requests)),
+                                        "https://project.supabase.co", "service-role")
+
+    storage.upload(APK_BUCKET, "sha256/abc.apk", io.BytesIO(APK))
+
+    request, body = requests[0]
+    assert str(request.url) == "https://project.supabase.co/storage/v1/object/apks/sha256/abc.apk"
+    assert request.headers["transfer-encoding"] == "chunked" and "content-length" not in request.headers
+    assert request.headers["x-upsert"] == "true"
+    assert body == APK
+
+
+def test_async_storage_upload_streams_the_raw_body():
+    requests = []
+
+    class Connection:
+        url = "https://project.supabase.co"
+        service_role_key = "service-role"
+        http_client = httpx.AsyncClient(transport=recording_transport(requests))
+
+        async def client(self):
+            return None
+
+    asyncio.run(AsyncSupabaseStorageRepository(Connection()).upload(APK_BUCKET, "sha256/abc.apk", io.BytesIO(APK)))
+
+    request, body = requests[0]
+    assert request.headers["transfer-encoding"] == "chunked"
+    assert body == APK
+
+
+def test_multipart_upload(client, auth_headers, create_app):
+    app = create_app()
+
+    response = client.post(f"/api/v1/apps/{app['id']}/upload-apk", headers=auth_headers,
+                           files={"file": ("app.apk", APK, "application/vnd.android.package-archive")})
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    digest = hashlib.sha256(APK).hexdigest()
+    assert data["apk_sha256"] == digest and data["apk_size"] == len(APK)
+    with open(local_storage.file_path(APK_BUCKET, apk_object_path(digest)), "rb") as f:
+        assert f.read() == APK
+
+
+def test_upload_to_someone_elses_app_is_not_found(client, create_app, make_token):
+    app = create_app()
+
+    response = client.post(f"/api/v1/apps/{app['id']}/upload-apk",
+                           headers={"Authorization": f"Bearer {make_token('someone-else')}"},
+                           files={"file": ("app.apk", APK, "application/vnd.android.package-archive")})
+
+    assert response.status_code == 404
@@ -0,0 +1,93 @@
+from services import app_cache as app_cache_module
+from services.app_cache import AppCache
+from services.supabase_service import app_repository
+
+
+def test_hits_misses_and_ttl(monkeypatch):
+    cache = AppCache(ttl=10)
+    now = [100.0]
+    monkeypatch.setattr(app_cache_module.time, "monotonic", lambda: now[0])
+
+    cache.set(("apps", "u"), ["a"], 10, cache.generation("u"))
+    hit = cache.get(("apps", "u"))
+    now[0] += 10
+    expired = cache.get(("apps", "u"))
+
+    assert hit == ["a"] and expired is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.size_bytes == 0
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = AppCache(max_bytes=100)
+    cache.set(("app", "u", "1"), "one", 40, 0)
+    cache.set(("app", "u", "2"), "two", 40, 0)
+    cache.get(("app", "u", "1"))
+
+    cache.set(("app", "u", "3"), "three", 40, 0)
+    cache.set(("app", "u", "huge"), "huge", 101, 0)
+
+    assert cache.get(("app", "u", "2")) is None
+    assert cache.get(("app", "u", "1")) == "one" and cache.get(("app", "u", "3")) == "three"
+    assert cache.get(("app", "u", "huge")) is None
+    assert cache.evictions == 1 and cache.size_bytes == 80
+
+
+def test_invalidate_drops_lists_and_the_named_apps_only():
+    cache = AppCache()
+    for key in [("apps", "u"), ("apps", "u", ("id", "name")), ("app", "u", "1"), ("app", "u", "2"), ("apps", "other")]:
+        cache.set(key, "value", 1, 0)
+
+    cache.invalidate("u", "1")
+
+    assert cache.get(("apps", "u")) is None and cache.get(("apps", "u", ("id", "name"))) is None
+    assert cache.get(("app", "u", "1")) is None
+    assert cache.get(("app", "u", "2")) == "value"
+    assert cache.get(("apps", "other")) == "value"
+
+
+def test_reads_started_before_a_write_are_not_stored():
+    cache = AppCache()
+    generation = cache.generation("u")
+
+    cache.invalidate("u")
+    cache.set(("apps", "u"), ["stale"], 1, generation)
+
+    assert cache.get(("apps", "u")) is None
+
+
+def test_list_is_served_from_cache_until_a_write(client, auth_headers, create_app, monkeypatch):
+    create_app(name="First")
+    calls = []
+    original = app_repository.get_user_apps
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+    monkeypatch.setattr(app_repository, "get_user_apps", counting)
+
+    first = client.get("/api/v1/apps", headers=auth_headers).json()["data"]
+    cached = client.get("/api/v1/apps", headers=auth_headers).json()["data"]
+    create_app(name="Second")
+    fresh = client.get("/api/v1/apps", headers=auth_headers).json()["data"]
+
+    assert len(calls) == 2
+    assert first == cached and len(fresh) == 2
+
+
+def test_update_invalidates_the_cached_app(client, auth_headers, create_app):
+    app = create_app(name="Before")
+    client.get(f"/api/v1/apps/{app['id']}", headers=auth_headers)
+
+    client.put(f"/api/v1/apps/{app['id']}", json={"name": "After"}, headers=auth_headers)
+
+    assert client.get(f"/api/v1/apps/{app['id']}", headers=auth_headers).json()["data"]["name"] == "After"
+
+
+def test_users_do_not_share_entries(client, auth_headers, create_app, make_token):
+    create_app()
+    client.get("/api/v1/apps", headers=auth_headers)
+
+    response = client.get("/api/v1/apps", headers={"Authorization": f"Bearer {make_token('someone-else')}"})
+
+    assert response.json()["data"] == []
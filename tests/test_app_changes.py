@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+import pytest
+
+from routes import apps as apps_routes
+from services.pagination import parse_timestamp
+
+
+def changes(client, auth_headers, since: str):
+    response = client.get(f"/api/v1/apps/changes?since={quote(since)}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+@pytest.mark.parametrize("value", [
+    "2026-10-17T10:00:00+00:00",
+    "2026-10-17T10:00:00 00:00",
+    "2026-10-17T10:00:00Z",
+    "2026-10-17T10:00:00",
+    "2026-10-17 10:00:00",
+    "2026-10-17T12:00:00 02:00",
+    "2026-10-17T12:00:00 0200",
+])
+def test_parse_timestamp_is_tolerant(value):
+    assert parse_timestamp(value) == datetime(2026, 10, 17, 10, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("value", ["yesterday", "", "2026-13-01T00:00:00", "2026-10-17T10:00:00 xx"])
+def test_parse_timestamp_rejects_garbage(value):
+    with pytest.raises(ValueError):
+        parse_timestamp(value)
+
+
+def test_unencoded_offset_is_accepted(client, auth_headers):
+    # A literal "+" in a query string decodes to a space
+    response = client.get("/api/v1/apps/changes?since=2026-10-17T10:00:00+00:00", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["next_since"] == "2026-10-17T10:00:00+00:00"
+
+
+def test_invalid_since_is_rejected(client, auth_headers):
+    response = client.get("/api/v1/apps/changes?since=yesterday", headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_returns_changes_and_tombstones(client, auth_headers, create_app):
+    start = changes(client, auth_headers, "2000-01-01T00:00:00+00:00")["next_since"]
+    kept, removed = create_app(name="Kept"), create_app(name="Removed")
+    client.delete(f"/api/v1/apps/{removed['id']}", headers=auth_headers)
+
+    data = changes(client, auth_headers, start)
+
+    assert [app["id"] for app in data["changed"]] == [kept["id"]]
+    assert [tombstone["id"] for tombstone in data["deleted"]] == [removed["id"]]
+    assert parse_timestamp(data["next_since"]) >= parse_timestamp(data["deleted"][0]["deleted_at"])
+
+
+def test_overlap_window_returns_recent_changes_again(client, auth_headers, create_app, monkeypatch):
+    app = create_app()
+    first = changes(client, auth_headers, "2000-01-01T00:00:00+00:00")
+
+    again = changes(client, auth_headers, first["next_since"])
+    monkeypatch.setattr(apps_routes, "CHANGES_OVERLAP_SECONDS", 0)
+    exact = changes(client, auth_headers, first["next_since"])
+
+    assert [item["id"] for item in again["changed"]] == [app["id"]]
+    # gte: a row stamped exactly at `since` is not skipped
+    assert [item["id"] for item in exact["changed"]] == [app["id"]]
+
+
+def test_next_since_never_moves_backwards(client, auth_headers, create_app):
+    create_app()
+    future = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+
+    data = changes(client, auth_headers, future)
+
+    assert data["changed"] == []
+    assert parse_timestamp(data["next_since"]) == parse_timestamp(future)
+
+
+def test_other_users_changes_are_hidden(client, create_app, make_token):
+    create_app()
+
+    data = changes(client, {"Authorization": f"Bearer {make_token('someone-else')}"}, "2000-01-01T00:00:00+00:00")
+
+    assert data["changed"] == [] and data["deleted"] == []
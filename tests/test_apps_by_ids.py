@@ -0,0 +1,32 @@
+from services import supabase_service
+
+
+def test_returns_apps_in_requested_order_with_missing(client, auth_headers, create_app):
+    first, second = create_app(name="First"), create_app(name="Second")
+
+    response = client.get(f"/api/v1/apps?ids={second['id']},nope,{first['id']}", headers=auth_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [app["id"] for app in body["data"]] == [second["id"], first["id"]]
+    assert body["missing"] == ["nope"]
+
+
+def test_other_users_apps_are_missing(client, create_app, make_token):
+    app = create_app()
+
+    response = client.get(f"/api/v1/apps?ids={app['id']}", headers={"Authorization": f"Bearer {make_token('someone-else')}"})
+
+    assert response.json()["data"] == []
+    assert response.json()["missing"] == [app["id"]]
+
+
+def test_backend_error_is_a_server_error(client, auth_headers, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(supabase_service.app_repository, "get_apps_by_ids", fail)
+
+    response = client.get("/api/v1/apps?ids=a,b", headers=auth_headers)
+
+    assert response.status_code == 500
+    assert "database unavailable" in response.json()["detail"]
@@ -0,0 +1,67 @@
+import asyncio
+
+from middleware.auth_middleware import AuthMiddleware
+
+
+def test_protected_routes_require_a_token(client):
+    response = client.get("/api/v1/apps")
+
+    assert response.status_code == 401
+    assert response.json() == {"success": False, "message": "Authentication token required.", "data": None}
+
+
+def test_public_routes_do_not(client):
+    assert client.get("/").status_code == 200
+
+
+def test_invalid_tokens_are_rejected_everywhere(client, make_token):
+    headers = {"Authorization": f"Bearer {make_token('user', secret='wrong-secret-wrong-secret-wrong-secret')}"}
+
+    assert client.get("/api/v1/apps", headers=headers).status_code == 401
+    assert client.get("/", headers=headers).status_code == 401
+
+
+def test_expired_tokens_are_rejected(client, make_token):
+    headers = {"Authorization": f"Bearer {make_token('user', expires_in=-60)}"}
+
+    assert client.get("/api/v1/apps", headers=headers).status_code == 401
+
+
+def test_only_bearer_tokens_are_read(client, make_token):
+    response = client.get("/api/v1/apps", headers={"Authorization": f"Token {make_token('user')}"})
+
+    assert response.json()["message"] == "Authentication token required."
+
+
+def test_the_user_reaches_the_route(client, auth_headers, create_app, user_id):
+    app = create_app()
+
+    response = client.get(f"/api/v1/apps/{app['id']}", headers=auth_headers)
+
+    assert response.json()["data"]["user_id"] == user_id
+
+
+def test_request_bodies_stream_through(client, auth_headers, create_app):
+    app = create_app()
+    created = client.post(f"/api/v1/apps/{app['id']}/upload-apk/sessions", json={}, headers=auth_headers)
+    url = f"/api/v1/apps/{app['id']}/upload-apk/sessions/{created.json()['data']['session_id']}"
+
+    def body():
+        for _ in range(4):
+            yield b"x" * 1000
+
+    response = client.put(url, content=body(), headers={**auth_headers, "Upload-Offset": "0"})
+
+    assert response.status_code == 200
+    assert response.headers["Upload-Offset"] == "4000"
+
+
+def test_non_http_scopes_pass_through():
+    seen = []
+
+    async def inner(scope, receive, send):
+        seen.append(scope["type"])
+
+    asyncio.run(AuthMiddleware(inner)({"type": "lifespan"}, None, None))
+
+    assert seen == ["lifespan"]
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import jwt
+
+from services import supabase_service
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_NAMES = ("DATA_BACKEND", "SUPABASE_URL", "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_JWT_SECRET",
+                "SUPABASE_JWKS_URL", "ALLOW_INSECURE_LOCAL_AUTH")
+
+
+def start(**env):
+    """Import services.supabase_service in a fresh interpreter; returns (exit code, auth repository class or error)"""
+    environ = {name: value for name, value in os.environ.items() if name not in CONFIG_NAMES}
+    environ.update(env)
+    result = subprocess.run(
+        [sys.executable, "-c", "import services.supabase_service as s; print(type(s.auth_repository).__name__)"],
+        cwd=ROOT, env=environ, capture_output=True, text=True, timeout=60,
+    )
+    return result.returncode, (result.stdout.strip().splitlines() or [""])[-1] if result.returncode == 0 else result.stderr
+
+
+def test_missing_supabase_config_refuses_to_start():
+    code, error = start()
+
+    assert code != 0
+    assert "DATA_BACKEND is supabase" in error
+
+
+def test_unknown_backend_refuses_to_start():
+    code, error = start(DATA_BACKEND="mongo", SUPABASE_JWT_SECRET="secret")
+
+    assert code != 0
+    assert "Unknown DATA_BACKEND" in error
+
+
+def test_sqlite_without_token_verification_refuses_to_start():
+    code, error = start(DATA_BACKEND="sqlite")
+
+    assert code != 0
+    assert "ALLOW_INSECURE_LOCAL_AUTH" in error
+
+
+def test_sqlite_with_jwt_secret_has_no_unverified_auth():
+    assert start(DATA_BACKEND="sqlite", SUPABASE_JWT_SECRET="secret") == (0, "NoneType")
+
+
+def test_sqlite_insecure_auth_is_opt_in():
+    assert start(DATA_BACKEND="sqlite", ALLOW_INSECURE_LOCAL_AUTH="true") == (0, "LocalAuthRepository")
+
+
+def test_unsigned_token_is_rejected(client, user_id):
+    unsigned = jwt.encode({"sub": user_id, "aud": "authenticated"}, key=None, algorithm="none")
+
+    response = client.get("/api/v1/apps", headers={"Authorization": f"Bearer {unsigned}"})
+
+    assert supabase_service.auth_repository is None
+    assert response.status_code == 401
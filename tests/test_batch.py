@@ -0,0 +1,64 @@
+from models.app import MAX_BATCH_SIZE, AppBatchUpdateItem
+from repositories.base import group_updates
+
+
+def test_group_updates_by_identical_payload():
+    groups = group_updates([
+        AppBatchUpdateItem(id="a", status="inactive"),
+        AppBatchUpdateItem(id="b", name="B"),
+        AppBatchUpdateItem(id="c", status="inactive"),
+    ])
+
+    assert groups == [({"status": "inactive"}, ["a", "c"]), ({"name": "B"}, ["b"])]
+
+
+def test_batch_create(client, auth_headers):
+    response = client.post("/api/v1/apps/batch", json={"apps": [{"name": "One"}, {"name": "Two", "status": "inactive"}]},
+                           headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [(item["index"], item["data"]["name"]) for item in data] == [(0, "One"), (1, "Two")]
+    assert len(client.get("/api/v1/apps", headers=auth_headers).json()["data"]) == 2
+
+
+def test_batch_create_is_validated(client, auth_headers):
+    too_many = {"apps": [{"name": f"App {i}"} for i in range(MAX_BATCH_SIZE + 1)]}
+
+    assert client.post("/api/v1/apps/batch", json={"apps": []}, headers=auth_headers).status_code == 422
+    assert client.post("/api/v1/apps/batch", json=too_many, headers=auth_headers).status_code == 422
+    assert client.post("/api/v1/apps/batch", json={"apps": [{"name": "Ok"}, {}]}, headers=auth_headers).status_code == 422
+    assert client.get("/api/v1/apps", headers=auth_headers).json()["data"] == []
+
+
+def test_batch_update_reports_each_item(client, auth_headers, other_auth_headers, create_app):
+    mine = create_app(name="Mine")
+    theirs = client.post("/api/v1/apps/create", json={"name": "Theirs"},
+                         headers=other_auth_headers).json()["data"]
+
+    response = client.put("/api/v1/apps/batch", json={"apps": [
+        {"id": mine["id"], "status": "inactive"}, {"id": theirs["id"], "status": "inactive"},
+    ]}, headers=auth_headers)
+
+    data = response.json()["data"]
+    assert [(item["id"], item["success"]) for item in data] == [(mine["id"], True), (theirs["id"], False)]
+    assert data[0]["data"]["status"] == "inactive"
+
+
+def test_batch_delete_reports_each_item(client, auth_headers, create_app):
+    first, second = create_app(), create_app()
+
+    response = client.post("/api/v1/apps/batch/delete", json={"ids": [first["id"], "missing", second["id"]]},
+                           headers=auth_headers)
+
+    assert [item["success"] for item in response.json()["data"]] == [True, False, True]
+    assert client.get("/api/v1/apps", headers=auth_headers).json()["data"] == []
+
+
+def test_duplicate_ids_are_rejected(client, auth_headers, create_app):
+    app = create_app()
+
+    update = client.put("/api/v1/apps/batch", json={"apps": [{"id": app["id"]}, {"id": app["id"]}]}, headers=auth_headers)
+    delete = client.post("/api/v1/apps/batch/delete", json={"ids": [app["id"], app["id"]]}, headers=auth_headers)
+
+    assert update.status_code == 400 and delete.status_code == 400
@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_benchmark(script, tmp_path, *args):
+    """Run a benchmark script in a fresh interpreter (they configure the backend at import); returns its results"""
+    output = tmp_path / "results.json"
+    result = subprocess.run(
+        [sys.executable, os.path.join("benchmarks", script), *args, "--output", str(output)],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    with open(output) as f:
+        return json.load(f)["results"]
+
+
+def test_write_roundtrips_benchmark_runs(tmp_path):
+    results = run_benchmark("bench_write_roundtrips.py", tmp_path, "--latency-ms", "0", "--iterations", "3")
+
+    assert results["update/single"]["requests_per_call"] == 1
+    assert results["delete/single"]["requests_per_call"] == 1
+    assert results["update/legacy"]["requests_per_call"] == 2
+
+
+def test_preview_templates_benchmark_runs(tmp_path):
+    results = run_benchmark("bench_preview_templates.py", tmp_path, "--screens", "1,5", "--iterations", "5", "--repeat", "1")
+
+    assert set(results) == {f"{app_type}/{count}" for app_type in ("app", "game", "shopping", "chat") for count in (1, 5)}
+    assert results["app/5"]["output_bytes"] > results["app/1"]["output_bytes"]
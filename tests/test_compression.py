@@ -0,0 +1,84 @@
+import gzip
+
+import pytest
+
+from services.compression import ENCODINGS, compress_variants, negotiate, variant_etag
+
+
+def test_compress_variants_keeps_only_smaller_copies():
+    body = b"<div>preview</div>" * 200
+
+    variants = compress_variants(body)
+
+    assert set(variants) == set(ENCODINGS)
+    assert gzip.decompress(variants["gzip"]) == body
+    assert compress_variants(b"x") == {}
+
+
+def test_brotli_variant_is_preferred():
+    brotli = pytest.importorskip("brotli")
+    body = b"<div>preview</div>" * 200
+
+    variants = compress_variants(body)
+
+    assert brotli.decompress(variants["br"]) == body
+    assert negotiate("gzip, br", list(variants)) == "br"
+    assert variant_etag('"abc"', "br") == '"abc-br"'
+
+
+def test_gzip_variant_is_deterministic():
+    body = b"<p>same</p>" * 100
+
+    assert compress_variants(body)["gzip"] == compress_variants(body)["gzip"]
+
+
+def test_negotiate():
+    assert negotiate(None, ["gzip"]) is None
+    assert negotiate("gzip, deflate", ["gzip"]) == "gzip"
+    assert negotiate("br;q=0.5, gzip;q=0.8", ["br", "gzip"]) == "gzip"
+    assert negotiate("br, gzip", ["br", "gzip"]) == "br"
+    assert negotiate("*", ["gzip"]) == "gzip"
+    assert negotiate("gzip;q=0, *", ["gzip"]) is None
+    assert negotiate("gzip;q=bogus", ["gzip"]) is None
+    assert negotiate("identity", ["gzip"]) is None
+
+
+def test_variant_etag():
+    assert variant_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert variant_etag('"abc"', None) == '"abc"'
+
+
+def test_preview_is_served_compressed(client, auth_headers, create_app):
+    app = create_app()
+
+    plain = client.get(f"/api/v1/apps/{app['id']}/preview", headers={**auth_headers, "Accept-Encoding": "identity"})
+    packed = client.get(f"/api/v1/apps/{app['id']}/preview", headers={**auth_headers, "Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in plain.headers["Vary"] and "Accept-Encoding" in packed.headers["Vary"]
+    assert packed.text == plain.text
+    assert packed.headers["ETag"] == variant_etag(plain.headers["ETag"], "gzip")
+
+
+def test_compressed_preview_revalidates_with_its_own_etag(client, auth_headers, create_app):
+    app = create_app()
+    headers = {**auth_headers, "Accept-Encoding": "gzip"}
+    etag = client.get(f"/api/v1/apps/{app['id']}/preview", headers=headers).headers["ETag"]
+
+    cached = client.get(f"/api/v1/apps/{app['id']}/preview", headers={**headers, "If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag and "Accept-Encoding" in cached.headers["Vary"]
+
+
+def test_preview_is_served_with_brotli(client, auth_headers, create_app):
+    pytest.importorskip("brotli")
+    app = create_app()
+
+    plain = client.get(f"/api/v1/apps/{app['id']}/preview", headers={**auth_headers, "Accept-Encoding": "identity"})
+    packed = client.get(f"/api/v1/apps/{app['id']}/preview", headers={**auth_headers, "Accept-Encoding": "gzip, br"})
+
+    assert packed.headers["Content-Encoding"] == "br"
+    assert packed.text == plain.text
+    assert packed.headers["ETag"] == variant_etag(plain.headers["ETag"], "br")
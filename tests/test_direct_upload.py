@@ -0,0 +1,122 @@
+import os
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from repositories.local import local_storage
+from services import async_supabase_service
+from services.apk_upload import APK_BUCKET, direct_apk_path
+
+APK = b"PK\x03\x04" + b"\x00" * 1024
+
+
+def signed_upload(client, auth_headers, app_id):
+    response = client.post(f"/api/v1/apps/{app_id}/upload-apk/direct", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    url = urlparse(response.json()["data"]["upload_url"])
+    return url.path, parse_qs(url.query)["token"][0]
+
+
+def test_direct_upload_round_trip(client, auth_headers, create_app):
+    app = create_app()
+    path, token = signed_upload(client, auth_headers, app["id"])
+
+    uploaded = client.put(path, params={"token": token}, content=APK)
+    completed = client.post(f"/api/v1/apps/{app['id']}/upload-apk/direct/complete", headers=auth_headers)
+
+    assert uploaded.status_code == 200
+    assert completed.status_code == 200, completed.text
+    data = completed.json()["data"]
+    assert data["apk_size"] == len(APK)
+    assert data["apk_sha256"] is None
+    assert client.get(urlparse(data["apk_url"]).path).content == APK
+
+
+def test_signed_url_cannot_overwrite_a_completed_upload(client, auth_headers, create_app):
+    app = create_app()
+    path, token = signed_upload(client, auth_headers, app["id"])
+    client.put(path, params={"token": token}, content=APK)
+    apk_url = client.post(f"/api/v1/apps/{app['id']}/upload-apk/direct/complete",
+                          headers=auth_headers).json()["data"]["apk_url"]
+
+    # The URL is still valid, but the app now points at a path it can't write
+    assert client.put(path, params={"token": token}, content=b"PK\x03\x04swapped").status_code == 200
+    assert client.get(urlparse(apk_url).path).content == APK
+    assert client.get(f"/api/v1/apps/{app['id']}", headers=auth_headers).json()["data"]["apk_url"] == apk_url
+
+
+def test_complete_on_someone_elses_app_is_not_found(client, auth_headers, other_auth_headers, create_app):
+    app = create_app()
+    path, token = signed_upload(client, auth_headers, app["id"])
+    client.put(path, params={"token": token}, content=APK)
+
+    response = client.post(f"/api/v1/apps/{app['id']}/upload-apk/direct/complete", headers=other_auth_headers)
+
+    assert response.status_code == 404
+    # Storage was not touched: the owner's upload is still there to complete
+    assert local_storage.size(APK_BUCKET, direct_apk_path(app["id"])) == len(APK)
+
+
+def test_signed_url_needs_a_valid_token(client, auth_headers, create_app):
+    app, other = create_app(), create_app()
+    path, token = signed_upload(client, auth_headers, app["id"])
+    other_path, _ = signed_upload(client, auth_headers, other["id"])
+
+    assert client.put(path, params={"token": token + "0"}, content=APK).status_code == 403
+    # The token is bound to its object path
+    assert client.put(other_path, params={"token": token}, content=APK).status_code == 403
+
+
+def test_expired_token_is_rejected():
+    signed = local_storage.create_signed_upload_url(APK_BUCKET, "expired.apk", expires_in=-1)
+
+    assert not local_storage.verify_upload_token(APK_BUCKET, "expired.apk", signed["token"])
+    assert local_storage.verify_upload_token(
+        APK_BUCKET, "fresh.apk", local_storage.create_signed_upload_url(APK_BUCKET, "fresh.apk", 60)["token"]
+    )
+
+
+def test_paths_cannot_escape_the_storage_root():
+    expires_at = int(time.time()) + 60
+    token = f"{expires_at}.{local_storage._signature(APK_BUCKET, '../../escape.apk', expires_at)}"
+
+    assert local_storage.verify_upload_token(APK_BUCKET, "../../escape.apk", token)
+    with pytest.raises(ValueError):
+        local_storage.file_path(APK_BUCKET, "../../escape.apk")
+
+
+def test_complete_without_upload_is_a_conflict(client, auth_headers, create_app):
+    app = create_app()
+
+    response = client.post(f"/api/v1/apps/{app['id']}/upload-apk/direct/complete", headers=auth_headers)
+
+    assert response.status_code == 409
+
+
+def test_oversized_upload_is_deleted(client, auth_headers, create_app, monkeypatch):
+    app = create_app()
+    path, token = signed_upload(client, auth_headers, app["id"])
+    client.put(path, params={"token": token}, content=APK)
+    monkeypatch.setattr(async_supabase_service, "MAX_APK_BYTES", len(APK) - 1)
+
+    response = client.post(f"/api/v1/apps/{app['id']}/upload-apk/direct/complete", headers=auth_headers)
+
+    assert response.status_code == 413
+    assert local_storage.size(APK_BUCKET, direct_apk_path(app["id"])) is None
+    assert os.listdir(local_storage.file_path(APK_BUCKET, f"verified/{app['id']}")) == []
+
+
+def test_oversized_upload_is_rejected_even_if_delete_fails(client, auth_headers, create_app, monkeypatch):
+    app = create_app()
+    path, token = signed_upload(client, auth_headers, app["id"])
+    client.put(path, params={"token": token}, content=APK)
+    monkeypatch.setattr(async_supabase_service, "MAX_APK_BYTES", len(APK) - 1)
+
+    def fail(*args):
+        raise OSError("storage unavailable")
+    monkeypatch.setattr(local_storage, "delete", fail)
+
+    response = client.post(f"/api/v1/apps/{app['id']}/upload-apk/direct/complete", headers=auth_headers)
+
+    assert response.status_code == 413
@@ -0,0 +1,65 @@
+from services.etag import CACHE_CONTROL, make_etag
+
+
+def test_make_etag_is_strong_and_order_sensitive():
+    etag = make_etag("a", "b")
+
+    assert etag.startswith('"') and etag.endswith('"') and not etag.startswith("W/")
+    assert etag == make_etag("a", "b") != make_etag("b", "a")
+    # Parts are delimited, so they can't run together
+    assert make_etag("ab", "c") != make_etag("a", "bc")
+
+
+def test_app_revalidates_with_304(client, auth_headers, create_app):
+    app = create_app()
+    first = client.get(f"/api/v1/apps/{app['id']}", headers=auth_headers)
+    etag = first.headers["ETag"]
+
+    cached = client.get(f"/api/v1/apps/{app['id']}", headers={**auth_headers, "If-None-Match": etag})
+    weak = client.get(f"/api/v1/apps/{app['id']}", headers={**auth_headers, "If-None-Match": f'"other", W/{etag}'})
+
+    assert first.headers["Cache-Control"] == CACHE_CONTROL
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["ETag"] == etag
+    assert weak.status_code == 304
+
+
+def test_etag_changes_after_a_write(client, auth_headers, create_app):
+    app = create_app(name="Before")
+    etag = client.get(f"/api/v1/apps/{app['id']}", headers=auth_headers).headers["ETag"]
+
+    client.put(f"/api/v1/apps/{app['id']}", json={"name": "After"}, headers=auth_headers)
+    response = client.get(f"/api/v1/apps/{app['id']}", headers={**auth_headers, "If-None-Match": etag})
+
+    assert response.status_code == 200 and response.headers["ETag"] != etag
+
+
+def test_list_etag_depends_on_the_query(client, auth_headers, create_app):
+    create_app()
+    full = client.get("/api/v1/apps", headers=auth_headers).headers["ETag"]
+    projected = client.get("/api/v1/apps?fields=name", headers=auth_headers).headers["ETag"]
+
+    response = client.get("/api/v1/apps?fields=name", headers={**auth_headers, "If-None-Match": full})
+
+    assert full != projected
+    assert response.status_code == 200
+
+
+def test_list_etag_changes_when_an_app_is_deleted(client, auth_headers, create_app):
+    first, _ = create_app(), create_app()
+    etag = client.get("/api/v1/apps", headers=auth_headers).headers["ETag"]
+
+    client.delete(f"/api/v1/apps/{first['id']}", headers=auth_headers)
+
+    assert client.get("/api/v1/apps", headers={**auth_headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_preview_revalidates_with_304(client, auth_headers, create_app):
+    app = create_app()
+    first = client.get(f"/api/v1/apps/{app['id']}/preview", headers={**auth_headers, "Accept-Encoding": "identity"})
+
+    cached = client.get(f"/api/v1/apps/{app['id']}/preview",
+                        headers={**auth_headers, "Accept-Encoding": "identity", "If-None-Match": first.headers["ETag"]})
+
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == first.headers["ETag"]
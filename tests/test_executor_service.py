@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.executor_service import BoundedExecutor, ExecutorSaturated
+
+
+def test_runs_calls_and_records_stats():
+    executor = BoundedExecutor(max_workers=2, max_queue=2, name="test")
+
+    assert asyncio.run(executor.run("add", lambda a, b: a + b, 1, 2)) == 3
+
+    stats = executor.stats()
+    assert stats["methods"]["add"]["calls"] == 1
+    assert stats["active"] == 0 and stats["queued"] == 0
+
+
+def test_errors_are_counted_and_raised():
+    executor = BoundedExecutor(max_workers=1, max_queue=0, name="test")
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run("fail", fail))
+    assert executor.stats()["methods"]["fail"]["errors"] == 1
+
+
+def test_rejects_beyond_workers_plus_queue():
+    executor = BoundedExecutor(max_workers=1, max_queue=1, name="test")
+    release = threading.Event()
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(executor.run("wait", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(ExecutorSaturated):
+                await executor.run("wait", release.wait)
+        finally:
+            release.set()
+        await asyncio.gather(*blocked)
+
+    asyncio.run(scenario())
+    assert executor.stats()["methods"]["wait"]["rejected"] == 1
+
+
+def test_cancelled_request_still_counts_until_its_thread_finishes():
+    executor = BoundedExecutor(max_workers=1, max_queue=0, name="test")
+    started, release = threading.Event(), threading.Event()
+
+    def work():
+        started.set()
+        release.wait()
+
+    async def scenario():
+        task = asyncio.ensure_future(executor.run("work", work))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        try:
+            # The thread is still busy, so there is no room for another call
+            assert executor.stats()["active"] == 1
+            with pytest.raises(ExecutorSaturated):
+                await asyncio.wait_for(executor.run("work", lambda: None), timeout=1)
+        finally:
+            release.set()
+        for _ in range(100):
+            if executor._pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert executor._pending == 0
+        assert await executor.run("work", lambda: "ok") == "ok"
+
+    asyncio.run(scenario())
+
+
+def test_saturated_reads_answer_503(client, auth_headers, create_app, monkeypatch):
+    from repositories.executor import ExecutorAppRepository
+    from services import async_supabase_service
+    from services.supabase_service import app_repository
+
+    app = create_app()
+    executor = BoundedExecutor(max_workers=1, max_queue=0, name="test")
+    monkeypatch.setattr(async_supabase_service, "async_app_repository", ExecutorAppRepository(app_repository, executor))
+    release = threading.Event()
+    blocker = threading.Thread(target=lambda: asyncio.run(executor.run("wait", release.wait)))
+    blocker.start()
+    try:
+        while not executor.stats()["active"]:
+            time.sleep(0.01)
+        responses = [client.get(url, headers=auth_headers) for url in (
+            "/api/v1/apps", "/api/v1/apps?limit=10", f"/api/v1/apps/{app['id']}",
+            f"/api/v1/apps?ids={app['id']}", f"/api/v1/apps/{app['id']}/preview",
+        )]
+    finally:
+        release.set()
+        blocker.join()
+
+    assert [response.status_code for response in responses] == [503] * 5
+    assert client.get("/api/v1/apps", headers=auth_headers).json()["data"][0]["id"] == app["id"]
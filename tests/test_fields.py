@@ -0,0 +1,66 @@
+import pytest
+
+from models.app import AppResponse, parse_app_fields, project_app
+from services.supabase_service import app_repository
+
+
+def test_parse_app_fields():
+    assert parse_app_fields(None) is None and parse_app_fields("") is None
+    assert parse_app_fields(" name , icon,name,id ") == ["id", "name", "icon"]
+    with pytest.raises(ValueError, match="password"):
+        parse_app_fields("name,password")
+
+
+def test_project_app_keeps_only_the_fields():
+    app = AppResponse(id="1", name="App", status="active", created_at="2026-01-01T00:00:00",
+                      updated_at="2026-01-01T00:00:00", user_id="u", screens=["Home"])
+
+    summary = project_app(app, ["id", "name"])
+
+    assert summary.model_dump(exclude_unset=True) == {"id": "1", "name": "App"}
+
+
+def test_list_returns_only_requested_fields(client, auth_headers, create_app):
+    create_app(name="App", color="#112233", screens=["Home"])
+
+    data = client.get("/api/v1/apps?fields=name,color", headers=auth_headers).json()["data"]
+
+    assert [set(app) for app in data] == [{"id", "name", "color"}]
+
+
+def test_projection_is_pushed_to_the_repository(client, auth_headers, create_app, monkeypatch):
+    create_app()
+    seen = []
+    original = app_repository.get_user_apps
+
+    def recording(user_id, fields=None):
+        seen.append(fields)
+        return original(user_id, fields)
+    monkeypatch.setattr(app_repository, "get_user_apps", recording)
+
+    client.get("/api/v1/apps?fields=name", headers=auth_headers)
+
+    assert seen == [["id", "name"]]
+
+
+def test_projection_of_a_cached_full_list_skips_the_backend(client, auth_headers, create_app, monkeypatch):
+    create_app(name="App")
+    client.get("/api/v1/apps", headers=auth_headers)
+
+    def fail(*args):
+        raise AssertionError("backend queried")
+    monkeypatch.setattr(app_repository, "get_user_apps", fail)
+
+    data = client.get("/api/v1/apps?fields=name", headers=auth_headers).json()["data"]
+
+    assert data[0]["name"] == "App" and set(data[0]) == {"id", "name"}
+
+
+def test_single_app_projection_and_unknown_fields(client, auth_headers, create_app):
+    app = create_app(name="App")
+
+    projected = client.get(f"/api/v1/apps/{app['id']}?fields=status", headers=auth_headers)
+    unknown = client.get(f"/api/v1/apps/{app['id']}?fields=secret", headers=auth_headers)
+
+    assert projected.json()["data"] == {"id": app["id"], "status": "active"}
+    assert unknown.status_code == 400
@@ -0,0 +1,35 @@
+import asyncio
+
+from routes import metrics
+from services import http_pool
+
+
+def test_clients_share_the_configured_limits_and_timeouts():
+    for client in (http_pool.create_sync_http_client(), http_pool.create_async_http_client()):
+        pool = client._transport._pool
+
+        assert client.timeout == http_pool.httpx.Timeout(
+            connect=http_pool.CONNECT_TIMEOUT, read=http_pool.READ_TIMEOUT,
+            write=http_pool.WRITE_TIMEOUT, pool=http_pool.POOL_TIMEOUT,
+        )
+        assert pool._max_connections == http_pool.MAX_CONNECTIONS
+        assert pool._max_keepalive_connections == http_pool.MAX_KEEPALIVE_CONNECTIONS
+        assert pool._keepalive_expiry == http_pool.KEEPALIVE_EXPIRY
+
+
+def test_async_client_closes_cleanly():
+    async def scenario():
+        client = http_pool.create_async_http_client()
+        await client.aclose()
+        return client.is_closed
+
+    assert asyncio.run(scenario())
+
+
+def test_pool_settings_are_reported(client, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "metrics-secret")
+
+    response = client.get("/api/v1/metrics", headers={"X-Metrics-Token": "metrics-secret"})
+
+    assert response.json()["data"]["http_pool"] == http_pool.pool_settings()
+    assert http_pool.pool_settings()["max_connections"] == http_pool.MAX_CONNECTIONS
@@ -0,0 +1,127 @@
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from services import supabase_service
+from services.jwt_verifier import LocalTokenVerifier, TokenVerificationUnavailable
+from services.supabase_service import SupabaseService
+
+SECRET = "unit-test-secret-that-is-32-bytes-long"
+
+
+def token(key=SECRET, algorithm="HS256", headers=None, **claims):
+    payload = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 60, **claims}
+    return jwt.encode({k: v for k, v in payload.items() if v is not None}, key, algorithm=algorithm, headers=headers)
+
+
+def test_hs256_token_is_verified_with_the_secret():
+    assert LocalTokenVerifier(jwt_secret=SECRET).verify(token()) == "user-1"
+
+
+@pytest.mark.parametrize("bad_token", [
+    token(key="another-secret-that-is-32-bytes-long!"),
+    token(exp=int(time.time()) - 10),
+    token(aud="anon"),
+    token(sub=None),
+    "not-a-jwt",
+])
+def test_invalid_tokens_are_rejected(bad_token):
+    assert LocalTokenVerifier(jwt_secret=SECRET).verify(bad_token) is None
+
+
+def test_leeway_accepts_recently_expired_tokens():
+    expired = token(exp=int(time.time()) - 5)
+
+    assert LocalTokenVerifier(jwt_secret=SECRET, leeway=30).verify(expired) == "user-1"
+
+
+def test_hs256_without_secret_is_undecided():
+    verifier = LocalTokenVerifier(jwks_url="https://project.supabase.co/auth/v1/.well-known/jwks.json")
+
+    with pytest.raises(TokenVerificationUnavailable):
+        verifier.verify(token())
+
+
+def test_unsupported_algorithm_is_rejected():
+    assert LocalTokenVerifier(jwt_secret=SECRET).verify(token(key=SECRET * 2, algorithm="HS512")) is None
+
+
+def test_rs256_token_is_verified_against_the_jwks(monkeypatch):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    verifier = LocalTokenVerifier(jwks_url="https://project.supabase.co/auth/v1/.well-known/jwks.json")
+    monkeypatch.setattr(verifier._jwks_client, "get_signing_key_from_jwt",
+                        lambda _: jwt.PyJWK.from_dict(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)))
+
+    assert verifier.verify(token(key=private_key, algorithm="RS256", headers={"kid": "k1"})) == "user-1"
+    other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    assert verifier.verify(token(key=other_key, algorithm="RS256", headers={"kid": "k1"})) is None
+
+
+def test_unreachable_jwks_is_undecided(monkeypatch):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    verifier = LocalTokenVerifier(jwks_url="https://project.supabase.co/auth/v1/.well-known/jwks.json")
+
+    def unreachable(_):
+        raise jwt.PyJWKClientConnectionError("connection refused")
+    monkeypatch.setattr(verifier._jwks_client, "get_signing_key_from_jwt", unreachable)
+
+    with pytest.raises(TokenVerificationUnavailable):
+        verifier.verify(token(key=private_key, algorithm="RS256"))
+
+
+def test_from_env_defaults_the_jwks_url(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "https://project.supabase.co/")
+    monkeypatch.delenv("SUPABASE_JWKS_URL", raising=False)
+    monkeypatch.delenv("SUPABASE_JWT_SECRET", raising=False)
+
+    verifier = LocalTokenVerifier.from_env()
+
+    assert verifier.jwks_url == "https://project.supabase.co/auth/v1/.well-known/jwks.json"
+
+
+@pytest.mark.parametrize("secret, setting, expected", [
+    (None, None, True),
+    (SECRET, None, False),
+    (None, "false", False),
+    (SECRET, "true", True),
+])
+def test_remote_fallback_defaults_on_without_a_secret(monkeypatch, secret, setting, expected):
+    if setting is None:
+        monkeypatch.delenv("SUPABASE_AUTH_REMOTE_FALLBACK", raising=False)
+    else:
+        monkeypatch.setenv("SUPABASE_AUTH_REMOTE_FALLBACK", setting)
+
+    assert LocalTokenVerifier(jwt_secret=secret).remote_fallback_from_env() is expected
+
+
+class StubAuth:
+    def __init__(self):
+        self.calls = 0
+
+    def verify_token(self, token):
+        self.calls += 1
+        return "remote-user"
+
+
+@pytest.mark.parametrize("fallback, expected", [(True, "remote-user"), (False, None)])
+def test_undecided_tokens_use_the_remote_fallback_only_when_enabled(monkeypatch, fallback, expected):
+    auth = StubAuth()
+    monkeypatch.setattr(supabase_service, "local_token_verifier",
+                        LocalTokenVerifier(jwks_url="https://project.supabase.co/auth/v1/.well-known/jwks.json"))
+    monkeypatch.setattr(supabase_service, "remote_token_fallback", fallback)
+    monkeypatch.setattr(supabase_service, "auth_repository", auth)
+
+    assert SupabaseService.verify_token(token()) == expected
+    assert auth.calls == (1 if fallback else 0)
+
+
+def test_locally_rejected_tokens_never_reach_the_backend(monkeypatch):
+    auth = StubAuth()
+    monkeypatch.setattr(supabase_service, "local_token_verifier", LocalTokenVerifier(jwt_secret=SECRET))
+    monkeypatch.setattr(supabase_service, "remote_token_fallback", True)
+    monkeypatch.setattr(supabase_service, "auth_repository", auth)
+
+    assert SupabaseService.verify_token(token(key="another-secret-that-is-32-bytes-long!")) is None
+    assert auth.calls == 0
@@ -0,0 +1,31 @@
+import pytest
+
+from routes import metrics
+
+
+def test_disabled_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", None)
+
+    assert client.get("/api/v1/metrics", headers={"X-Metrics-Token": "anything"}).status_code == 404
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Metrics-Token": "wrong"}])
+def test_requires_the_metrics_token(client, monkeypatch, headers):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "metrics-secret")
+
+    assert client.get("/api/v1/metrics", headers=headers).status_code == 403
+
+
+def test_user_tokens_do_not_grant_access(client, monkeypatch, auth_headers):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "metrics-secret")
+
+    assert client.get("/api/v1/metrics", headers=auth_headers).status_code == 403
+
+
+def test_returns_counters_with_the_token(client, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "metrics-secret")
+
+    response = client.get("/api/v1/metrics", headers={"X-Metrics-Token": "metrics-secret"})
+
+    assert response.status_code == 200
+    assert set(response.json()["data"]) == {"token_cache", "app_cache", "preview_cache", "supabase_executor", "http_pool"}
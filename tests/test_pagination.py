@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from services.pagination import decode_cursor, encode_cursor, keyset_filter, next_cursor, paginate, timestamp_key
+
+
+def item(app_id, updated_at):
+    return SimpleNamespace(id=app_id, updated_at=updated_at)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(datetime(2026, 10, 17, 12, 0, 0, 123456), "app-1")
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2026-10-17T12:00:00.123456", "app-1")
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor("yesterday", "app-1")])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_selects_rows_after_the_cursor():
+    cursor = encode_cursor("2026-10-17T12:00:00", "app-1")
+
+    assert keyset_filter(cursor) == (
+        'updated_at.lt."2026-10-17T12:00:00",'
+        'and(updated_at.eq."2026-10-17T12:00:00",id.lt."app-1")'
+    )
+
+
+def test_next_cursor_trims_the_extra_row():
+    items = [item("c", "2026-10-17T12:00:03"), item("b", "2026-10-17T12:00:02"), item("a", "2026-10-17T12:00:01")]
+
+    page, cursor = next_cursor(items, 2)
+
+    assert [i.id for i in page] == ["c", "b"]
+    assert decode_cursor(cursor) == ("2026-10-17T12:00:02", "b")
+    assert next_cursor(items, 3) == (items, None)
+
+
+def test_paginate_walks_every_item_once_including_ties():
+    same = "2026-10-17T12:00:00"
+    items = [item("a", same), item("b", same), item("c", "2026-10-17T11:00:00"), item("d", "2026-10-17T13:00:00")]
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = paginate(items, 2, cursor)
+        seen += [i.id for i in page]
+        if cursor is None:
+            break
+
+    assert seen == ["d", "b", "a", "c"]
+
+
+def test_timestamp_key_compares_instants_exactly():
+    base = datetime(2026, 10, 17, 12, 0, 0, tzinfo=timezone.utc)
+
+    assert timestamp_key("2026-10-17T12:00:00") == base
+    assert timestamp_key("2026-10-17T14:00:00+02:00") == base
+    assert timestamp_key(base + timedelta(microseconds=1)) > timestamp_key(base)
+    assert timestamp_key("2026-10-17T12:00:00.000001Z") > timestamp_key("2026-10-17T12:00:00Z")
+
+
+def test_api_pages_through_all_apps(client, auth_headers, create_app):
+    created = [create_app(name=f"App {i}")["id"] for i in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/v1/apps", params=params, headers=auth_headers).json()
+        seen += [app["id"] for app in body["data"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(created)
+    assert len(seen) == len(set(seen))
+
+
+def test_api_rejects_invalid_cursor(client, auth_headers):
+    response = client.get("/api/v1/apps", params={"cursor": "bogus"}, headers=auth_headers)
+
+    assert response.status_code == 400
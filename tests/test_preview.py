@@ -0,0 +1,55 @@
+import re
+
+import pytest
+
+from routes.preview import DEFAULT_COLOR, _get_app_template, preview_color
+from services.preview_assets import ASSET_ROUTE, IMMUTABLE_CACHE_CONTROL, asset_url
+
+
+@pytest.mark.parametrize("color, expected", [
+    ("#12ABef", "#12ABef"),
+    ("#abc", "#aabbcc"),
+    (None, DEFAULT_COLOR),
+    ("red", DEFAULT_COLOR),
+    ("#12345", DEFAULT_COLOR),
+    ("#123456\n", DEFAULT_COLOR),
+    ("#fff; } body { background: url(//evil.example) ", DEFAULT_COLOR),
+    ("#fff</style><script>alert(1)</script>", DEFAULT_COLOR),
+])
+def test_preview_color_only_allows_hex(color, expected):
+    assert preview_color(color) == expected
+
+
+def test_color_cannot_break_out_of_the_style_block():
+    html = _get_app_template({"name": "App", "color": "#000; } * { display: none } :root {", "screens": ["Home"]})
+
+    style = re.search(r"<style>(.*?)</style>", html).group(1)
+    assert style == f":root {{ --app-color: {DEFAULT_COLOR}; --app-color-translucent: {DEFAULT_COLOR}dd; }}"
+
+
+def test_preview_page_links_fingerprinted_assets(client, auth_headers, create_app):
+    app = create_app(color="#336699", screens=["Home"], type="game")
+
+    response = client.get(f"/api/v1/apps/{app['id']}/preview", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert asset_url("game.css") in response.text
+    assert "--app-color: #336699;" in response.text
+
+
+def test_assets_are_served_immutable_with_etag(client):
+    url = asset_url("generic.css")
+    assert re.fullmatch(rf"{ASSET_ROUTE}/generic\.[0-9a-f]{{12}}\.css", url)
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    revalidated = client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_unknown_assets_are_not_found(client):
+    assert client.get(f"{ASSET_ROUTE}/generic.css").status_code == 404
+    assert client.get(f"{ASSET_ROUTE}/..%2Fmain.py").status_code == 404
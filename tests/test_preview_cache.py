@@ -0,0 +1,59 @@
+from services.preview_cache import PreviewCache, RenderedPreview, preview_cache, preview_key
+
+
+def rendered(size: int) -> RenderedPreview:
+    return RenderedPreview(body=b"x" * size, etag='"e"', encoded={})
+
+
+def test_preview_key_covers_every_input():
+    key = preview_key("App", "#112233", ["Home"], "app", "1")
+
+    assert key == preview_key("App", "#112233", ["Home"], "app", "1")
+    assert key != preview_key("App", "#112233", ["Home"], "app", "2")
+    assert key != preview_key("App", "#112233", ["Home", "About"], "app", "1")
+    assert key != preview_key("Other", "#112233", ["Home"], "app", "1")
+
+
+def test_cache_is_bounded_by_bytes_and_evicts_least_recently_used():
+    cache = PreviewCache(max_bytes=100)
+    cache.set("a", rendered(40))
+    cache.set("b", rendered(40))
+    cache.get("a")
+
+    cache.set("c", rendered(40))
+    cache.set("huge", rendered(101))
+
+    assert cache.get("b") is None and cache.get("huge") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.stats()["size_bytes"] == 80 and cache.evictions == 1
+
+
+def test_replacing_an_entry_keeps_the_size_right():
+    cache = PreviewCache(max_bytes=100)
+    cache.set("a", RenderedPreview(body=b"x" * 30, etag='"e"', encoded={"gzip": b"x" * 10}))
+    cache.set("a", rendered(20))
+
+    assert cache.size_bytes == 20
+
+
+def test_identical_apps_share_one_render(client, auth_headers, other_auth_headers, create_app):
+    mine = create_app(name="Same", color="#112233", screens=["Home"])
+    theirs = client.post("/api/v1/apps/create", json={"name": "Same", "color": "#112233", "screens": ["Home"]},
+                         headers=other_auth_headers).json()["data"]
+
+    hits = preview_cache.hits
+    first = client.get(f"/api/v1/apps/{mine['id']}/preview", headers=auth_headers)
+    second = client.get(f"/api/v1/apps/{theirs['id']}/preview", headers=other_auth_headers)
+
+    assert first.text == second.text and first.headers["ETag"] == second.headers["ETag"]
+    assert preview_cache.stats()["entries"] == 1 and preview_cache.hits == hits + 1
+
+
+def test_edited_app_gets_a_new_preview(client, auth_headers, create_app):
+    app = create_app(name="Before")
+    before = client.get(f"/api/v1/apps/{app['id']}/preview", headers=auth_headers)
+
+    client.put(f"/api/v1/apps/{app['id']}", json={"name": "After"}, headers=auth_headers)
+    after = client.get(f"/api/v1/apps/{app['id']}/preview", headers=auth_headers)
+
+    assert "After" in after.text and after.headers["ETag"] != before.headers["ETag"]
@@ -0,0 +1,82 @@
+import pytest
+
+from services.preview_assets import asset_url
+from services.preview_templates import Template, TemplateError, TemplateRegistry, compile_template
+
+
+def render(source, **context):
+    return Template(compile_template(source))(context)
+
+
+def test_values_are_html_escaped():
+    assert render("<h1>{{ name }}</h1>", name='<b>"Café" & co</b>') == \
+        "<h1>&lt;b&gt;&quot;Café&quot; &amp; co&lt;/b&gt;</h1>"
+
+
+def test_loops_filters_and_nested_paths():
+    source = "{% for s in screens %}<a href='#{{ s.title|lower }}'>{{ s.title }}</a>{% endfor %}|{{ app.name|upper }}"
+
+    assert render(source, screens=[{"title": "Home"}, {"title": "About"}], app={"name": "x"}) == \
+        "<a href='#home'>Home</a><a href='#about'>About</a>|X"
+
+
+def test_loop_variable_does_not_leak_out_of_the_loop():
+    assert render("{% for s in items %}{{ s }}{% endfor %}{{ s }}", items=[1, 2], s="outer") == "12outer"
+
+
+def test_values_are_rendered_by_their_own_string_form():
+    # No memo shared across values: 1 and True, or unhashable values, render as themselves
+    assert render("{{ a }} {{ b }} {{ c }}", a=1, b=True, c=["x"]) == "1 True [&#x27;x&#x27;]"
+
+
+def test_static_text_and_nested_loops_survive_compilation():
+    # Static text becomes Python source, so braces, quotes and backslashes must stay literal
+    source = ("a { '\"\\n } {% for g in groups %}[{{ g.name }}:{% for g in g.items %}"
+              "({{ g }}{{ sep }}){% endfor %}]{% endfor %}")
+
+    assert render(source, groups=[{"name": "<x>", "items": ["1", "a\0&"]}, {"name": "y", "items": []}], sep="&") == \
+        "a { '\"\\n } [&lt;x&gt;:(1&amp;)(a\0&amp;&amp;)][y:]"
+
+
+def test_static_text_is_merged_and_assets_resolved_at_compile_time():
+    nodes = compile_template("<link href='{% asset generic.css %}'>")
+
+    assert nodes == [f"<link href='{asset_url('generic.css')}'>"]
+
+
+@pytest.mark.parametrize("source, message", [
+    ("{% for s in items %}", "unclosed"),
+    ("{% endfor %}", "endfor without for"),
+    ("{{ 1 + 1 }}", "invalid expression"),
+    ("{{ __import__('os') }}", "invalid expression"),
+    ("{% if x %}", "unknown tag"),
+    ("{% asset missing.css %}", "unknown asset"),
+    ("{{ name|title }}", "unknown filter"),
+])
+def test_compile_errors(source, message):
+    with pytest.raises(TemplateError, match=message):
+        compile_template(source)
+
+
+def test_missing_context_value_raises():
+    with pytest.raises(KeyError):
+        render("{{ name }}")
+
+
+def test_registry_loads_every_template_and_falls_back_to_default():
+    registry = TemplateRegistry()
+    context = {"app_name": "App", "color": "#123456", "screens": ["Home"], "nav_screens": ["Home"]}
+
+    assert registry.render("unknown-type", context) == registry.render("app", context)
+    assert "<!DOCTYPE html>" in registry.render("game", context)
+
+
+def test_registry_version_changes_with_template_sources(tmp_path):
+    (tmp_path / "app.html").write_text("<p>{{ app_name }}</p>")
+    registry = TemplateRegistry(str(tmp_path))
+    version = registry.version
+
+    registry.register("app", "<p>{{ app_name }}!</p>")
+
+    assert registry.version != version
+    assert registry.render("app", {"app_name": "A"}) == "<p>A!</p>"
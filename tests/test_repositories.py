@@ -0,0 +1,159 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from models.app import AppBatchUpdateItem, AppCreateRequest, AppUpdateRequest
+from repositories.executor import ExecutorAppRepository
+from repositories.sqlite import SQLiteAppRepository
+from repositories.supabase import AppQueries, AsyncSupabaseAppRepository, SupabaseAppRepository
+from services import async_supabase_service
+from services.executor_service import BoundedExecutor
+
+
+class FakeQuery:
+    """Records a PostgREST builder chain; execute() answers from the fake table"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.calls = [("table", table)]
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, *args))
+            return self
+        return call
+
+    def _response(self):
+        self.client.executed.append(self.calls)
+        return SimpleNamespace(data=self.client.rows.pop(0) if self.client.rows else [])
+
+
+class SyncQuery(FakeQuery):
+    def execute(self):
+        return self._response()
+
+
+class AsyncQuery(FakeQuery):
+    async def execute(self):
+        return self._response()
+
+
+class FakeClient:
+    def __init__(self, query_class, rows=()):
+        self.query_class = query_class
+        self.rows = list(rows)
+        self.executed = []
+
+    def table(self, name):
+        return self.query_class(self, name)
+
+
+class FakeConnection:
+    def __init__(self, client):
+        self._client = client
+
+    async def client(self):
+        return self._client
+
+
+def app_row(**fields):
+    return {"id": str(uuid.uuid4()), "name": "App", "status": "draft", "user_id": "u", "created_at": "2026-01-01T00:00:00",
+            "updated_at": "2026-01-01T00:00:00", **fields}
+
+
+def test_sync_and_async_drivers_send_the_same_queries():
+    rows = [[app_row(name="One")], [app_row(name="Two")]]
+    sync_client, async_client = FakeClient(SyncQuery, rows), FakeClient(AsyncQuery, rows)
+
+    sync_result = SupabaseAppRepository(sync_client).update_apps("u", [
+        AppBatchUpdateItem(id="a", status="published"), AppBatchUpdateItem(id="b", name="Renamed"),
+    ])
+    async_result = asyncio.run(AsyncSupabaseAppRepository(FakeConnection(async_client)).update_apps("u", [
+        AppBatchUpdateItem(id="a", status="published"), AppBatchUpdateItem(id="b", name="Renamed"),
+    ]))
+
+    # updated_at differs between runs; compare everything else
+    strip = lambda calls: [call if call[0] != "update" else ("update", {k: v for k, v in call[1].items() if k != "updated_at"})
+                           for call in calls]
+    assert [strip(calls) for calls in sync_client.executed] == [strip(calls) for calls in async_client.executed]
+    assert len(sync_client.executed) == 2
+    assert {app.name for app in sync_result.values()} == {app.name for app in async_result.values()} == {"One", "Two"}
+
+
+def test_parallel_queries_run_together():
+    changed = app_row()
+    client = FakeClient(AsyncQuery, [[changed], [{"app_id": "gone", "deleted_at": "2026-01-02T00:00:00+00:00"}]])
+
+    apps, tombstones = asyncio.run(AsyncSupabaseAppRepository(FakeConnection(client)).get_app_changes("u", "2026-01-01T00:00:00"))
+
+    assert [call[0][1] for call in client.executed] == ["apps", "app_tombstones"]
+    assert [app.id for app in apps] == [changed["id"]]
+    assert [tombstone.id for tombstone in tombstones] == ["gone"]
+
+
+def test_query_generator_yields_builders():
+    client = FakeClient(SyncQuery)
+    query = AppQueries.get_app(client, "app-1", "u", ["id", "name"])
+
+    builder = next(query)
+
+    assert builder.calls == [("table", "apps"), ("select", "id,name"), ("eq", "id", "app-1"), ("eq", "user_id", "u")]
+
+
+def test_executor_repository_runs_the_sync_repository():
+    repository = ExecutorAppRepository(SQLiteAppRepository(), BoundedExecutor(max_workers=2, max_queue=4, name="test"))
+
+    async def scenario():
+        created = await repository.create_app("u", AppCreateRequest(name="Mine"))
+        updated = await repository.update_app(created.id, "u", AppUpdateRequest(name="Renamed"))
+        other = await repository.get_app(created.id, "someone-else")
+        deleted = await repository.delete_app(created.id, "u")
+        return created, updated, other, deleted
+
+    created, updated, other, deleted = asyncio.run(scenario())
+
+    assert created.name == "Mine" and updated.name == "Renamed"
+    assert other is None
+    assert deleted is True
+
+
+def test_async_service_uses_the_async_repository(client, auth_headers, create_app, user_id, monkeypatch):
+    app = create_app()
+    calls = []
+    repository = async_supabase_service.async_app_repository
+    original = repository.get_app
+
+    async def get_app(*args):
+        calls.append(args)
+        return await original(*args)
+    monkeypatch.setattr(repository, "get_app", get_app)
+
+    response = client.get(f"/api/v1/apps/{app['id']}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert calls == [(app["id"], user_id, None)]
+
+
+def test_writes_are_a_single_request():
+    client = FakeClient(SyncQuery, [[app_row(name="Renamed")], [], [{"id": "gone"}]])
+    repository = SupabaseAppRepository(client)
+
+    updated = repository.update_app("a", "u", AppUpdateRequest(name="Renamed"))
+    missing = repository.update_app("b", "u", AppUpdateRequest(name="Renamed"))
+    deleted = repository.delete_app("gone", "u")
+
+    # Ownership is part of each filter; no lookup before the write
+    assert [calls[1][0] for calls in client.executed] == ["update", "update", "delete"]
+    assert all(("eq", "user_id", "u") in calls for calls in client.executed)
+    assert updated.name == "Renamed" and missing is None and deleted is True
+
+
+def test_other_users_apps_cannot_be_changed(client, auth_headers, create_app, make_token):
+    app = create_app(name="Mine")
+    other = {"Authorization": f"Bearer {make_token('someone-else')}"}
+
+    updated = client.put(f"/api/v1/apps/{app['id']}", json={"name": "Theirs"}, headers=other)
+    deleted = client.delete(f"/api/v1/apps/{app['id']}", headers=other)
+
+    assert updated.status_code == 404 and deleted.status_code == 404
+    assert client.get(f"/api/v1/apps/{app['id']}", headers=auth_headers).json()["data"]["name"] == "Mine"
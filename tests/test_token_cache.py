@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+from services.token_cache import TokenCache
+
+
+class Verifier:
+    def __init__(self, result="user-1", delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, token):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+def test_accepted_tokens_are_cached(make_token):
+    verify = Verifier()
+    cache = TokenCache(verify)
+    token = make_token("user-1")
+
+    assert asyncio.run(cache.verify(token)) == "user-1"
+    assert asyncio.run(cache.verify(token)) == "user-1"
+
+    assert verify.calls == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_rejected_tokens_are_cached_for_the_negative_ttl(make_token):
+    verify = Verifier(result=None)
+    cache = TokenCache(verify, negative_ttl=60)
+    token = make_token("user-1")
+
+    assert asyncio.run(cache.verify(token)) is None
+    assert asyncio.run(cache.verify(token)) is None
+
+    assert verify.calls == 1
+    assert cache.stats()["negative_hits"] == 1
+
+
+def test_entries_never_outlive_the_token(make_token):
+    verify = Verifier()
+    cache = TokenCache(verify, max_ttl=300)
+    token = make_token("user-1", expires_in=1)
+
+    asyncio.run(cache.verify(token))
+    time.sleep(1.1)
+    asyncio.run(cache.verify(token))
+
+    assert verify.calls == 2
+
+
+def test_concurrent_lookups_share_one_verification(make_token):
+    verify = Verifier(delay=0.1)
+    cache = TokenCache(verify)
+    token = make_token("user-1")
+
+    async def scenario():
+        return await asyncio.gather(*(cache.verify(token) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == ["user-1"] * 10
+    assert verify.calls == 1
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_least_recently_used_entries_are_evicted(make_token):
+    verify = Verifier()
+    cache = TokenCache(verify, max_entries=2)
+    tokens = [make_token(f"user-{i}") for i in range(3)]
+
+    for token in tokens:
+        asyncio.run(cache.verify(token))
+
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+    asyncio.run(cache.verify(tokens[0]))
+    assert verify.calls == 4
+
+
+def test_raw_tokens_are_not_kept(make_token):
+    cache = TokenCache(Verifier())
+    token = make_token("user-1")
+
+    asyncio.run(cache.verify(token))
+
+    assert all(isinstance(key, bytes) and key != token.encode() for key in cache._entries)
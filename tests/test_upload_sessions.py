@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+
+import pytest
+
+from services.apk_upload import ApkTooLarge
+from services.upload_sessions import OffsetMismatch, UploadSessionStore
+
+APK = b"PK\x03\x04" + os.urandom(4096)
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def store():
+    return UploadSessionStore(tempfile.mkdtemp(prefix="appquanta-sessions-"), max_bytes=len(APK) * 2)
+
+
+def test_append_resumes_from_the_committed_offset(store):
+    session = store.create("app", "user", len(APK))
+
+    first = asyncio.run(store.append(session, 0, chunks(APK[:100])))
+    with pytest.raises(OffsetMismatch) as mismatch:
+        asyncio.run(store.append(session, 0, chunks(APK[:100])))
+    second = asyncio.run(store.append(session, first, chunks(APK[100:])))
+
+    assert first == 100 and mismatch.value.offset == 100
+    assert second == len(APK) and store.is_complete(session)
+    with open(store.data_path(session.id), "rb") as f:
+        assert f.read() == APK
+
+
+def test_disconnect_keeps_the_bytes_received(store):
+    session = store.create("app", "user", len(APK))
+
+    async def dropped():
+        yield APK[:10]
+        raise ConnectionError("client went away")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(store.append(session, 0, dropped()))
+
+    assert store.offset(session.id) == 10
+
+
+def test_bytes_past_the_declared_size_are_rejected(store):
+    session = store.create("app", "user", 10)
+
+    with pytest.raises(ApkTooLarge):
+        asyncio.run(store.append(session, 0, chunks(APK[:11])))
+    with pytest.raises(ApkTooLarge):
+        store.create("app", "user", len(APK) * 3)
+
+
+def test_get_checks_owner_and_expiry(store):
+    session = store.create("app", "user")
+
+    assert store.get(session.id, "app", "user") == session
+    assert store.get(session.id, "app", "someone-else") is None
+    assert store.get(session.id, "other-app", "user") is None
+    assert store.get("../../etc/passwd", "app", "user") is None
+    store.ttl = -1
+    assert store.get(session.id, "app", "user") is None
+    assert not store.exists(session.id)
+
+
+def test_append_after_delete_fails_without_recreating_files(store):
+    session = store.create("app", "user")
+
+    async def scenario():
+        async with store.lock(session.id):
+            pending = asyncio.ensure_future(store.append(session, 0, chunks(APK)))
+            await asyncio.sleep(0)
+            # e.g. finalize: holds the lock, then removes the session
+            store.delete(session.id)
+        return await asyncio.wait_for(pending, timeout=5)
+
+    with pytest.raises(LookupError):
+        asyncio.run(scenario())
+    assert not os.path.exists(store.data_path(session.id))
+
+
+def test_collect_garbage_removes_idle_sessions(store):
+    session = store.create("app", "user")
+    store.ttl = -1
+
+    assert store.collect_garbage() == 1
+    assert not store.exists(session.id) and not os.path.exists(store.data_path(session.id))
+
+
+def upload(client, auth_headers, app_id, data=APK, parts=2):
+    created = client.post(f"/api/v1/apps/{app_id}/upload-apk/sessions", json={"total_size": len(data)}, headers=auth_headers)
+    assert created.status_code == 201, created.text
+    session_id = created.json()["data"]["session_id"]
+    url = f"/api/v1/apps/{app_id}/upload-apk/sessions/{session_id}"
+    step = -(-len(data) // parts)
+    for offset in range(0, len(data), step):
+        response = client.put(url, content=data[offset:offset + step], headers={**auth_headers, "Upload-Offset": str(offset)})
+        assert response.status_code == 200, response.text
+    return url
+
+
+def test_resumable_upload_round_trip(client, auth_headers, create_app):
+    app = create_app()
+    url = upload(client, auth_headers, app["id"])
+
+    finalized = client.post(f"{url}/finalize", headers=auth_headers)
+    again = client.post(f"{url}/finalize", headers=auth_headers)
+
+    assert finalized.status_code == 200, finalized.text
+    data = finalized.json()["data"]
+    assert data["apk_sha256"] == hashlib.sha256(APK).hexdigest()
+    assert data["apk_size"] == len(APK)
+    assert again.status_code == 404
+
+
+def test_identical_apk_is_deduplicated(client, auth_headers, create_app):
+    first, second = create_app(), create_app()
+
+    client.post(f"{upload(client, auth_headers, first['id'])}/finalize", headers=auth_headers)
+    response = client.post(f"{upload(client, auth_headers, second['id'])}/finalize", headers=auth_headers)
+
+    assert response.json()["data"]["deduplicated"] is True
+
+
+def test_incomplete_upload_cannot_be_finalized(client, auth_headers, create_app):
+    app = create_app()
+    created = client.post(f"/api/v1/apps/{app['id']}/upload-apk/sessions", json={"total_size": len(APK)}, headers=auth_headers)
+    url = f"/api/v1/apps/{app['id']}/upload-apk/sessions/{created.json()['data']['session_id']}"
+    client.put(url, content=APK[:10], headers={**auth_headers, "Upload-Offset": "0"})
+
+    response = client.post(f"{url}/finalize", headers=auth_headers)
+    stale = client.put(url, content=APK[:10], headers={**auth_headers, "Upload-Offset": "0"})
+
+    assert response.status_code == 409 and response.headers["Upload-Offset"] == "10"
+    assert stale.status_code == 409 and stale.headers["Upload-Offset"] == "10"
+
+
+def test_cancelled_session_is_gone(client, auth_headers, create_app):
+    app = create_app()
+    url = upload(client, auth_headers, app["id"])
+
+    assert client.delete(url, headers=auth_headers).status_code == 200
+    assert client.get(url, headers=auth_headers).status_code == 404
+    assert client.put(url, content=b"x", headers={**auth_headers, "Upload-Offset": "0"}).status_code == 404
+
+
+def test_sessions_belong_to_their_user(client, auth_headers, create_app, make_token):
+    app = create_app()
+    url = upload(client, auth_headers, app["id"])
+
+    response = client.post(f"{url}/finalize", headers={"Authorization": f"Bearer {make_token('someone-else')}"})
+
+    assert response.status_code == 404